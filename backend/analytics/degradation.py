@@ -0,0 +1,115 @@
+import numpy as np
+
+from backend.db.db_utils import FALLBACK_COMPOUND
+
+"""
+Tyre degradation and stint pace of every driver in a session, computed on the whole session at once.
+Laps are loaded into flat NumPy arrays ordered by driver and lap number, stints are found from
+pit-out laps and compound changes, and a least-squares line of fuel-corrected lap time against
+tyre age is fitted for every stint with grouped sums (np.bincount) instead of a loop per stint.
+"""
+
+# Lap time gained per lap of fuel burnt, used to bring every lap to an empty-tank equivalent.
+FUEL_EFFECT_PER_LAP = 0.055
+# Laps slower than this fraction of the driver's best clean lap (safety car, traffic, in-laps) are dropped.
+OUTLIER_THRESHOLD = 1.07
+# Fewer clean laps than this and a stint gets no degradation slope.
+MIN_FIT_LAPS = 3
+
+
+def lap_arrays(rows) -> dict[str, np.ndarray]:
+    """
+    Converts lap rows into flat arrays.
+    :param rows: (driver_number, lap_number, lap_time, is_pit_out_lap, compound) tuples,
+        ordered by driver number then lap number.
+    """
+    driver_numbers, lap_numbers, lap_times, pit_out, compounds = zip(*rows)
+    compound_names, compound_codes = np.unique(
+        np.array([compound or FALLBACK_COMPOUND for compound in compounds]), return_inverse=True
+    )
+    return {
+        "driver": np.asarray(driver_numbers, dtype=np.int64),
+        "lap": np.asarray(lap_numbers, dtype=np.int64),
+        "time": np.asarray([np.nan if time is None else time for time in lap_times], dtype=np.float64),
+        "pit_out": np.asarray(pit_out, dtype=bool),
+        "compound": compound_codes,
+        "compound_names": compound_names,
+    }
+
+
+def stint_ids(driver: np.ndarray, pit_out: np.ndarray, compound: np.ndarray) -> np.ndarray:
+    """Numbers the stints of all drivers consecutively: a stint starts on a new driver, a pit-out lap or a compound change."""
+    starts = np.ones(len(driver), dtype=bool)
+    starts[1:] = (driver[1:] != driver[:-1]) | (compound[1:] != compound[:-1])
+    starts |= pit_out
+    return np.cumsum(starts) - 1
+
+
+def clean_lap_mask(driver: np.ndarray, time: np.ndarray, pit_out: np.ndarray,
+                   threshold: float = OUTLIER_THRESHOLD) -> np.ndarray:
+    """Timed laps that aren't pit-out laps and are within 'threshold' of the driver's best such lap."""
+    timed = ~np.isnan(time) & ~pit_out
+    drivers, driver_index = np.unique(driver, return_inverse=True)
+    best = np.full(len(drivers), np.inf)
+    np.minimum.at(best, driver_index[timed], time[timed])
+    return timed & (time <= best[driver_index] * threshold)
+
+
+def fit_stints(arrays: dict[str, np.ndarray], fuel_effect: float = FUEL_EFFECT_PER_LAP) -> list[dict]:
+    """
+    Fits every stint of a session.
+    :param arrays: Output of lap_arrays.
+    :param fuel_effect: Seconds per lap of fuel load, see FUEL_EFFECT_PER_LAP.
+    :return: One dictionary per stint, ordered by driver number and stint.
+    """
+    driver, lap, time = arrays["driver"], arrays["lap"], arrays["time"]
+    stint = stint_ids(driver, arrays["pit_out"], arrays["compound"])
+    stint_count = stint[-1] + 1
+    clean = clean_lap_mask(driver, time, arrays["pit_out"])
+
+    first = np.flatnonzero(np.r_[True, stint[1:] != stint[:-1]])
+    last = np.r_[first[1:] - 1, len(stint) - 1]
+    tyre_age = lap - lap[first][stint]
+    # remove the time lost carrying the fuel still on board, taking the last lap of the session as an empty tank
+    corrected = time - fuel_effect * (lap.max() - lap)
+
+    x, y, group = tyre_age[clean].astype(np.float64), corrected[clean], stint[clean]
+    n = np.bincount(group, minlength=stint_count).astype(np.float64)
+    sum_x = np.bincount(group, x, stint_count)
+    sum_y = np.bincount(group, y, stint_count)
+    sum_xx = np.bincount(group, x * x, stint_count)
+    sum_xy = np.bincount(group, x * y, stint_count)
+    sum_raw = np.bincount(group, time[clean], stint_count)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        denominator = n * sum_xx - sum_x ** 2
+        fitted = (n >= MIN_FIT_LAPS) & (denominator > 0)
+        slope = np.where(fitted, (n * sum_xy - sum_x * sum_y) / denominator, np.nan)
+        mean_lap = np.where(n > 0, sum_raw / n, np.nan)
+        mean_corrected = np.where(n > 0, sum_y / n, np.nan)
+
+    stint_driver = driver[first]
+    # position of each stint within its driver's stints
+    index = np.arange(stint_count)
+    driver_start = np.r_[True, stint_driver[1:] != stint_driver[:-1]]
+    stint_number = index - np.maximum.accumulate(np.where(driver_start, index, 0))
+
+    return [
+        {
+            "driver_number": int(stint_driver[i]),
+            "stint": int(stint_number[i]) + 1,
+            "compound": str(arrays["compound_names"][arrays["compound"][first[i]]]),
+            "start_lap": int(lap[first[i]]),
+            "end_lap": int(lap[last[i]]),
+            "laps": int(last[i] - first[i] + 1),
+            "clean_laps": int(n[i]),
+            "average_lap": rounded(mean_lap[i], 3),
+            "fuel_corrected_pace": rounded(mean_corrected[i], 3),
+            "degradation_per_lap": rounded(slope[i], 4),
+        }
+        for i in range(stint_count)
+    ]
+
+
+def rounded(value: float, digits: int) -> float | None:
+    return None if np.isnan(value) else round(float(value), digits)
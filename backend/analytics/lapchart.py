@@ -0,0 +1,86 @@
+import warnings
+
+import numpy as np
+
+"""
+Lap chart of a whole session: cumulative race time, position, gap to the leader and interval to the
+car ahead of every driver at the end of every lap. Lap times are laid out in a (driver x lap) matrix
+so each quantity is a single NumPy operation over the field instead of a loop per driver and lap.
+"""
+
+
+def lap_time_matrix(rows) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Lays lap rows out in a (driver x lap) matrix.
+    :param rows: (driver_number, lap_number, lap_time) tuples, ordered by driver number.
+    :return: Driver numbers, lap numbers (1..last lap) and the matrix of lap times,
+        NaN where a lap has no recorded time or wasn't driven.
+    """
+    driver_numbers, lap_numbers, lap_times = zip(*rows)
+    drivers, driver_index = np.unique(np.asarray(driver_numbers), return_inverse=True)
+    lap_numbers = np.asarray(lap_numbers, dtype=np.int64)
+    times = np.full((len(drivers), lap_numbers.max()), np.nan)
+    times[driver_index, lap_numbers - 1] = [np.nan if time is None else time for time in lap_times]
+
+    completed = np.zeros(len(drivers), dtype=np.int64)
+    np.maximum.at(completed, driver_index, lap_numbers)
+    return drivers, completed, times
+
+
+def fill_missing_laps(times: np.ndarray, completed: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Replaces missing times of laps a driver did complete with the field's median time of that lap,
+    so one untimed lap doesn't drop the driver from every later lap.
+    :return: The filled matrix, and which laps nobody has a time for (OpenF1 often leaves lap 1 untimed).
+        Those laps count as 0 for the drivers who drove them, their real differences being unknown.
+    """
+    with warnings.catch_warnings():
+        # laps without any recorded time
+        warnings.simplefilter("ignore", RuntimeWarning)
+        median = np.nanmedian(times, axis=0)
+    untimed = np.isnan(median)
+    driven = np.arange(times.shape[1]) < completed[:, None]
+    return np.where(driven & np.isnan(times), np.nan_to_num(median), times), untimed
+
+
+def lap_chart(rows) -> dict:
+    """
+    Computes the lap chart of a session.
+    :param rows: (driver_number, lap_number, lap_time) tuples, ordered by driver number.
+    :return: Dictionary with the driver numbers, and per-driver lists (one value per lap, None once
+        the driver stopped) of cumulative time, position, gap to the leader and interval to the car ahead.
+        Laps nobody has a time for are None for every driver, and later laps are timed from the end of them.
+    """
+    drivers, completed, times = lap_time_matrix(rows)
+    filled, untimed = fill_missing_laps(times, completed)
+    cumulative = np.cumsum(filled, axis=1)
+
+    # drivers who stopped drop to the back of every later lap
+    ranked = np.where(np.isnan(cumulative), np.inf, cumulative)
+    order = np.argsort(ranked, axis=0, kind="stable")
+    positions = np.empty_like(order)
+    np.put_along_axis(positions, order, np.arange(1, len(drivers) + 1)[:, None], axis=0)
+
+    sorted_times = np.take_along_axis(ranked, order, axis=0)
+    leader = sorted_times[0]
+    sorted_intervals = np.diff(sorted_times, axis=0, prepend=sorted_times[:1])
+    intervals = np.empty_like(cumulative)
+    np.put_along_axis(intervals, order, sorted_intervals, axis=0)
+
+    valid = ~np.isnan(cumulative) & ~untimed
+    with np.errstate(invalid="ignore"):
+        gaps = cumulative - leader
+    return {
+        "drivers": drivers.tolist(),
+        "laps": int(completed.max()),
+        "cumulative_times": as_lists(np.round(cumulative, 3), valid),
+        "positions": as_lists(positions, valid),
+        "gaps_to_leader": as_lists(np.round(gaps, 3), valid),
+        "intervals": as_lists(np.round(intervals, 3), valid),
+    }
+
+
+def as_lists(matrix: np.ndarray, valid: np.ndarray) -> list[list]:
+    """One list per driver, None on the laps they didn't complete."""
+    return [[value if ok else None for value, ok in zip(row, valid_row)]
+            for row, valid_row in zip(matrix.tolist(), valid.tolist())]
@@ -0,0 +1,36 @@
+from fastapi import APIRouter, Depends
+from backend.api.auth import require_admin_token
+from backend.api.cache_headers import no_store
+from backend.crud.cache import read_cache, data_versions
+from backend.crud.ingest import get_ingest_status
+from backend.db.database import engine, ASYNC_DB, DB_PROFILE
+from backend.db.db_utils import SessionDep
+from backend.db.pool import pool_status
+
+router = APIRouter(prefix="/admin", tags=["admin"], dependencies=[Depends(require_admin_token), Depends(no_store)])
+
+@router.get("/cache",
+            summary="Gets read cache statistics",
+            description="Returns hit/miss counters of the in-process read cache and the number of data versions it tracks."
+)
+def read_cache_stats():
+    return {**read_cache.stats(), "tracked_versions": len(data_versions)}
+
+@router.get("/pool",
+            summary="Gets database connection pool statistics",
+            description="Returns checked out connections, overflow and checkout wait times of the database connection pools."
+)
+def read_pool_stats():
+    pools = {"sync": pool_status(engine.pool)}
+    if ASYNC_DB:
+        from backend.db.async_database import async_engine
+        pools["async"] = pool_status(async_engine.pool)
+    return {"profile": DB_PROFILE, "pools": pools}
+
+@router.get("/ingest",
+            summary="Gets ingest progress",
+            description="Returns how many sessions update_db has ingested, is still polling or has to retry, "
+                        "and the last error of every failed session."
+)
+def read_ingest_status(session: SessionDep):
+    return get_ingest_status(session)
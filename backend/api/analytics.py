@@ -0,0 +1,29 @@
+from fastapi import APIRouter
+from backend.api.cache_headers import SessionCacheHeaders
+from backend.api.json_responses import trusted_json_response
+from backend.db.db_utils import SessionDep
+from backend.crud.analytics import get_session_degradation, get_session_lap_chart
+from backend.schemas.read_degradation import DriverDegradation
+from backend.schemas.read_lapchart import LapChart
+
+router = APIRouter()
+
+@router.get("/session/{session_key}/degradation",
+            response_model=list[DriverDegradation],
+            summary="Gets tyre degradation per stint",
+            description="Splits every driver's laps into stints (on pit-out laps and compound changes), drops "
+                        "pit-out laps and laps slower than 107% of the driver's best, and fits the degradation "
+                        "(seconds lost per lap of tyre age) and fuel-corrected pace of each stint."
+)
+def read_session_degradation(session_key: int, session: SessionDep, cache_headers: SessionCacheHeaders):
+    return trusted_json_response(get_session_degradation(session, session_key), cache_headers)
+
+@router.get("/session/{session_key}/lapchart",
+            response_model=LapChart,
+            summary="Gets the lap chart",
+            description="Position, cumulative time, gap to the leader and interval to the car ahead of every driver "
+                        "at the end of every lap. Untimed laps a driver completed count as the field's median lap, "
+                        "laps nobody has a time for (often lap 1) are null."
+)
+def read_session_lap_chart(session_key: int, session: SessionDep, cache_headers: SessionCacheHeaders):
+    return trusted_json_response(get_session_lap_chart(session, session_key), cache_headers)
@@ -0,0 +1,105 @@
+from datetime import datetime
+from fastapi import APIRouter, Depends, HTTPException, Query
+
+from backend.api.cache_headers import (session_cache_headers, meeting_cache_headers, events_cache_headers,
+                                       teams_cache_headers, sessions_cache_headers, clock_cache_headers,
+                                       SessionCacheHeaders)
+from backend.api.json_responses import trusted_json_response
+from backend.api.laps import (LapFormatDep, build_driver_laps, build_driver_laps_columnar, columnar_response,
+                              found_driver, parse_driver_numbers)
+from backend.crud.analytics import get_session_degradation_async, get_session_lap_chart_async
+from backend.crud.driver import get_drivers_from_session_key_async
+from backend.crud.event import get_events_from_year_async, get_available_years_async, get_teams_async
+from backend.crud.f1session import (get_sessions_from_meeting_key_async, get_session_result_async,
+                                    get_sessions_in_range_async, get_next_session_async, get_previous_session_async)
+from backend.api.sessions import utc, found
+from backend.crud.session_stats import get_session_driver_stats_async
+from backend.crud.lap import get_driver_lap_times_async, get_session_lap_times_async
+from backend.db.async_database import AsyncSessionDep
+from backend.schemas.driver_laps_schema import DriverLapsRead
+
+"""
+Async versions of the read endpoints, served instead of the sync ones when DB_ASYNC is enabled.
+They share paths, parameters and response models with the routers they replace, which keep
+documenting the API.
+"""
+
+router = APIRouter()
+
+@router.get("/events/{year}", dependencies=[Depends(events_cache_headers)])
+async def read_events(session: AsyncSessionDep, year: int):
+    return await get_events_from_year_async(session, year)
+
+@router.get("/events/years/", dependencies=[Depends(events_cache_headers)])
+async def read_available_years(session: AsyncSessionDep):
+    return await get_available_years_async(session)
+
+@router.get("/teams/", dependencies=[Depends(teams_cache_headers)])
+async def read_teams(session: AsyncSessionDep):
+    return await get_teams_async(session)
+
+@router.get("/sessions/range/", dependencies=[Depends(sessions_cache_headers)])
+async def read_sessions_in_range(start: datetime, end: datetime, session: AsyncSessionDep):
+    start, end = utc(start), utc(end)
+    if end <= start:
+        raise HTTPException(status_code=400, detail="end must be after start.")
+    return await get_sessions_in_range_async(session, start, end)
+
+@router.get("/sessions/next/", dependencies=[Depends(clock_cache_headers)])
+async def read_next_session(session: AsyncSessionDep, at: datetime | None = None):
+    return found(await get_next_session_async(session, utc(at)))
+
+@router.get("/sessions/previous/", dependencies=[Depends(clock_cache_headers)])
+async def read_previous_session(session: AsyncSessionDep, at: datetime | None = None):
+    return found(await get_previous_session_async(session, utc(at)))
+
+@router.get("/sessions/{meeting_key}", dependencies=[Depends(meeting_cache_headers)])
+async def read_sessions(meeting_key: int, session: AsyncSessionDep):
+    return await get_sessions_from_meeting_key_async(session, meeting_key)
+
+@router.get("/session_result/{session_key}")
+async def read_session_result(session_key: int, session: AsyncSessionDep, cache_headers: SessionCacheHeaders):
+    return trusted_json_response(await get_session_result_async(session, session_key), cache_headers)
+
+@router.get("/session_stats/{session_key}")
+async def read_session_stats(session_key: int, session: AsyncSessionDep, cache_headers: SessionCacheHeaders):
+    return trusted_json_response(await get_session_driver_stats_async(session, session_key), cache_headers)
+
+@router.get("/session/{session_key}/degradation")
+async def read_session_degradation(session_key: int, session: AsyncSessionDep, cache_headers: SessionCacheHeaders):
+    return trusted_json_response(await get_session_degradation_async(session, session_key), cache_headers)
+
+@router.get("/session/{session_key}/lapchart")
+async def read_session_lap_chart(session_key: int, session: AsyncSessionDep, cache_headers: SessionCacheHeaders):
+    return trusted_json_response(await get_session_lap_chart_async(session, session_key), cache_headers)
+
+@router.get("/drivers/{session_key}", dependencies=[Depends(session_cache_headers)])
+async def read_drivers_in_session(session: AsyncSessionDep, session_key: int):
+    return await get_drivers_from_session_key_async(session, session_key)
+
+@router.get("/laps/{session_key}", response_model=list[DriverLapsRead])
+async def read_session_laps(session: AsyncSessionDep, session_key: int, lap_format: LapFormatDep,
+                            cache_headers: SessionCacheHeaders, drivers: str | None = Query(default=None)):
+    driver_numbers = parse_driver_numbers(drivers)
+    drivers_laps = await get_session_lap_times_async(session, session_key, driver_numbers)
+
+    if lap_format != "json":
+        return columnar_response(
+            [build_driver_laps_columnar(driver, laps) for driver, laps in drivers_laps],
+            lap_format,
+            cache_headers
+        )
+    return trusted_json_response(
+        [build_driver_laps(driver, laps) for driver, laps in drivers_laps],
+        cache_headers
+    )
+
+@router.get("/laps/{session_key}/{driver_number}", response_model=DriverLapsRead)
+async def read_driver_session_laps(session: AsyncSessionDep, session_key: int, driver_number: int,
+                                   lap_format: LapFormatDep, cache_headers: SessionCacheHeaders):
+    driver, laps = await get_driver_lap_times_async(session, session_key, driver_number)
+    found_driver(driver)
+
+    if lap_format != "json":
+        return columnar_response(build_driver_laps_columnar(driver, laps), lap_format, cache_headers)
+    return trusted_json_response(build_driver_laps(driver, laps), cache_headers)
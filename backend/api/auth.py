@@ -0,0 +1,17 @@
+import os, secrets
+
+from fastapi import Header, HTTPException
+
+"""
+Access to the operational endpoints (/admin/*, /metrics), which expose pool internals, ingest
+errors and per-route traffic. They answer only requests sending 'Authorization: Bearer <ADMIN_TOKEN>',
+and don't exist (404) when ADMIN_TOKEN isn't set.
+"""
+
+def require_admin_token(authorization: str | None = Header(default=None)):
+    # read per request, so the token isn't captured at import time
+    token = os.getenv("ADMIN_TOKEN")
+    if not token:
+        raise HTTPException(status_code=404, detail="Not Found")
+    if not secrets.compare_digest(authorization or "", f"Bearer {token}"):
+        raise HTTPException(status_code=401, detail="Invalid admin token.", headers={"WWW-Authenticate": "Bearer"})
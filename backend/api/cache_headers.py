@@ -0,0 +1,97 @@
+import hashlib
+from datetime import datetime, timedelta, timezone
+from typing import Annotated
+
+from fastapi import Depends, HTTPException, Request, Response
+
+from backend.crud.cache import data_versions, meeting_scope, session_scope, EVENTS_SCOPE, SESSIONS_SCOPE, TEAMS_SCOPE
+
+"""
+HTTP validators and cache lifetimes for the read endpoints.
+ETags are derived from the data version of the session/meeting a response depends on (see
+backend/crud/cache.py), so a matching If-None-Match is answered with 304 Not Modified before
+the database is queried or anything is serialized.
+"""
+
+# A scope bumped more recently than this is considered live and may still change.
+LIVE_WINDOW = timedelta(hours=3)
+LIVE_MAX_AGE = 5
+FINISHED_MAX_AGE = 24 * 60 * 60
+# Event and team listings grow during a season, so they are never cached for long.
+LISTING_MAX_AGE = 5 * 60
+# Responses relative to the current time (next/previous session) change without any data changing.
+CLOCK_MAX_AGE = 60
+
+
+def make_etag(request: Request, scope: str, version: int) -> str:
+    """Strong ETag for a response, unique per data version, URL and requested format."""
+    accept = request.headers.get("accept", "")
+    key = f"{scope}:{version}:{request.url.path}?{request.url.query}:{accept}"
+    return '"' + hashlib.sha1(key.encode("utf-8")).hexdigest()[:20] + '"'
+
+
+def etag_matches(if_none_match: str | None, etag: str) -> bool:
+    if not if_none_match:
+        return False
+    candidates = [candidate.strip() for candidate in if_none_match.split(",")]
+    # If-None-Match uses weak comparison, so W/"x" matches "x"
+    return "*" in candidates or etag in [candidate.removeprefix("W/") for candidate in candidates]
+
+
+def max_age_for(scope: str) -> int:
+    if scope in (EVENTS_SCOPE, SESSIONS_SCOPE, TEAMS_SCOPE):
+        return LISTING_MAX_AGE
+    updated_at = data_versions.updated_at(scope)
+    # never bumped: not ingested yet, or an unknown key, either may get data any time
+    if updated_at is None or datetime.now(timezone.utc) - updated_at < LIVE_WINDOW:
+        return LIVE_MAX_AGE
+    return FINISHED_MAX_AGE
+
+
+def apply_cache_headers(request: Request, response: Response, scope: str) -> dict[str, str]:
+    """
+    Sets ETag, Cache-Control and Vary on the response, raising 304 Not Modified if the
+    client already has the current version.
+    :return: The headers, for endpoints that build their own Response object.
+    """
+    etag = make_etag(request, scope, data_versions.version(scope))
+    headers = {
+        "ETag": etag,
+        "Cache-Control": f"public, max-age={max_age_for(scope)}",
+        "Vary": "Accept",
+    }
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        raise HTTPException(status_code=304, headers=headers)
+    response.headers.update(headers)
+    return headers
+
+
+def session_cache_headers(request: Request, response: Response, session_key: int) -> dict[str, str]:
+    return apply_cache_headers(request, response, session_scope(session_key))
+
+SessionCacheHeaders = Annotated[dict[str, str], Depends(session_cache_headers)]
+
+
+def meeting_cache_headers(request: Request, response: Response, meeting_key: int) -> dict[str, str]:
+    return apply_cache_headers(request, response, meeting_scope(meeting_key))
+
+
+def events_cache_headers(request: Request, response: Response) -> dict[str, str]:
+    return apply_cache_headers(request, response, EVENTS_SCOPE)
+
+
+def sessions_cache_headers(request: Request, response: Response) -> dict[str, str]:
+    return apply_cache_headers(request, response, SESSIONS_SCOPE)
+
+
+def clock_cache_headers(response: Response):
+    # no ETag: the data version doesn't change when the answer does
+    response.headers["Cache-Control"] = f"public, max-age={CLOCK_MAX_AGE}"
+
+
+def teams_cache_headers(request: Request, response: Response) -> dict[str, str]:
+    return apply_cache_headers(request, response, TEAMS_SCOPE)
+
+
+def no_store(response: Response):
+    response.headers["Cache-Control"] = "no-store"
@@ -1,10 +1,12 @@
-from fastapi import APIRouter
+from fastapi import APIRouter, Depends
+from backend.api.cache_headers import session_cache_headers
 from backend.db.db_utils import SessionDep
 from backend.crud.driver import get_drivers_from_session_key
 
 router = APIRouter()
 
 @router.get("/drivers/{session_key}",
+            dependencies=[Depends(session_cache_headers)],
             summary="Get session drivers",
             description="Accesses the DB and returns all drivers in a given F1 session."
                         "session_key is an Integer that connects a session to everything that pertains it."
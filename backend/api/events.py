@@ -1,10 +1,12 @@
-from fastapi import APIRouter
+from fastapi import APIRouter, Depends
+from backend.api.cache_headers import events_cache_headers, teams_cache_headers
 from backend.crud.event import get_events_from_year, get_available_years, get_teams
 from backend.db.db_utils import SessionDep
 
 router = APIRouter()
 
 @router.get("/events/{year}",
+            dependencies=[Depends(events_cache_headers)],
             summary="Gets F1 events",
             description="Accesses de DB and returns all F1 events in a year."
 )
@@ -12,11 +14,12 @@ def read_events(session: SessionDep, year: int):
     return get_events_from_year(session, year)
 
 @router.get("/events/years/",
+            dependencies=[Depends(events_cache_headers)],
             summary="Gets all years that we have data for",
             description="Accesses de DB and returns all years for which we have data.")
 def read_available_years(session: SessionDep):
     return get_available_years(session)
 
-@router.get("/teams/")
+@router.get("/teams/", dependencies=[Depends(teams_cache_headers)])
 def read_teams(session: SessionDep):
     return get_teams(session)
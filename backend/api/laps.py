@@ -1,35 +1,160 @@
-from fastapi import APIRouter
+from typing import Annotated, Literal
 
-from backend.crud.lap import get_driver_lap_times
+import msgpack
+import orjson
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+
+from backend.api.cache_headers import SessionCacheHeaders
+from backend.api.json_responses import trusted_json_response
+from backend.crud.lap import get_driver_lap_times, get_session_lap_times
 from backend.db.db_utils import SessionDep, FALLBACK_COMPOUND
-from backend.schemas.driver_laps_schema import DriverLapsRead, LapRead
+from backend.schemas.driver_laps_schema import DriverLapsRead
 
 router = APIRouter()
 
+COLUMNAR_MEDIA_TYPE = "application/vnd.racepace.columnar+json"
+MSGPACK_MEDIA_TYPE = "application/msgpack"
+
+LAP_FORMAT_RESPONSES = {
+    200: {
+        "description": "Laps as a list of objects (default), or columnar when requested with format=columnar/msgpack "
+                       f"or an Accept header of {COLUMNAR_MEDIA_TYPE} / {MSGPACK_MEDIA_TYPE}.",
+        "content": {COLUMNAR_MEDIA_TYPE: {}, MSGPACK_MEDIA_TYPE: {}},
+    }
+}
+
+def get_lap_format(request: Request,
+                   format: Literal["json", "columnar", "msgpack"] | None = Query(
+                       default=None, description="Response format, overrides the Accept header.")) -> str:
+    """Picks the laps response format from the 'format' query parameter, then the Accept header."""
+    if format:
+        return format
+    accept = request.headers.get("accept", "")
+    if MSGPACK_MEDIA_TYPE in accept:
+        return "msgpack"
+    if COLUMNAR_MEDIA_TYPE in accept:
+        return "columnar"
+    return "json"
+
+LapFormatDep = Annotated[str, Depends(get_lap_format)]
+
+def found_driver(driver):
+    if driver is None:
+        raise HTTPException(status_code=404, detail="No driver found in this session.")
+    return driver
+
+def build_driver_laps(driver, laps) -> dict:
+    """
+    Builds a driver's laps in the shape of 'DriverLapsRead' from the rows returned by the crud layer,
+    as plain dicts instead of a model per lap, so they can be sent with trusted_json_response.
+    """
+    return {
+        "driver_number": driver.driver_number,
+        "first_name": driver.first_name,
+        "last_name": driver.last_name,
+        "team": driver.team,
+        "headshot_url": driver.headshot_url,
+        "laps": [
+            {
+                "lap_number": lap.lap_number or 0,
+                "time": lap.lap_time or 0.0,
+                "speed_trap": lap.st_speed or 0,
+                "is_pit_out_lap": lap.is_pit_out_lap or False,
+                "compound": lap.compound or FALLBACK_COMPOUND,
+            }
+            for lap in laps
+        ],
+    }
+
+def build_driver_laps_columnar(driver, laps) -> dict:
+    """
+    Builds a driver's laps as parallel arrays, one per lap field, instead of one object per lap.
+    Compounds are run-length encoded: 'values' holds each run's compound and 'lengths' its number of
+    laps, a new run starting whenever the compound changes or the driver leaves the pits. The laps must
+    be in lap order.
+    """
+    lap_numbers, times, speed_traps, pit_out_laps = [], [], [], []
+    compounds, run_lengths = [], []
+    for lap in laps:
+        lap_numbers.append(lap.lap_number or 0)
+        times.append(lap.lap_time or 0.0)
+        speed_traps.append(lap.st_speed or 0)
+        pit_out_laps.append(lap.is_pit_out_lap or False)
+
+        compound = lap.compound or FALLBACK_COMPOUND
+        if compounds and compounds[-1] == compound and not lap.is_pit_out_lap:
+            run_lengths[-1] += 1
+        else:
+            compounds.append(compound)
+            run_lengths.append(1)
+
+    return {
+        "driver_number": driver.driver_number,
+        "first_name": driver.first_name,
+        "last_name": driver.last_name,
+        "team": driver.team,
+        "headshot_url": driver.headshot_url,
+        "laps": {
+            "lap_number": lap_numbers,
+            "time": times,
+            "speed_trap": speed_traps,
+            "is_pit_out_lap": pit_out_laps,
+            "compound": {"values": compounds, "lengths": run_lengths},
+        },
+    }
+
+def columnar_response(payload, lap_format: str, headers: dict[str, str]) -> Response:
+    """Encodes columnar laps as compact JSON or msgpack."""
+    if lap_format == "msgpack":
+        return Response(msgpack.packb(payload), media_type=MSGPACK_MEDIA_TYPE, headers=headers)
+    return Response(orjson.dumps(payload), media_type=COLUMNAR_MEDIA_TYPE, headers=headers)
+
+def parse_driver_numbers(drivers: str | None) -> list[int] | None:
+    """Parses the 'drivers' query parameter ("1,16,44"), None meaning every driver."""
+    if drivers is None or drivers.strip().lower() in ("", "all"):
+        return None
+    try:
+        return [int(number) for number in drivers.split(",") if number.strip()]
+    except ValueError:
+        raise HTTPException(status_code=400, detail="drivers must be a comma separated list of driver numbers or 'all'.")
+
+@router.get("/laps/{session_key}",
+            response_model=list[DriverLapsRead],
+            responses=LAP_FORMAT_RESPONSES,
+            summary="Gets several drivers' session laps",
+            description="Accesses the DB and retrieves the laps of several drivers in a session with a single query, "
+                        "grouped by driver and ordered by lap number. "
+                        "drivers is a comma separated list of driver numbers (e.g. 1,16,44), omit it or use 'all' for every driver."
+)
+def read_session_laps(session: SessionDep, session_key: int, lap_format: LapFormatDep,
+                      cache_headers: SessionCacheHeaders,
+                      drivers: str | None = Query(default=None, examples=["1,16,44"])):
+    driver_numbers = parse_driver_numbers(drivers)
+    drivers_laps = get_session_lap_times(session, session_key, driver_numbers)
+
+    if lap_format != "json":
+        return columnar_response(
+            [build_driver_laps_columnar(driver, laps) for driver, laps in drivers_laps],
+            lap_format,
+            cache_headers
+        )
+    return trusted_json_response(
+        [build_driver_laps(driver, laps) for driver, laps in drivers_laps],
+        cache_headers
+    )
+
 @router.get("/laps/{session_key}/{driver_number}",
             response_model=DriverLapsRead,
+            responses=LAP_FORMAT_RESPONSES,
             summary="Gets a driver's session laps",
             description="Accesses the DB and retrives all laps a driver completed in a session, modelling the response using a schema."
                         "session_key is an Integer generated by OpenF1 to connect a session to everything that pertains it."
 )
-def read_driver_session_laps(session:SessionDep, session_key:int, driver_number:int):
-    driver, session_data ,laps = get_driver_lap_times(session, session_key, driver_number)
-
-    driver_laps = DriverLapsRead(
-        driver_number=session_data.driver_number,
-        first_name=driver.first_name,
-        last_name=driver.last_name,
-        team=session_data.team,
-        headshot_url=driver.headshot_url,
-        laps = [
-            LapRead(
-                lap_number=lap.lap_number or 0,
-                time = lap.lap_time or 0.0,
-                speed_trap= lap.st_speed or 0,
-                is_pit_out_lap=lap.is_pit_out_lap or False,
-                compound=lap.compound or FALLBACK_COMPOUND
-            )
-            for lap in laps
-        ]
-    )
-    return driver_laps
+def read_driver_session_laps(session:SessionDep, session_key:int, driver_number:int, lap_format: LapFormatDep,
+                             cache_headers: SessionCacheHeaders):
+    driver, laps = get_driver_lap_times(session, session_key, driver_number)
+    found_driver(driver)
+
+    if lap_format != "json":
+        return columnar_response(build_driver_laps_columnar(driver, laps), lap_format, cache_headers)
+    return trusted_json_response(build_driver_laps(driver, laps), cache_headers)
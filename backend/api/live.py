@@ -0,0 +1,57 @@
+import asyncio, json
+
+from fastapi import APIRouter, Query, Request
+from fastapi.responses import StreamingResponse
+
+from backend.db.live_events import live_broker
+
+router = APIRouter()
+
+# A comment line is sent when nothing happened for this long, so proxies keep the connection open.
+HEARTBEAT_SECONDS = 15.0
+
+STREAM_HEADERS = {
+    "Cache-Control": "no-store",
+    # don't let reverse proxies buffer the stream
+    "X-Accel-Buffering": "no",
+}
+
+def sse_message(event: dict) -> str:
+    return f"event: {event['type']}\ndata: {json.dumps(event['items'], separators=(',', ':'))}\n\n"
+
+async def live_events(request: Request, session_key: int, driver_number: int | None,
+                      heartbeat: float = HEARTBEAT_SECONDS):
+    """Yields Server-Sent Events for the laps and results ingest commits, until the client goes away."""
+    subscription = live_broker.subscribe(session_key, driver_number)
+    try:
+        # tells the client the subscription is in place, everything committed from now on is streamed
+        await asyncio.to_thread(live_broker.wait_listening, 10)
+        yield "event: ready\ndata: {}\n\n"
+        while not await request.is_disconnected():
+            try:
+                event = await asyncio.wait_for(subscription.queue.get(), heartbeat)
+            except asyncio.TimeoutError:
+                yield ": keep-alive\n\n"
+                continue
+            if event is None or subscription.overflowed:
+                # fell too far behind: the client reconnects and reloads the laps
+                yield "event: overflow\ndata: {}\n\n"
+                return
+            yield sse_message(event)
+    finally:
+        live_broker.unsubscribe(subscription)
+
+@router.get("/session/{session_key}/stream",
+            summary="Streams new laps and results of a live session",
+            description="Server-Sent Events stream of the laps and results of a session as they are ingested. "
+                        "Every 'laps' event holds only the laps that were added or changed, with the fields of "
+                        "/laps/{session_key}/{driver_number} plus driver_number; 'results' events hold changed "
+                        "result rows. A 'ready' event is sent once the stream is subscribed, and an 'overflow' "
+                        "event before closing if the client fell too far behind. Filter one driver with "
+                        "driver_number.",
+            response_class=StreamingResponse,
+)
+async def stream_session(request: Request, session_key: int,
+                         driver_number: int | None = Query(default=None, description="Only this driver's events.")):
+    return StreamingResponse(live_events(request, session_key, driver_number),
+                             media_type="text/event-stream", headers=STREAM_HEADERS)
@@ -0,0 +1,112 @@
+import time
+
+from fastapi import APIRouter, Depends, Response
+from prometheus_client import CONTENT_TYPE_LATEST, REGISTRY, Counter, Gauge, Histogram, generate_latest
+from prometheus_client.core import CounterMetricFamily, GaugeMetricFamily
+from prometheus_client.registry import Collector
+
+from backend.api.auth import require_admin_token
+from backend.api.cache_headers import no_store
+from backend.crud.cache import read_cache
+from backend.db.database import ASYNC_DB, engine
+from backend.db.pool import pool_status
+from backend.db.query_stats import count_queries
+
+"""
+Prometheus instrumentation of the API: MetricsMiddleware times every request and counts the SQL
+statements it ran, labelled with the route template ('/laps/{session_key}') so the number of
+series stays bounded. Read cache and connection pool statistics are collected when /metrics is
+scraped. Upstream (OpenF1) metrics are recorded by backend/db/upstream.py.
+"""
+
+router = APIRouter()
+
+# Streams stay open as long as the client follows the session: their duration says nothing about latency.
+UNTIMED_ROUTES = {"/session/{session_key}/stream", "/metrics"}
+
+REQUESTS = Counter("http_requests_total", "Requests answered.", ["method", "route", "status"])
+LATENCY = Histogram("http_request_duration_seconds", "Time to answer a request.", ["method", "route"],
+                    buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10))
+RESPONSE_SIZE = Histogram("http_response_size_bytes", "Response body size.", ["route"],
+                          buckets=(256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304))
+IN_FLIGHT = Gauge("http_requests_in_flight", "Requests being answered, including open streams.")
+DB_QUERIES = Histogram("http_request_db_queries", "SQL statements run to answer a request.", ["route"],
+                       buckets=(0, 1, 2, 3, 5, 10, 20, 50, 100))
+DB_TIME = Histogram("http_request_db_seconds", "Time spent in SQL statements to answer a request.", ["route"],
+                    buckets=(0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5))
+
+def route_template(scope: dict) -> str:
+    """Path template of the route that answered, set in the scope by FastAPI's router."""
+    return getattr(scope.get("route"), "path", "unmatched")
+
+
+class MetricsMiddleware:
+    """Pure ASGI middleware, so streamed responses pass through untouched."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        status, size = 500, 0
+
+        async def send_and_measure(message):
+            nonlocal status, size
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            elif message["type"] == "http.response.body":
+                size += len(message.get("body", b""))
+            await send(message)
+
+        IN_FLIGHT.inc()
+        started = time.perf_counter()
+        try:
+            with count_queries() as queries:
+                await self.app(scope, receive, send_and_measure)
+        finally:
+            IN_FLIGHT.dec()
+            route = route_template(scope)
+            REQUESTS.labels(scope["method"], route, str(status)).inc()
+            if route not in UNTIMED_ROUTES:
+                LATENCY.labels(scope["method"], route).observe(time.perf_counter() - started)
+                RESPONSE_SIZE.labels(route).observe(size)
+                DB_QUERIES.labels(route).observe(queries.count)
+                DB_TIME.labels(route).observe(queries.seconds)
+
+
+class CacheAndPoolCollector(Collector):
+    """Reads the read cache and connection pool statistics at scrape time."""
+
+    def collect(self):
+        stats = read_cache.stats()
+        for name, help_text in (("hits", "Read cache hits."), ("misses", "Read cache misses."),
+                                ("evictions", "Entries evicted from the read cache."),
+                                ("invalidations", "Read cache entries dropped for a newer data version.")):
+            yield CounterMetricFamily(f"read_cache_{name}", help_text, value=stats[name])
+        yield GaugeMetricFamily("read_cache_entries", "Entries in the read cache.", value=stats["entries"])
+        yield GaugeMetricFamily("read_cache_hit_ratio", "Share of read cache lookups that hit.",
+                                value=stats["hit_rate"])
+
+        pools = {"sync": pool_status(engine.pool)}
+        if ASYNC_DB:
+            from backend.db.async_database import async_engine
+            pools["async"] = pool_status(async_engine.pool)
+        checked_out = GaugeMetricFamily("db_pool_checked_out", "Connections in use.", labels=["pool"])
+        overflow = GaugeMetricFamily("db_pool_overflow", "Connections open beyond the pool size.", labels=["pool"])
+        checkouts = CounterMetricFamily("db_pool_checkouts", "Connections checked out.", labels=["pool"])
+        timeouts = CounterMetricFamily("db_pool_timeouts", "Checkouts that timed out.", labels=["pool"])
+        for name, status in pools.items():
+            checked_out.add_metric([name], status["checked_out"])
+            overflow.add_metric([name], status["overflow"])
+            checkouts.add_metric([name], status.get("checkouts", 0))
+            timeouts.add_metric([name], status.get("timeouts", 0))
+        yield from (checked_out, overflow, checkouts, timeouts)
+
+
+REGISTRY.register(CacheAndPoolCollector())
+
+@router.get("/metrics", include_in_schema=False, dependencies=[Depends(require_admin_token), Depends(no_store)])
+def read_metrics():
+    return Response(generate_latest(REGISTRY), media_type=CONTENT_TYPE_LATEST)
@@ -1,10 +1,61 @@
-from fastapi import APIRouter
+from datetime import datetime, timezone
+from fastapi import APIRouter, Depends, HTTPException
+from backend.api.cache_headers import (meeting_cache_headers, sessions_cache_headers, clock_cache_headers,
+                                       SessionCacheHeaders)
+from backend.api.json_responses import trusted_json_response
 from backend.db.db_utils import SessionDep
-from backend.crud.f1session import get_sessions_from_meeting_key, get_session_result
+from backend.crud.f1session import (get_sessions_from_meeting_key, get_session_result, get_sessions_in_range,
+                                    get_next_session, get_previous_session)
+from backend.crud.session_stats import get_session_driver_stats
+from backend.schemas.read_session_result import ReadSessionResult
+from backend.schemas.read_session_stats import DriverSessionStats
 
 router = APIRouter()
 
+def utc(value: datetime | None) -> datetime:
+    """The given time, or now, as an aware UTC datetime (naive query parameters are taken as UTC)."""
+    if value is None:
+        return datetime.now(timezone.utc)
+    if value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value.astimezone(timezone.utc)
+
+def found(f1session):
+    if f1session is None:
+        raise HTTPException(status_code=404, detail="No session found.")
+    return f1session
+
+# registered before /sessions/{meeting_key}
+@router.get("/sessions/range/",
+            dependencies=[Depends(sessions_cache_headers)],
+            summary="Gets sessions in a time range",
+            description="Returns all sessions starting at or after 'start' and before 'end', in start order. "
+                        "Times without an offset are taken as UTC."
+)
+def read_sessions_in_range(start: datetime, end: datetime, session: SessionDep):
+    start, end = utc(start), utc(end)
+    if end <= start:
+        raise HTTPException(status_code=400, detail="end must be after start.")
+    return get_sessions_in_range(session, start, end)
+
+@router.get("/sessions/next/",
+            dependencies=[Depends(clock_cache_headers)],
+            summary="Gets the next session",
+            description="Returns the first session starting after 'at' (default: now)."
+)
+def read_next_session(session: SessionDep, at: datetime | None = None):
+    return found(get_next_session(session, utc(at)))
+
+@router.get("/sessions/previous/",
+            dependencies=[Depends(clock_cache_headers)],
+            summary="Gets the previous session",
+            description="Returns the last session that started at or before 'at' (default: now)."
+)
+def read_previous_session(session: SessionDep, at: datetime | None = None):
+    return found(get_previous_session(session, utc(at)))
+
 @router.get("/sessions/{meeting_key}",
+            dependencies=[Depends(meeting_cache_headers)],
             summary="Gets sessions",
             description="Accesses de DB and fetches all sessions that happened in a given event."
                         "meeting_key is an Integer generated by OpenF1 that connects a F1 to everything that pertains it."
@@ -12,6 +63,15 @@ router = APIRouter()
 def read_sessions(meeting_key: int, session: SessionDep):
     return get_sessions_from_meeting_key(session, meeting_key)
 
-@router.get("/session_result/{session_key}")
-def read_session_result(session_key:int, session: SessionDep):
-    return get_session_result(session, session_key)
+@router.get("/session_result/{session_key}", response_model=ReadSessionResult)
+def read_session_result(session_key:int, session: SessionDep, cache_headers: SessionCacheHeaders):
+    return trusted_json_response(get_session_result(session, session_key), cache_headers)
+
+@router.get("/session_stats/{session_key}",
+            response_model=list[DriverSessionStats],
+            summary="Gets drivers' lap statistics",
+            description="Best lap, median clean lap, top speed trap and stint breakdown of every driver in a session, "
+                        "ordered by best lap. Computed when the session is ingested."
+)
+def read_session_stats(session_key: int, session: SessionDep, cache_headers: SessionCacheHeaders):
+    return trusted_json_response(get_session_driver_stats(session, session_key), cache_headers)
@@ -0,0 +1,236 @@
+"""
+Benchmark of the read API, run in-process through httpx's ASGI transport against the database in
+DATABASE_URL. Every route is driven at a fixed concurrency, and throughput, p50/p95/p99 latency,
+SQL statements and database time per request, and response size are reported per route. The read
+cache is disabled unless --read-cache is given, so every request reaches the database.
+
+Results can be saved as JSON (--output) and compared with a previous run (--baseline). The run
+fails (exit code 1) when a route errors, exceeds its p95 latency budget, gets slower than the
+baseline by more than --max-regression, or runs more statements per request than the baseline.
+
+Usage:
+    python -m backend.benchmarks.api --seed-seasons 3 --output baseline.json
+    python -m backend.benchmarks.api --requests 500 --concurrency 32 --baseline baseline.json --output run.json
+    python -m backend.benchmarks.api --routes laps --budget "/laps/{session_key}=80"
+"""
+
+import argparse, asyncio, itertools, json, os, subprocess, sys, time
+from datetime import datetime, timedelta, timezone
+
+from backend.benchmarks.db_modes import percentile
+
+# p95 budgets in milliseconds at the default concurrency, generous enough for a laptop: they catch
+# regressions of an order of magnitude, the baseline comparison catches the smaller ones.
+DEFAULT_P95_BUDGET_MS = 250.0
+P95_BUDGETS_MS = {
+    "/laps/{session_key}": 1000.0,
+    "/session/{session_key}/degradation": 750.0,
+    "/session/{session_key}/lapchart": 750.0,
+}
+# The read cache's data version polls add a few hundredths of a statement per request.
+QUERY_TOLERANCE = 0.1
+
+def race(targets: dict, i: int) -> dict:
+    return targets["races"][i % len(targets["races"])]
+
+# route template -> path of the i-th request, given the sessions picked by pick_targets
+ROUTES = {
+    "/events/years/": lambda t, i: "/events/years/",
+    "/events/{year}": lambda t, i: f"/events/{t['year']}",
+    "/teams/": lambda t, i: "/teams/",
+    "/sessions/{meeting_key}": lambda t, i: f"/sessions/{race(t, i)['meeting_key']}",
+    "/sessions/range/": lambda t, i: "/sessions/range/?start={}&end={}".format(*around(race(t, i)['date'], days=3)),
+    "/sessions/next/": lambda t, i: f"/sessions/next/?at={around(race(t, i)['date'])[0]}",
+    "/sessions/previous/": lambda t, i: f"/sessions/previous/?at={around(race(t, i)['date'])[0]}",
+    "/drivers/{session_key}": lambda t, i: f"/drivers/{race(t, i)['session_key']}",
+    "/session_result/{session_key} (race)": lambda t, i: f"/session_result/{race(t, i)['session_key']}",
+    "/session_result/{session_key} (qualifying)":
+        lambda t, i: f"/session_result/{t['qualifyings'][i % len(t['qualifyings'])]}",
+    "/session_stats/{session_key}": lambda t, i: f"/session_stats/{race(t, i)['session_key']}",
+    "/laps/{session_key}": lambda t, i: f"/laps/{race(t, i)['session_key']}",
+    "/laps/{session_key}/{driver_number}": lambda t, i: "/laps/{session_key}/{driver_number}".format(**race(t, i)),
+    "/session/{session_key}/degradation": lambda t, i: f"/session/{race(t, i)['session_key']}/degradation",
+    "/session/{session_key}/lapchart": lambda t, i: f"/session/{race(t, i)['session_key']}/lapchart",
+}
+
+def around(at: datetime, days: int = 0) -> tuple[str, str]:
+    """ISO timestamps an hour before 'at' and 'days' (plus an hour) after it."""
+    return ((at - timedelta(hours=1)).strftime("%Y-%m-%dT%H:%M:%SZ"),
+            (at + timedelta(days=days, hours=1)).strftime("%Y-%m-%dT%H:%M:%SZ"))
+
+def pick_targets(session, sessions: int) -> dict:
+    """The latest season and its most recent races (and qualifyings) that have results."""
+    from sqlalchemy import distinct, func
+    from sqlmodel import select
+    from backend.models.events import Event
+    from backend.models.session_driver import SessionDriver
+    from backend.models.session_result import SessionResult
+    from backend.models.sessions import F1Session
+
+    year = session.exec(select(func.max(Event.year))).one()
+    with_results = select(distinct(SessionResult.session_key))
+    latest = (select(F1Session).join(Event, Event.meeting_key == F1Session.meeting_key)
+              .where(Event.year == year, F1Session.session_key.in_(with_results))
+              .order_by(F1Session.date.desc()).limit(sessions))
+    races = session.exec(latest.where(F1Session.session_type == "Race")).all()
+    qualifyings = session.exec(latest.where(F1Session.session_type == "Qualifying")).all()
+    if year is None or not races or not qualifyings:
+        raise SystemExit("The database has no race and qualifying with results, seed it with --seed-seasons.")
+    return {
+        "year": year,
+        "races": [
+            {"session_key": race.session_key, "meeting_key": race.meeting_key, "date": race.date,
+             "driver_number": session.exec(select(func.min(SessionDriver.driver_number))
+                                           .where(SessionDriver.session_key == race.session_key)).one()}
+            for race in races
+        ],
+        "qualifyings": [qualifying.session_key for qualifying in qualifyings],
+    }
+
+async def drive(client, paths: list[str], requests: int, concurrency: int, warmup: int) -> tuple[list, float]:
+    """
+    Sends 'requests' requests cycling through 'paths' from 'concurrency' concurrent workers.
+    :return: One (seconds, status, bytes, statements, database seconds) sample per request, and the wall time.
+    """
+    from backend.db.query_stats import count_queries
+
+    for path in paths[:warmup]:
+        await client.get(path)
+    samples, counter = [], itertools.count()
+
+    async def worker():
+        while (index := next(counter)) < requests:
+            with count_queries() as queries:
+                started = time.perf_counter()
+                response = await client.get(paths[index % len(paths)])
+                elapsed = time.perf_counter() - started
+            samples.append((elapsed, response.status_code, len(response.content), queries.count, queries.seconds))
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return samples, time.perf_counter() - started
+
+def summarize(samples: list, wall: float) -> dict:
+    latencies = [sample[0] * 1000 for sample in samples]
+    return {
+        "requests": len(samples),
+        "errors": sum(1 for sample in samples if sample[1] >= 400),
+        "throughput_rps": round(len(samples) / wall, 1),
+        "p50_ms": round(percentile(latencies, 50), 2),
+        "p95_ms": round(percentile(latencies, 95), 2),
+        "p99_ms": round(percentile(latencies, 99), 2),
+        "queries_per_request": round(sum(sample[3] for sample in samples) / len(samples), 2),
+        "db_ms_per_request": round(sum(sample[4] for sample in samples) / len(samples) * 1000, 2),
+        "bytes_per_response": round(sum(sample[2] for sample in samples) / len(samples)),
+    }
+
+def check(results: dict, baseline: dict | None, budgets: dict[str, float], max_regression: float) -> list[str]:
+    """:return: One message per route that errored, broke its latency budget or regressed from the baseline."""
+    failures = []
+    for route, stats in results["routes"].items():
+        if stats["errors"]:
+            failures.append(f"{route}: {stats['errors']} error responses")
+        budget = budgets.get(route.split(" ")[0], DEFAULT_P95_BUDGET_MS)
+        if stats["p95_ms"] > budget:
+            failures.append(f"{route}: p95 {stats['p95_ms']}ms over its {budget:g}ms budget")
+        previous = (baseline or {}).get("routes", {}).get(route)
+        if previous is None:
+            continue
+        if stats["p95_ms"] > previous["p95_ms"] * (1 + max_regression):
+            failures.append(f"{route}: p95 {stats['p95_ms']}ms, baseline {previous['p95_ms']}ms")
+        if stats["queries_per_request"] > previous["queries_per_request"] + QUERY_TOLERANCE:
+            failures.append(f"{route}: {stats['queries_per_request']} statements per request, "
+                            f"baseline {previous['queries_per_request']}")
+    return failures
+
+def print_table(results: dict, baseline: dict | None):
+    print(f"{'route':<44}{'req/s':>9}{'p50':>9}{'p95':>9}{'p99':>9}{'queries':>9}{'db ms':>8}{'bytes':>10}")
+    for route, stats in results["routes"].items():
+        line = (f"{route:<44}{stats['throughput_rps']:>9}{stats['p50_ms']:>9}{stats['p95_ms']:>9}{stats['p99_ms']:>9}"
+                f"{stats['queries_per_request']:>9}{stats['db_ms_per_request']:>8}{stats['bytes_per_response']:>10}")
+        previous = (baseline or {}).get("routes", {}).get(route)
+        if previous and previous["p95_ms"]:
+            line += f"  p95 {(stats['p95_ms'] / previous['p95_ms'] - 1) * 100:+.0f}%"
+        print(line)
+
+def git_revision() -> str | None:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+async def run(args: argparse.Namespace, budgets: dict[str, float]) -> dict:
+    import httpx
+    from sqlmodel import Session
+    from backend.db.database import ASYNC_DB, engine
+    from backend.main import app
+
+    with Session(engine) as session:
+        targets = pick_targets(session, args.sessions)
+
+    routes = {route: path for route, path in ROUTES.items()
+              if not args.routes or any(name in route for name in args.routes)}
+    results = {
+        "revision": git_revision(),
+        "started_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "settings": {"requests": args.requests, "concurrency": args.concurrency, "sessions": args.sessions,
+                     "read_cache": args.read_cache, "async_db": ASYNC_DB, "year": targets["year"]},
+        "routes": {},
+    }
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://benchmark") as client:
+        for route, path in routes.items():
+            paths = [path(targets, i) for i in range(max(len(targets["races"]), len(targets["qualifyings"])))]
+            samples, wall = await drive(client, paths, args.requests, args.concurrency, args.warmup)
+            results["routes"][route] = summarize(samples, wall)
+    return results
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=200, help="Requests per route.")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--warmup", type=int, default=5, help="Untimed requests per route first.")
+    parser.add_argument("--sessions", type=int, default=5, help="Recent races the requests cycle through.")
+    parser.add_argument("--routes", action="append", help="Only routes containing this text, repeatable.")
+    parser.add_argument("--read-cache", action="store_true", help="Keep the read cache enabled.")
+    parser.add_argument("--seed-seasons", type=int, default=0,
+                        help="First reset the database and load this many synthetic seasons (see ingest.py).")
+    parser.add_argument("--seed", type=int, default=0, help="Seed of the synthetic seasons.")
+    parser.add_argument("--output", help="Write the results to this JSON file.")
+    parser.add_argument("--baseline", help="JSON results of a previous run to compare with.")
+    parser.add_argument("--max-regression", type=float, default=0.25,
+                        help="Allowed p95 slowdown relative to the baseline (0.25 is 25%%).")
+    parser.add_argument("--budget", action="append", default=[], metavar="ROUTE=MS",
+                        help=f"p95 budget of a route, repeatable (default {DEFAULT_P95_BUDGET_MS:g}, see P95_BUDGETS_MS).")
+    args = parser.parse_args()
+
+    budgets = dict(P95_BUDGETS_MS)
+    for budget in args.budget:
+        route, _, milliseconds = budget.rpartition("=")
+        budgets[route] = float(milliseconds)
+
+    if args.seed_seasons:
+        subprocess.run([sys.executable, "-m", "backend.benchmarks.ingest", "--mode", "backfill", "--reset",
+                        "--seasons", str(args.seed_seasons), "--seed", str(args.seed)], check=True)
+    if not args.read_cache:
+        # read by backend.crud.cache when the app is imported
+        os.environ["READ_CACHE_SIZE"] = "0"
+
+    results = asyncio.run(run(args, budgets))
+    baseline = None
+    if args.baseline:
+        with open(args.baseline) as file:
+            baseline = json.load(file)
+    print_table(results, baseline)
+    if args.output:
+        with open(args.output, "w") as file:
+            json.dump(results, file, indent=2)
+
+    failures = check(results, baseline, budgets, args.max_regression)
+    for failure in failures:
+        print(f"FAIL {failure}")
+    sys.exit(1 if failures else 0)
+
+if __name__ == "__main__":
+    main()
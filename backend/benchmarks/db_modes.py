@@ -0,0 +1,108 @@
+"""
+Load test comparing the sync (psycopg2 + threadpool) and async (asyncpg) database paths.
+Starts one uvicorn worker per mode against the database in DATABASE_URL, with the read cache
+disabled so every request reaches the database, then hammers the read endpoints.
+
+Usage:
+    python -m backend.benchmarks.db_modes --session-key 9519 --meeting-key 1236 --requests 2000 --concurrency 64
+"""
+
+import argparse, asyncio, os, statistics, subprocess, sys, time
+
+import httpx
+
+def endpoints(session_key: int, meeting_key: int, year: int) -> list[str]:
+    return [
+        f"/events/{year}",
+        f"/sessions/{meeting_key}",
+        f"/drivers/{session_key}",
+        f"/session_result/{session_key}",
+        f"/laps/{session_key}",
+    ]
+
+def percentile(values: list[float], pct: float) -> float:
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, round(pct / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+def start_server(mode: str, port: int) -> subprocess.Popen:
+    env = {**os.environ, "DB_ASYNC": "true" if mode == "async" else "false", "READ_CACHE_SIZE": "0"}
+    return subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "backend.main:app", "--port", str(port), "--log-level", "warning"],
+        env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+
+async def wait_until_ready(base_url: str, timeout: float = 30.0):
+    deadline = time.monotonic() + timeout
+    async with httpx.AsyncClient(base_url=base_url) as client:
+        while time.monotonic() < deadline:
+            try:
+                if (await client.get("/")).status_code == 200:
+                    return
+            except httpx.TransportError:
+                pass
+            await asyncio.sleep(0.2)
+    raise RuntimeError(f"Server at {base_url} did not start in {timeout}s")
+
+async def run_load(base_url: str, paths: list[str], total: int, concurrency: int) -> dict:
+    latencies, errors = [], 0
+    queue = asyncio.Queue()
+    for i in range(total):
+        queue.put_nowait(paths[i % len(paths)])
+
+    async def worker(client: httpx.AsyncClient):
+        nonlocal errors
+        while not queue.empty():
+            path = queue.get_nowait()
+            start = time.perf_counter()
+            response = await client.get(path)
+            latencies.append(time.perf_counter() - start)
+            if response.status_code != 200:
+                errors += 1
+
+    limits = httpx.Limits(max_connections=concurrency)
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=60) as client:
+        start = time.perf_counter()
+        await asyncio.gather(*(worker(client) for _ in range(concurrency)))
+        elapsed = time.perf_counter() - start
+
+    return {
+        "requests": total,
+        "errors": errors,
+        "throughput_rps": round(total / elapsed, 1),
+        "p50_ms": round(statistics.median(latencies) * 1000, 2),
+        "p95_ms": round(percentile(latencies, 95) * 1000, 2),
+        "p99_ms": round(percentile(latencies, 99) * 1000, 2),
+    }
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--session-key", type=int, default=9519)
+    parser.add_argument("--meeting-key", type=int, default=1236)
+    parser.add_argument("--year", type=int, default=2024)
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=64)
+    parser.add_argument("--port", type=int, default=8765)
+    args = parser.parse_args()
+
+    paths = endpoints(args.session_key, args.meeting_key, args.year)
+    results = {}
+    for mode in ("sync", "async"):
+        server = start_server(mode, args.port)
+        try:
+            base_url = f"http://127.0.0.1:{args.port}"
+            await wait_until_ready(base_url)
+            # warm up connection pools before measuring
+            await run_load(base_url, paths, len(paths) * 4, min(args.concurrency, 8))
+            results[mode] = await run_load(base_url, paths, args.requests, args.concurrency)
+        finally:
+            server.terminate()
+            server.wait()
+
+    columns = ["requests", "errors", "throughput_rps", "p50_ms", "p95_ms", "p99_ms"]
+    print(f"{'mode':<8}" + "".join(f"{column:>16}" for column in columns))
+    for mode, result in results.items():
+        print(f"{mode:<8}" + "".join(f"{result[column]:>16}" for column in columns))
+
+if __name__ == "__main__":
+    asyncio.run(main())
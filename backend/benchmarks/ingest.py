@@ -0,0 +1,81 @@
+"""
+Offline ingest benchmark: serves a synthetic data set from a local OpenF1 stand-in (see
+openf1_server.py) and times update_db or the bulk backfill loading it into the database in
+DATABASE_URL. The same seed and options always produce the same payloads and the same injected
+failures, so runs can be compared. Use a scratch database: --reset drops every table first.
+
+Usage:
+    python -m backend.benchmarks.ingest --mode update_db --seasons 1 --reset
+    python -m backend.benchmarks.ingest --mode backfill --seasons 5 --latency-ms 40 --throttle-rate 0.02 --reset
+"""
+
+import argparse, json, os, sys, time
+
+from backend.benchmarks.openf1_server import add_arguments, build, start_server
+
+TABLES = ("event", "f1session", "driver", "sessiondriver", "sessionlaps", "sessionresult", "sessiondriverstats",
+          "ingeststate")
+
+def row_counts(engine) -> dict[str, int]:
+    with engine.connect() as connection:
+        return {table: connection.exec_driver_sql(f"SELECT count(*) FROM {table}").scalar() for table in TABLES}
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    add_arguments(parser)
+    parser.add_argument("--mode", choices=("update_db", "backfill"), default="update_db")
+    parser.add_argument("--concurrency", type=int, default=None, help="Sessions prefetched in parallel.")
+    parser.add_argument("--rate-limit", type=float, default=1000.0,
+                        help="Client-side requests per second (OpenF1 itself allows about 3).")
+    parser.add_argument("--reset", action="store_true", help="Drop and recreate every table before ingesting.")
+    parser.add_argument("--json", action="store_true", help="Print the results as JSON.")
+    args = parser.parse_args()
+
+    data, faults = build(args)
+    server = start_server(data, faults=faults)
+    # read when backend.db.db_utils is imported: the on-disk cache would hide the server entirely
+    os.environ["OPENF1_URL_BASE"] = server.url_base
+    os.environ["OPENF1_CACHE"] = "off"
+    os.environ["OPENF1_RATE_LIMIT"] = str(args.rate_limit)
+    os.environ["OPENF1_BURST"] = str(max(3, int(args.rate_limit)))
+    os.environ.setdefault("DB_PROFILE", "ingest")
+
+    from sqlmodel import SQLModel
+    from backend.db.backfill import backfill
+    from backend.db.database import create_db_and_tables, engine
+    from backend.db.db_utils import upstream_client
+    from backend.db.update_db import INGEST_CONCURRENCY, update_db
+
+    if args.reset:
+        SQLModel.metadata.drop_all(engine)
+        create_db_and_tables(populating=False)
+
+    concurrency = args.concurrency or INGEST_CONCURRENCY
+    started = time.perf_counter()
+    if args.mode == "backfill":
+        backfill(list(range(args.start_year, args.start_year + args.seasons)), concurrency)
+    else:
+        update_db(concurrency)
+    elapsed = time.perf_counter() - started
+    server.shutdown()
+
+    results = {
+        "mode": args.mode,
+        "seasons": args.seasons,
+        "sessions": len(data.sessions()),
+        "seconds": round(elapsed, 2),
+        "sessions_per_second": round(len(data.sessions()) / elapsed, 2),
+        "rows": row_counts(engine),
+        "upstream": upstream_client.stats.snapshot(),
+        "server_requests": dict(server.requests),
+    }
+    if args.json:
+        json.dump(results, sys.stdout, indent=2)
+        print()
+        return
+    print(f"{args.mode}: {results['sessions']} sessions in {elapsed:.1f}s ({results['sessions_per_second']}/s)")
+    for name in ("rows", "upstream", "server_requests"):
+        print(f"  {name}: {results[name]}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,240 @@
+"""
+Local stand-in for the OpenF1 API serving a synthetic data set (see synthetic_openf1.py) under
+the same /v1/<endpoint> paths and query filters ('session_key=9523', 'date_start>=2024-05-26T13:00:00',
+'team_name=Red%20Bull%20Racing'). It can inject the failures of the real API: 429 responses with a
+Retry-After, 5xx errors, and latency. Point ingestion at it with OPENF1_URL_BASE:
+
+Usage:
+    python -m backend.benchmarks.openf1_server --seasons 3 --port 8181 --latency-ms 40 --throttle-rate 0.05
+    OPENF1_URL_BASE=http://127.0.0.1:8181/v1/ OPENF1_CACHE=off python -m backend.db.update_db
+"""
+
+import argparse, gzip, json, random, re, threading, time
+from collections import Counter
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import unquote, urlsplit
+
+from backend.benchmarks.synthetic_openf1 import SyntheticOpenF1
+
+ENDPOINTS = ("meetings", "sessions", "drivers", "laps", "stints", "session_result")
+# Endpoints whose rows are simulated per session, a filter on session_key or meeting_key is required.
+SESSION_ENDPOINTS = ("laps", "stints", "session_result")
+FILTER = re.compile(r"^([a-z0-9_]+)(>=|<=|>|<|=)(.*)$")
+GZIP_MIN_BYTES = 1024
+
+
+def parse_filters(query: str) -> list[tuple[str, str, str]]:
+    """OpenF1 filters are 'field<op>value' pairs joined by '&', e.g. 'session_key=9523&lap_number>=10'."""
+    filters = []
+    for part in query.split("&"):
+        match = FILTER.match(unquote(part))
+        if match:
+            filters.append(match.groups())
+    return filters
+
+
+def as_datetime(value: str) -> datetime:
+    parsed = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    return parsed if parsed.tzinfo else parsed.replace(tzinfo=timezone.utc)
+
+
+def matches(row: dict, field: str, op: str, value: str) -> bool:
+    current = row.get(field)
+    if current is None:
+        return False
+    if isinstance(current, bool):
+        value = value.lower() == "true"
+    elif isinstance(current, (int, float)):
+        value = float(value)
+    elif field.startswith("date"):
+        current, value = as_datetime(current), as_datetime(value)
+    if op == "=":
+        return current == value
+    if op == ">=":
+        return current >= value
+    if op == "<=":
+        return current <= value
+    if op == ">":
+        return current > value
+    return current < value
+
+
+class FaultInjector:
+    """
+    Decides, per request, whether to throttle it, fail it, and how long to delay it.
+    :param error_rate: Share of requests answered with a 5xx.
+    :param throttle_rate: Share of requests answered with a 429.
+    :param retry_after: Seconds in the Retry-After header of 429 responses.
+    :param latency_ms: Mean added latency, uniformly spread between half and one and a half of it.
+    :param seed: Seed of the fault sequence.
+    """
+
+    def __init__(self, error_rate: float = 0.0, throttle_rate: float = 0.0, retry_after: float = 1.0,
+                 latency_ms: float = 0.0, seed: int = 0):
+        self.error_rate = error_rate
+        self.throttle_rate = throttle_rate
+        self.retry_after = retry_after
+        self.latency_ms = latency_ms
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def decide(self) -> tuple[int | None, float]:
+        """:return: Status to fail the request with (None to serve it), and seconds to wait first."""
+        with self._lock:
+            roll = self._rng.random()
+            delay = self.latency_ms / 1000 * self._rng.uniform(0.5, 1.5)
+            status = None
+            if roll < self.throttle_rate:
+                status = 429
+            elif roll < self.throttle_rate + self.error_rate:
+                status = self._rng.choice([500, 502, 503])
+        return status, delay
+
+
+class SyntheticOpenF1Server(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address: tuple[str, int], data: SyntheticOpenF1, faults: FaultInjector | None = None,
+                 verbose: bool = False):
+        super().__init__(address, OpenF1RequestHandler)
+        self.data = data
+        self.faults = faults or FaultInjector()
+        self.verbose = verbose
+        self.requests = Counter()
+        self._lock = threading.Lock()
+
+    @property
+    def url_base(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}/v1/"
+
+    def count(self, key: str):
+        with self._lock:
+            self.requests[key] += 1
+
+    def latest_session_key(self) -> int:
+        now = datetime.now(timezone.utc)
+        sessions = self.data.sessions()
+        started = [session for session in sessions if as_datetime(session["date_start"]) <= now] or sessions
+        return max(started, key=lambda session: session["date_start"])["session_key"]
+
+    def query(self, endpoint: str, filters: list[tuple[str, str, str]]) -> list[dict]:
+        """Rows of an endpoint matching every filter. Raises ValueError for unsupported queries."""
+        filters = [(field, op, str(self.latest_session_key()) if value == "latest" and field == "session_key"
+                    else value) for field, op, value in filters]
+        if endpoint == "meetings":
+            rows = self.data.meetings()
+        elif endpoint == "sessions":
+            rows = self.data.sessions()
+        else:
+            session_keys = [int(value) for field, op, value in filters if field == "session_key" and op == "="]
+            if not session_keys:
+                meeting_keys = {float(value) for field, op, value in filters if field == "meeting_key" and op == "="}
+                sessions = self.data.sessions()
+                if meeting_keys:
+                    sessions = [session for session in sessions if session["meeting_key"] in meeting_keys]
+                elif endpoint in SESSION_ENDPOINTS:
+                    raise ValueError(f"'{endpoint}' needs a session_key or meeting_key filter")
+                session_keys = [session["session_key"] for session in sessions]
+            rows = [row for session_key in session_keys for row in getattr(self.data, endpoint)(session_key)]
+        return [row for row in rows if all(matches(row, *condition) for condition in filters)]
+
+
+class OpenF1RequestHandler(BaseHTTPRequestHandler):
+    # keep-alive, like api.openf1.org
+    protocol_version = "HTTP/1.1"
+    server: SyntheticOpenF1Server
+
+    def do_GET(self):
+        parts = urlsplit(self.path)
+        endpoint = parts.path.removeprefix("/v1/").strip("/")
+        if endpoint not in ENDPOINTS:
+            self.server.count("404")
+            return self.respond(404, {"detail": "Not Found"})
+
+        status, delay = self.server.faults.decide()
+        if delay:
+            time.sleep(delay)
+        if status == 429:
+            self.server.count("429")
+            return self.respond(429, {"error": "Rate limit exceeded"},
+                                {"Retry-After": f"{self.server.faults.retry_after:g}"})
+        if status:
+            self.server.count(str(status))
+            return self.respond(status, {"detail": "Injected failure"})
+
+        try:
+            rows = self.server.query(endpoint, parse_filters(parts.query))
+        except ValueError as e:
+            self.server.count("400")
+            return self.respond(400, {"detail": str(e)})
+        self.server.count(endpoint)
+        self.respond(200, rows)
+
+    def respond(self, status: int, payload, headers: dict | None = None):
+        body = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        if len(body) >= GZIP_MIN_BYTES and "gzip" in self.headers.get("Accept-Encoding", ""):
+            body = gzip.compress(body, compresslevel=5)
+            self.send_header("Content-Encoding", "gzip")
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+
+def start_server(data: SyntheticOpenF1, host: str = "127.0.0.1", port: int = 0,
+                 faults: FaultInjector | None = None) -> SyntheticOpenF1Server:
+    """Serves a data set from a background thread. Port 0 picks a free port, see server.url_base."""
+    server = SyntheticOpenF1Server((host, port), data, faults)
+    threading.Thread(target=server.serve_forever, name="synthetic-openf1", daemon=True).start()
+    return server
+
+
+def add_arguments(parser: argparse.ArgumentParser):
+    """Data set and fault injection options, shared with backend.benchmarks.ingest."""
+    parser.add_argument("--seasons", type=int, default=1, help="Number of seasons, 1 to 20.")
+    parser.add_argument("--start-year", type=int, default=2024)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Share of requests failing with a 5xx.")
+    parser.add_argument("--throttle-rate", type=float, default=0.0, help="Share of requests answered with a 429.")
+    parser.add_argument("--retry-after", type=float, default=1.0, help="Retry-After of 429 responses, in seconds.")
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="Mean latency added to every request.")
+
+
+def build(args: argparse.Namespace) -> tuple[SyntheticOpenF1, FaultInjector]:
+    if not 1 <= args.seasons <= 20:
+        raise SystemExit("--seasons must be between 1 and 20")
+    return (SyntheticOpenF1(seasons=args.seasons, start_year=args.start_year, seed=args.seed),
+            FaultInjector(args.error_rate, args.throttle_rate, args.retry_after, args.latency_ms, seed=args.seed))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    add_arguments(parser)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8181)
+    parser.add_argument("--verbose", action="store_true", help="Log every request.")
+    args = parser.parse_args()
+
+    data, faults = build(args)
+    server = SyntheticOpenF1Server((args.host, args.port), data, faults, verbose=args.verbose)
+    print(f"Serving {len(data.meetings())} meetings and {len(data.sessions())} sessions at {server.url_base}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        print(f"Requests served: {dict(server.requests)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+"""
+Measures the read queries against the database in DATABASE_URL with the indexes of every
+migration ("after") and without them ("before"). The "before" pass runs the migrations'
+downgrade inside a transaction that is rolled back, so nothing is changed, but the touched
+tables are locked while it runs: don't point it at a database serving traffic.
+
+Usage:
+    python -m backend.benchmarks.query_plans --session-key 9519 --driver-number 16 --runs 200
+"""
+
+import argparse, json, statistics
+
+from sqlalchemy.dialects import postgresql
+from sqlmodel import desc, select
+
+from backend.benchmarks.db_modes import percentile
+from backend.crud.analytics import session_lap_rows_statement
+from backend.crud.driver import session_drivers_statement
+from backend.crud.f1session import session_result_statement
+from backend.crud.lap import driver_info_statement, session_laps_statement
+from backend.crud.session_stats import session_stats_statement
+from backend.db.database import engine
+from backend.db.migrate import discover_migrations
+from backend.models.sessions import F1Session
+
+def queries(session_key: int, driver_number: int) -> dict:
+    return {
+        "session_laps": session_laps_statement(session_key),
+        "session_laps_filtered": session_laps_statement(session_key, [driver_number]),
+        "lap_rows (analytics)": session_lap_rows_statement(session_key),
+        "session_drivers": session_drivers_statement(session_key),
+        "single_driver": driver_info_statement(session_key, driver_number),
+        "session_result": session_result_statement(session_key),
+        "session_stats": session_stats_statement(session_key),
+        "latest_session": select(F1Session).order_by(desc(F1Session.date)).limit(1),
+    }
+
+def compile_sql(statement) -> str:
+    return str(statement.compile(dialect=postgresql.dialect(), compile_kwargs={"literal_binds": True}))
+
+def plan_nodes(plan: dict) -> list[str]:
+    """Scan nodes of an EXPLAIN (FORMAT JSON) plan, e.g. 'Index Only Scan on ix_sessionlaps_session_driver_lap'."""
+    nodes = []
+    if "Scan" in plan["Node Type"]:
+        nodes.append(f"{plan['Node Type']} on {plan.get('Index Name') or plan.get('Relation Name')}")
+    for child in plan.get("Plans", []):
+        nodes.extend(plan_nodes(child))
+    return nodes
+
+def measure(connection, sql: str, runs: int) -> dict:
+    """
+    Runs a query 'runs' times under EXPLAIN ANALYZE, so the timings are the server's execution
+    times without the cost of sending and decoding rows, which indexes don't change.
+    """
+    explain = f"EXPLAIN (ANALYZE, FORMAT JSON) {sql}"
+    connection.exec_driver_sql(explain).scalar()
+    timings = []
+    for _ in range(runs):
+        result = connection.exec_driver_sql(explain).scalar()[0]
+        timings.append(result["Execution Time"])
+    return {
+        "p50_ms": round(statistics.median(timings), 3),
+        "p99_ms": round(percentile(timings, 99), 3),
+        "plan": plan_nodes(result["Plan"]),
+    }
+
+def run_pass(connection, sqls: dict[str, str], runs: int) -> dict:
+    return {name: measure(connection, sql, runs) for name, sql in sqls.items()}
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--session-key", type=int, default=9519)
+    parser.add_argument("--driver-number", type=int, default=16)
+    parser.add_argument("--runs", type=int, default=200)
+    parser.add_argument("--json", action="store_true", help="print the raw results as JSON")
+    args = parser.parse_args()
+
+    sqls = {name: compile_sql(statement) for name, statement in queries(args.session_key, args.driver_number).items()}
+    results = {}
+    with engine.connect() as connection:
+        results["after"] = run_pass(connection, sqls, args.runs)
+        connection.rollback()
+
+        with connection.begin() as transaction:
+            for _, _, module in reversed(discover_migrations()):
+                module.downgrade(connection)
+            connection.exec_driver_sql("ANALYZE sessionlaps, sessiondriver, sessionresult, f1session")
+            results["before"] = run_pass(connection, sqls, args.runs)
+            transaction.rollback()
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+
+    print(f"{'query':<24}{'before p50':>12}{'before p99':>12}{'after p50':>12}{'after p99':>12}  after plan")
+    for name in sqls:
+        before, after = results["before"][name], results["after"][name]
+        print(f"{name:<24}{before['p50_ms']:>12}{before['p99_ms']:>12}{after['p50_ms']:>12}{after['p99_ms']:>12}"
+              f"  {', '.join(after['plan'])}")
+
+if __name__ == "__main__":
+    main()
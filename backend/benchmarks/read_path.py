@@ -0,0 +1,162 @@
+"""
+Measures the CPU time and memory each hot read costs in the API process, comparing the column
+selects the crud layer runs ("core") with loading full ORM entities and copying them into the
+response models ("orm"), the way those reads used to work. Every call gets its own database
+session, like a request, and the read cache is bypassed. CPU time is the process' own, so time
+spent waiting for Postgres isn't counted; memory is the peak traced by tracemalloc during a call,
+measured in a separate pass since tracing slows everything down.
+Both versions must return the same response, otherwise the run exits with status 1.
+
+Usage:
+    python -m backend.benchmarks.read_path --session-key 9523 --driver-number 16 --runs 300
+"""
+
+import argparse, json, statistics, sys, time, tracemalloc
+
+from fastapi.encoders import jsonable_encoder
+from sqlmodel import Session, select
+
+from backend.api.laps import build_driver_laps
+from backend.crud.driver import get_drivers_from_session_key
+from backend.crud.f1session import get_session_result, lapped_gap
+from backend.crud.lap import get_driver_lap_times
+from backend.db.database import engine
+from backend.db.db_utils import FALLBACK_COMPOUND
+from backend.models.driver import Driver
+from backend.models.session_driver import SessionDriver
+from backend.models.session_laps import SessionLaps
+from backend.models.session_result import SessionResult
+from backend.schemas.driver_laps_schema import DriverLapsRead, LapRead
+from backend.schemas.read_driver import DriverSessionInfo
+from backend.schemas.read_session_result import DriverPosition, ReadSessionResult
+
+def orm_drivers(session: Session, session_key: int) -> list[DriverSessionInfo]:
+    rows = session.exec(
+        select(Driver, SessionDriver).join(SessionDriver).where(SessionDriver.session_key == session_key)
+    ).all()
+    return [
+        DriverSessionInfo(driver_number=session_link.driver_number, team=session_link.team,
+                          first_name=driver.first_name, last_name=driver.last_name,
+                          name_acronym=driver.name_acronym, headshot_url=driver.headshot_url)
+        for driver, session_link in rows
+    ]
+
+def orm_session_result(session: Session, session_key: int) -> ReadSessionResult:
+    rows = session.exec(
+        select(SessionResult, Driver, SessionDriver)
+        .select_from(SessionResult)
+        .join(Driver, SessionResult.driver_id == Driver.id)
+        .join(SessionDriver, Driver.id == SessionDriver.driver_id)
+        .where(SessionResult.session_key == session_key, SessionDriver.session_key == session_key)
+        .order_by(SessionResult.position)
+    ).all()
+    return ReadSessionResult(result=[
+        DriverPosition(position=result.position, team=session_link.team, first_name=driver.first_name,
+                       last_name=driver.last_name, number_of_laps=result.number_of_laps,
+                       gap_to_leader=lapped_gap(result.laps_behind) if result.lapped else result.gap_to_leader,
+                       duration=result.duration, q1=result.q1, q2=result.q2, q3=result.q3, lapped=result.lapped,
+                       laps_behind=result.laps_behind, dnf=result.dnf, dns=result.dns, dsq=result.dsq)
+        for result, driver, session_link in rows
+    ])
+
+def orm_driver_laps(session: Session, session_key: int, driver_number: int) -> DriverLapsRead:
+    driver, session_data = session.exec(
+        select(Driver, SessionDriver).join(SessionDriver)
+        .where(SessionDriver.session_key == session_key, SessionDriver.driver_number == driver_number)
+    ).first()
+    laps = session.exec(
+        select(SessionLaps).where(SessionLaps.driver_id == driver.id, SessionLaps.session_key == session_key)
+    ).all()
+    return DriverLapsRead(
+        driver_number=session_data.driver_number, first_name=driver.first_name, last_name=driver.last_name,
+        team=session_data.team, headshot_url=driver.headshot_url,
+        laps=[LapRead(lap_number=lap.lap_number or 0, time=lap.lap_time or 0.0, speed_trap=lap.st_speed or 0,
+                      is_pit_out_lap=lap.is_pit_out_lap or False, compound=lap.compound or FALLBACK_COMPOUND)
+              for lap in laps],
+    )
+
+def reads(session_key: int, driver_number: int) -> dict[str, dict]:
+    """
+    Both versions of every read, each taking a database session and returning what the route
+    serializes. The cached crud functions are called through __wrapped__ to skip the read cache,
+    and encoded the way the cache encodes them.
+    """
+    return {
+        "drivers": {
+            "orm": lambda session: jsonable_encoder(orm_drivers(session, session_key)),
+            "core": lambda session: jsonable_encoder(get_drivers_from_session_key.__wrapped__(session, session_key)),
+        },
+        "session_result": {
+            "orm": lambda session: jsonable_encoder(orm_session_result(session, session_key)),
+            "core": lambda session: jsonable_encoder(get_session_result.__wrapped__(session, session_key)),
+        },
+        "driver_laps": {
+            "orm": lambda session: jsonable_encoder(orm_driver_laps(session, session_key, driver_number)),
+            "core": lambda session: jsonable_encoder(
+                build_driver_laps(*get_driver_lap_times(session, session_key, driver_number))),
+        },
+    }
+
+def call(read):
+    with Session(engine) as session:
+        return read(session)
+
+def measure(read, runs: int) -> dict:
+    for _ in range(min(runs, 20)):
+        call(read)
+
+    cpu_times = []
+    for _ in range(runs):
+        started = time.process_time()
+        call(read)
+        cpu_times.append(time.process_time() - started)
+
+    peaks = []
+    tracemalloc.start()
+    try:
+        for _ in range(min(runs, 50)):
+            tracemalloc.reset_peak()
+            baseline = tracemalloc.get_traced_memory()[0]
+            call(read)
+            peaks.append(tracemalloc.get_traced_memory()[1] - baseline)
+    finally:
+        tracemalloc.stop()
+
+    return {
+        "cpu_ms": round(statistics.median(cpu_times) * 1000, 3),
+        "cpu_mean_ms": round(statistics.fmean(cpu_times) * 1000, 3),
+        "peak_kib": round(statistics.median(peaks) / 1024, 1),
+    }
+
+def saving(before: float, after: float) -> str:
+    return f"{(before - after) / before:.0%}" if before else "-"
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--session-key", type=int, default=9523, help="a race, so every driver has a full set of laps")
+    parser.add_argument("--driver-number", type=int, default=16)
+    parser.add_argument("--runs", type=int, default=300)
+    parser.add_argument("--json", action="store_true", help="print the raw results as JSON")
+    args = parser.parse_args()
+
+    results, mismatches = {}, []
+    for name, versions in reads(args.session_key, args.driver_number).items():
+        if call(versions["orm"]) != call(versions["core"]):
+            mismatches.append(name)
+        results[name] = {version: measure(read, args.runs) for version, read in versions.items()}
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+    else:
+        print(f"{'read':<16}{'orm cpu ms':>12}{'core cpu ms':>12}{'saved':>8}{'orm KiB':>10}{'core KiB':>10}{'saved':>8}")
+        for name, result in results.items():
+            orm, core = result["orm"], result["core"]
+            print(f"{name:<16}{orm['cpu_ms']:>12}{core['cpu_ms']:>12}{saving(orm['cpu_ms'], core['cpu_ms']):>8}"
+                  f"{orm['peak_kib']:>10}{core['peak_kib']:>10}{saving(orm['peak_kib'], core['peak_kib']):>8}")
+
+    if mismatches:
+        print(f"core and orm responses differ for: {', '.join(mismatches)}", file=sys.stderr)
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
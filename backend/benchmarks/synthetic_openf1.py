@@ -0,0 +1,391 @@
+import math, random
+from collections import namedtuple
+from datetime import date, datetime, time, timedelta, timezone
+from functools import lru_cache
+
+"""
+Generates realistic OpenF1 payloads (meetings, sessions, drivers, laps, stints, session_result) for
+any number of seasons, with the fields and shapes of the real API, so ingestion and the API can be
+benchmarked without api.openf1.org. Everything is derived from a seed, so the same arguments
+always give the same data; per-session payloads are only simulated when requested.
+
+A season has 24 meetings (six of them sprint weekends). Races have fuel and tyre effects,
+pit stops, safety cars, retirements and lapped cars; qualifying has three knock-out segments.
+Monaco 2024 keeps its real keys (meeting 1236, qualifying 9519, race 9523) so the API tests in
+backend/tests run against a database loaded from the synthetic 2024 season.
+"""
+
+Circuit = namedtuple("Circuit", "location country_name country_code circuit_short_name base_lap race_laps")
+Car = namedtuple("Car", "driver_number first_name last_name name_acronym team_name team_colour pace")
+
+CIRCUITS = [
+    Circuit("Sakhir", "Bahrain", "BRN", "Sakhir", 93.0, 57),
+    Circuit("Jeddah", "Saudi Arabia", "KSA", "Jeddah", 90.5, 50),
+    Circuit("Melbourne", "Australia", "AUS", "Melbourne", 79.5, 58),
+    Circuit("Suzuka", "Japan", "JPN", "Suzuka", 93.5, 53),
+    Circuit("Shanghai", "China", "CHN", "Shanghai", 96.5, 56),
+    Circuit("Miami", "United States", "USA", "Miami", 90.5, 57),
+    Circuit("Imola", "Italy", "ITA", "Imola", 78.5, 63),
+    Circuit("Monaco", "Monaco", "MON", "Monte Carlo", 74.5, 78),
+    Circuit("Montréal", "Canada", "CAN", "Montreal", 75.0, 70),
+    Circuit("Barcelona", "Spain", "ESP", "Catalunya", 76.5, 66),
+    Circuit("Spielberg", "Austria", "AUT", "Spielberg", 67.5, 71),
+    Circuit("Silverstone", "United Kingdom", "GBR", "Silverstone", 90.0, 52),
+    Circuit("Budapest", "Hungary", "HUN", "Hungaroring", 80.0, 70),
+    Circuit("Spa-Francorchamps", "Belgium", "BEL", "Spa-Francorchamps", 107.0, 44),
+    Circuit("Zandvoort", "Netherlands", "NED", "Zandvoort", 74.0, 72),
+    Circuit("Monza", "Italy", "ITA", "Monza", 83.0, 53),
+    Circuit("Baku", "Azerbaijan", "AZE", "Baku", 105.0, 51),
+    Circuit("Marina Bay", "Singapore", "SGP", "Singapore", 96.0, 62),
+    Circuit("Austin", "United States", "USA", "Austin", 98.0, 56),
+    Circuit("Mexico City", "Mexico", "MEX", "Mexico City", 80.5, 71),
+    Circuit("São Paulo", "Brazil", "BRA", "Interlagos", 73.0, 71),
+    Circuit("Las Vegas", "United States", "USA", "Las Vegas", 95.5, 50),
+    Circuit("Lusail", "Qatar", "QAT", "Lusail", 85.0, 57),
+    Circuit("Yas Island", "United Arab Emirates", "UAE", "Yas Marina Circuit", 86.5, 58),
+]
+SPRINT_ROUNDS = {5, 6, 11, 19, 21, 23}
+
+# (team, colour, pace offset in seconds) and its two drivers
+TEAMS = [
+    ("Red Bull Racing", "3671C6", 0.0, [(1, "Max", "Verstappen", "VER"), (11, "Sergio", "Perez", "PER")]),
+    ("McLaren", "FF8000", 0.1, [(4, "Lando", "Norris", "NOR"), (81, "Oscar", "Piastri", "PIA")]),
+    ("Ferrari", "E8002D", 0.15, [(16, "Charles", "Leclerc", "LEC"), (55, "Carlos", "Sainz", "SAI")]),
+    ("Mercedes", "27F4D2", 0.35, [(44, "Lewis", "Hamilton", "HAM"), (63, "George", "Russell", "RUS")]),
+    ("Aston Martin", "229971", 0.8, [(14, "Fernando", "Alonso", "ALO"), (18, "Lance", "Stroll", "STR")]),
+    ("RB", "6692FF", 1.0, [(22, "Yuki", "Tsunoda", "TSU"), (3, "Daniel", "Ricciardo", "RIC")]),
+    ("Haas F1 Team", "B6BABD", 1.1, [(27, "Nico", "Hulkenberg", "HUL"), (20, "Kevin", "Magnussen", "MAG")]),
+    ("Alpine", "FF87BC", 1.2, [(10, "Pierre", "Gasly", "GAS"), (31, "Esteban", "Ocon", "OCO")]),
+    ("Williams", "64C4FF", 1.3, [(23, "Alexander", "Albon", "ALB"), (2, "Logan", "Sargeant", "SAR")]),
+    ("Kick Sauber", "52E252", 1.5, [(77, "Valtteri", "Bottas", "BOT"), (24, "Guanyu", "Zhou", "ZHO")]),
+]
+
+# (session_name, session_type, day offset from the race, start time UTC, duration)
+WEEKEND = [
+    ("Practice 1", "Practice", -2, time(11, 30), timedelta(hours=1)),
+    ("Practice 2", "Practice", -2, time(15, 0), timedelta(hours=1)),
+    ("Practice 3", "Practice", -1, time(10, 30), timedelta(hours=1)),
+    ("Qualifying", "Qualifying", -1, time(14, 0), timedelta(hours=1)),
+    ("Race", "Race", 0, time(13, 0), timedelta(hours=2)),
+]
+SPRINT_WEEKEND = [
+    ("Practice 1", "Practice", -2, time(11, 30), timedelta(hours=1)),
+    ("Sprint Qualifying", "Qualifying", -2, time(15, 30), timedelta(minutes=45)),
+    ("Sprint", "Race", -1, time(10, 0), timedelta(hours=1)),
+    ("Qualifying", "Qualifying", -1, time(14, 0), timedelta(hours=1)),
+    ("Race", "Race", 0, time(13, 0), timedelta(hours=2)),
+]
+
+# Real keys kept for the sessions the API tests use: (year, round) -> meeting key and session keys by name.
+KNOWN_KEYS = {
+    (2024, 8): (1236, {"Practice 1": 9515, "Practice 2": 9516, "Practice 3": 9517, "Qualifying": 9519, "Race": 9523}),
+}
+
+# Seconds lost per lap of tyre age, and per lap of fuel on board.
+TYRE_DEGRADATION = {"SOFT": 0.09, "MEDIUM": 0.055, "HARD": 0.035}
+FUEL_EFFECT = 0.055
+PIT_LOSS = 20.0
+SAFETY_CAR_FACTOR = 1.4
+# Qualifying segments: (minutes after the session start, cars taking part)
+QUALIFYING_SEGMENTS = [(0, 20), (25, 15), (47, 10)]
+
+
+def timestamp(value: datetime) -> str:
+    return value.isoformat(timespec="milliseconds")
+
+
+class SyntheticOpenF1:
+    """
+    Synthetic OpenF1 data set.
+    :param seasons: Number of consecutive seasons.
+    :param start_year: Year of the first season.
+    :param seed: Seed every payload derives from.
+    """
+
+    def __init__(self, seasons: int = 1, start_year: int = 2024, seed: int = 0):
+        self.seasons = seasons
+        self.start_year = start_year
+        self.seed = seed
+        self._meetings: list[dict] = []
+        self._sessions: dict[int, dict] = {}
+        for season in range(seasons):
+            self._build_season(start_year + season, season)
+
+    def _build_season(self, year: int, season_index: int):
+        first_race = date(year, 3, 2)
+        first_race += timedelta(days=(6 - first_race.weekday()) % 7)
+        for round_number, circuit in enumerate(CIRCUITS, 1):
+            # 24 rounds spread over 39 weeks, March to December, which puts Monaco 2024 on its real date
+            race_day = first_race + timedelta(weeks=(round_number - 1) * 12 // 7)
+            meeting_key, known_sessions = KNOWN_KEYS.get(
+                (year, round_number), (20000 + season_index * 100 + round_number, {})
+            )
+            circuit_key = CIRCUITS.index(circuit) + 1
+            common = {
+                "meeting_key": meeting_key, "circuit_key": circuit_key, "circuit_short_name": circuit.circuit_short_name,
+                "location": circuit.location, "country_key": circuit_key, "country_code": circuit.country_code,
+                "country_name": circuit.country_name, "gmt_offset": "00:00:00", "year": year,
+            }
+            weekend = SPRINT_WEEKEND if round_number in SPRINT_ROUNDS else WEEKEND
+            self._meetings.append({
+                **common,
+                "meeting_code": circuit.country_code,
+                "meeting_name": f"{circuit.country_name} Grand Prix",
+                "meeting_official_name": f"FORMULA 1 {circuit.country_name.upper()} GRAND PRIX {year}",
+                "date_start": timestamp(datetime.combine(race_day + timedelta(days=-2), weekend[0][3], timezone.utc)),
+            })
+            for index, (name, session_type, day, start, duration) in enumerate(weekend):
+                session_key = known_sessions.get(name, meeting_key * 10 + index)
+                date_start = datetime.combine(race_day + timedelta(days=day), start, timezone.utc)
+                self._sessions[session_key] = {
+                    **common,
+                    "session_key": session_key, "session_type": session_type, "session_name": name,
+                    "date_start": timestamp(date_start), "date_end": timestamp(date_start + duration),
+                    # not part of the OpenF1 payload, stripped by sessions()
+                    "_race_laps": circuit.race_laps if name == "Race" else math.ceil(circuit.race_laps / 3),
+                    "_base_lap": circuit.base_lap,
+                }
+
+    def meetings(self) -> list[dict]:
+        return list(self._meetings)
+
+    def sessions(self) -> list[dict]:
+        return [{key: value for key, value in session.items() if not key.startswith("_")}
+                for session in self._sessions.values()]
+
+    def session(self, session_key: int) -> dict | None:
+        return self._sessions.get(session_key)
+
+    def grid(self, year: int) -> list[Car]:
+        """The 20 cars of a season, with each team's pace shuffled a little from year to year."""
+        rng = random.Random(f"{self.seed}:grid:{year}")
+        cars = []
+        for team_name, colour, team_pace, drivers in TEAMS:
+            season_pace = max(0.0, team_pace + rng.gauss(0, 0.25))
+            for number, first_name, last_name, acronym in drivers:
+                cars.append(Car(number, first_name, last_name, acronym, team_name, colour,
+                                season_pace + rng.uniform(0, 0.4)))
+        return cars
+
+    def drivers(self, session_key: int) -> list[dict]:
+        session = self._sessions.get(session_key)
+        if session is None:
+            return []
+        return [
+            {
+                "session_key": session_key, "meeting_key": session["meeting_key"], "driver_number": car.driver_number,
+                "broadcast_name": f"{car.first_name[0]} {car.last_name.upper()}",
+                "full_name": f"{car.first_name} {car.last_name.upper()}", "first_name": car.first_name,
+                "last_name": car.last_name, "name_acronym": car.name_acronym, "team_name": car.team_name,
+                "team_colour": car.team_colour, "country_code": None,
+                "headshot_url": f"https://media.formula1.com/d_driver_fallback_image.png/{car.name_acronym}.png",
+            }
+            for car in self.grid(session["year"])
+        ]
+
+    def laps(self, session_key: int) -> list[dict]:
+        return self.simulate(session_key)["laps"]
+
+    def stints(self, session_key: int) -> list[dict]:
+        return self.simulate(session_key)["stints"]
+
+    def session_result(self, session_key: int) -> list[dict]:
+        return self.simulate(session_key)["session_result"]
+
+    @lru_cache(maxsize=32)
+    def simulate(self, session_key: int) -> dict[str, list[dict]]:
+        """Simulates a session once, its laps, stints and results are usually requested together."""
+        session = self._sessions.get(session_key)
+        if session is None:
+            return {"laps": [], "stints": [], "session_result": []}
+        rng = random.Random(f"{self.seed}:{session_key}")
+        simulation = SessionSimulation(session, self.grid(session["year"]), rng)
+        if session["session_type"] == "Race":
+            simulation.race()
+        elif session["session_type"] == "Qualifying":
+            simulation.qualifying()
+        else:
+            simulation.practice()
+        return {"laps": simulation.laps, "stints": simulation.stints, "session_result": simulation.results}
+
+
+class SessionSimulation:
+    """Builds the laps, stints and results of one session."""
+
+    def __init__(self, session: dict, grid: list[Car], rng: random.Random):
+        self.session = session
+        self.grid = grid
+        self.rng = rng
+        self.base_lap = session["_base_lap"]
+        self.start = datetime.fromisoformat(session["date_start"])
+        self.laps: list[dict] = []
+        self.stints: list[dict] = []
+        self.results: list[dict] = []
+
+    def keys(self) -> dict:
+        return {"meeting_key": self.session["meeting_key"], "session_key": self.session["session_key"]}
+
+    def add_lap(self, car: Car, lap_number: int, started: float, duration: float | None, pit_out: bool):
+        speed = round(self.rng.gauss(305, 8)) if self.rng.random() > 0.03 else None
+        sectors = [None, None, None] if duration is None else \
+            [round(duration * share, 3) for share in (0.31, 0.38, 0.31)]
+        self.laps.append({
+            **self.keys(), "driver_number": car.driver_number, "lap_number": lap_number,
+            "date_start": timestamp(self.start + timedelta(seconds=started)),
+            "lap_duration": None if duration is None else round(duration, 3), "is_pit_out_lap": pit_out,
+            "duration_sector_1": sectors[0], "duration_sector_2": sectors[1], "duration_sector_3": sectors[2],
+            "i1_speed": None if speed is None else speed - 40, "i2_speed": None if speed is None else speed - 25,
+            "st_speed": speed,
+        })
+
+    def add_stint(self, car: Car, stint_number: int, lap_start: int, lap_end: int, compound: str, age: int):
+        self.stints.append({
+            **self.keys(), "driver_number": car.driver_number, "stint_number": stint_number,
+            "lap_start": lap_start, "lap_end": lap_end, "compound": compound, "tyre_age_at_start": age,
+        })
+
+    def add_result(self, car: Car, position: int | None, number_of_laps: int, duration, gap_to_leader,
+                   dnf: bool = False, dns: bool = False):
+        self.results.append({
+            **self.keys(), "driver_number": car.driver_number, "position": position,
+            "number_of_laps": number_of_laps, "duration": duration, "gap_to_leader": gap_to_leader,
+            "dnf": dnf, "dns": dns, "dsq": False,
+        })
+
+    def push_lap(self, car: Car, fuel_laps: float = 0.0, compound: str = "SOFT", age: int = 0) -> float:
+        return (self.base_lap + car.pace + FUEL_EFFECT * fuel_laps + TYRE_DEGRADATION[compound] * age
+                + self.rng.gauss(0, 0.2))
+
+    def race(self):
+        rng, race_laps = self.rng, self.session["_race_laps"]
+        full_race = self.session["session_name"] == "Race"
+        safety_car = set()
+        for _ in range(rng.choice([0, 0, 1, 1, 2]) if race_laps > 10 else 0):
+            first = rng.randint(2, race_laps - 4)
+            safety_car |= set(range(first, first + rng.randint(3, 5)))
+
+        cars = []
+        for grid_slot, car in enumerate(sorted(self.grid, key=lambda car: car.pace + rng.gauss(0, 0.3))):
+            if rng.random() < 0.01:
+                cars.append((car, [], [], True, None))
+                continue
+            retired_on = rng.randint(1, race_laps) if rng.random() < 0.06 else None
+            stops = sorted(rng.sample(range(int(race_laps * 0.25), int(race_laps * 0.8)), rng.choice([1, 1, 2]))) \
+                if full_race else []
+            compounds = [rng.choice(["MEDIUM", "SOFT"])] + [rng.choice(["HARD", "MEDIUM"]) for _ in stops]
+            clock, times, stints, stint, stint_start = grid_slot * 0.25, [], [], 0, 1
+            for lap in range(1, (retired_on or race_laps) + 1):
+                compound = compounds[stint]
+                duration = self.push_lap(car, race_laps - lap, compound, lap - stint_start)
+                if lap == 1:
+                    duration += 5.0 + grid_slot * 0.15
+                if lap in safety_car:
+                    duration *= SAFETY_CAR_FACTOR
+                if lap in stops:
+                    duration += 1.5
+                if lap - 1 in stops:
+                    duration += PIT_LOSS
+                if rng.random() < 0.03:
+                    duration += rng.uniform(0.5, 4.0)
+                times.append((lap, clock, duration, lap - 1 in stops))
+                clock += duration
+                if lap in stops:
+                    stints.append((stint + 1, stint_start, lap, compound, 0 if stint else 3))
+                    stint, stint_start = stint + 1, lap + 1
+            stints.append((stint + 1, stint_start, len(times), compounds[stint], 0 if stint else 3))
+            cars.append((car, times, stints, False, retired_on))
+
+        # the chequered flag falls when the leader completes the last lap, everyone else finishes the lap they're on
+        finishers = [times for _, times, _, dns, retired_on in cars if not dns and retired_on is None]
+        flag = min(times[-1][1] + times[-1][2] for times in finishers)
+        classified = []
+        for car, times, stints, dns, retired_on in cars:
+            if not dns and retired_on is None:
+                times = [lap for lap in times if lap[1] < flag]
+            for stint_number, lap_start, lap_end, compound, age in stints:
+                if lap_start <= len(times):
+                    self.add_stint(car, stint_number, lap_start, min(lap_end, len(times)), compound, age)
+            for lap_number, started, duration, pit_out in times:
+                # OpenF1 often has no time for the opening lap
+                recorded = None if lap_number == 1 and rng.random() < 0.5 else duration
+                self.add_lap(car, lap_number, started, recorded, pit_out)
+            total = times[-1][1] + times[-1][2] if times else None
+            classified.append((car, len(times), total, dns, retired_on is not None))
+
+        classified.sort(key=lambda entry: (entry[3], entry[4], -entry[1], entry[2] or 0))
+        leader_laps, leader_time = classified[0][1], classified[0][2]
+        for position, (car, laps_done, total, dns, dnf) in enumerate(classified, 1):
+            if dns or dnf:
+                self.add_result(car, None, laps_done, None, None, dnf=dnf, dns=dns)
+            elif laps_done < leader_laps:
+                behind = leader_laps - laps_done
+                self.add_result(car, position, laps_done, round(total, 3), f"+{behind} LAP{'S' if behind > 1 else ''}")
+            else:
+                self.add_result(car, position, laps_done, round(total, 3), round(total - leader_time, 3))
+
+    def qualifying(self):
+        rng = self.rng
+        remaining = list(self.grid)
+        lap_counts = {car.driver_number: 0 for car in self.grid}
+        segment_times: dict[int, list] = {car.driver_number: [None, None, None] for car in self.grid}
+        for segment, (minute, cars) in enumerate(QUALIFYING_SEGMENTS):
+            best = {}
+            for car in remaining[:cars]:
+                clock = minute * 60 + rng.uniform(0, 240)
+                lap_start = lap_counts[car.driver_number] + 1
+                for run in range(2):
+                    # out lap, push lap, cool-down lap
+                    for kind in ("out", "push", "cool"):
+                        lap_counts[car.driver_number] += 1
+                        if kind == "push":
+                            duration = self.push_lap(car) - 1.0 - 0.1 * segment - 0.05 * run
+                            best[car.driver_number] = min(best.get(car.driver_number, math.inf), duration)
+                        else:
+                            duration = self.base_lap * rng.uniform(1.25, 1.4)
+                        self.add_lap(car, lap_counts[car.driver_number], clock, duration, kind == "out")
+                        clock += duration
+                    clock += rng.uniform(180, 300)
+                self.add_stint(car, segment + 1, lap_start, lap_counts[car.driver_number], "SOFT", 0)
+            ordered = sorted(remaining[:cars], key=lambda car: best[car.driver_number])
+            fastest = best[ordered[0].driver_number]
+            for car in ordered:
+                segment_times[car.driver_number][segment] = (round(best[car.driver_number], 3),
+                                                             round(best[car.driver_number] - fastest, 3))
+            remaining = ordered + remaining[cars:]
+
+        for position, car in enumerate(remaining, 1):
+            times = segment_times[car.driver_number]
+            self.add_result(car, position, lap_counts[car.driver_number],
+                            [time[0] if time else None for time in times],
+                            [time[1] if time else None for time in times])
+
+    def practice(self):
+        rng = self.rng
+        best = {}
+        for car in self.grid:
+            clock, lap_number, stint = rng.uniform(0, 600), 0, 0
+            while clock < 3300:
+                stint += 1
+                compound = rng.choice(["SOFT", "MEDIUM", "HARD"])
+                run_laps = rng.randint(3, 9)
+                lap_start = lap_number + 1
+                for lap in range(run_laps):
+                    lap_number += 1
+                    if lap == 0:
+                        duration = self.base_lap * rng.uniform(1.2, 1.35)
+                    else:
+                        duration = self.push_lap(car, rng.uniform(10, 40), compound, lap) + 0.8
+                        best[car.driver_number] = min(best.get(car.driver_number, math.inf), duration)
+                    self.add_lap(car, lap_number, clock, duration, lap == 0)
+                    clock += duration
+                self.add_stint(car, stint, lap_start, lap_number, compound, rng.choice([0, 0, 3]))
+                clock += rng.uniform(300, 900)
+            best.setdefault(car.driver_number, math.inf)
+            self.results.append((car, lap_number))
+
+        runs, self.results = self.results, []
+        fastest = min(best.values())
+        for position, (car, laps_done) in enumerate(sorted(runs, key=lambda run: best[run[0].driver_number]), 1):
+            time_set = best[car.driver_number]
+            self.add_result(car, position, laps_done, round(time_set, 3) if time_set < math.inf else None,
+                            round(time_set - fastest, 3) if time_set < math.inf else None)
@@ -0,0 +1,103 @@
+from itertools import groupby
+from operator import itemgetter
+from sqlmodel import Session, select
+from sqlmodel.ext.asyncio.session import AsyncSession
+from backend.analytics.degradation import lap_arrays, fit_stints
+from backend.analytics.lapchart import lap_chart
+from backend.models.driver import Driver
+from backend.models.session_driver import SessionDriver
+from backend.models.session_laps import SessionLaps
+from backend.schemas.read_degradation import DriverDegradation, StintDegradation
+from backend.schemas.read_lapchart import DriverLapChart, LapChart
+from backend.crud.cache import cached, session_scope
+
+
+def session_lap_rows_statement(session_key: int):
+    return (
+        select(SessionDriver.driver_number, SessionLaps.lap_number, SessionLaps.lap_time,
+               SessionLaps.is_pit_out_lap, SessionLaps.compound, Driver.name_acronym, SessionDriver.team)
+        .select_from(SessionLaps)
+        .join(SessionDriver, (SessionDriver.driver_id == SessionLaps.driver_id)
+              & (SessionDriver.session_key == SessionLaps.session_key))
+        .join(Driver, Driver.id == SessionLaps.driver_id)
+        .where(SessionLaps.session_key == session_key)
+        .order_by(SessionDriver.driver_number, SessionLaps.lap_number)
+    )
+
+def build_degradation(rows) -> list[DriverDegradation]:
+    if not rows:
+        return []
+    drivers = {row[0]: (row[5], row[6]) for row in rows}
+    stints = fit_stints(lap_arrays([row[:5] for row in rows]))
+
+    return [
+        DriverDegradation(
+            driver_number=driver_number,
+            name_acronym=drivers[driver_number][0],
+            team=drivers[driver_number][1],
+            stints=[StintDegradation(**stint) for stint in driver_stints],
+        )
+        for driver_number, driver_stints in groupby(stints, key=itemgetter("driver_number"))
+    ]
+
+@cached(session_scope)
+def get_session_degradation(session: Session, session_key: int) -> list[dict]:
+    """
+    Splits the laps of every driver in a session into stints and fits their tyre degradation.
+    :param session: Database session, not related to an F1 session.
+    :param session_key: Unique key identifying the session (FP1, Quali, Race, etc.)
+    :return: 'DriverDegradation' dicts ordered by driver number, each with their stints in order.
+    """
+    rows = session.exec(session_lap_rows_statement(session_key)).all()
+
+    return build_degradation(rows)
+
+@cached(session_scope)
+async def get_session_degradation_async(session: AsyncSession, session_key: int) -> list[dict]:
+    """Async version of get_session_degradation."""
+    rows = (await session.exec(session_lap_rows_statement(session_key))).all()
+
+    return build_degradation(rows)
+
+
+def build_lap_chart(session_key: int, rows) -> LapChart:
+    if not rows:
+        return LapChart(session_key=session_key, laps=0, drivers=[])
+    drivers = {row[0]: (row[5], row[6]) for row in rows}
+    chart = lap_chart([row[:3] for row in rows])
+
+    return LapChart(
+        session_key=session_key,
+        laps=chart["laps"],
+        drivers=[
+            DriverLapChart(
+                driver_number=driver_number,
+                name_acronym=drivers[driver_number][0],
+                team=drivers[driver_number][1],
+                positions=chart["positions"][i],
+                cumulative_times=chart["cumulative_times"][i],
+                gaps_to_leader=chart["gaps_to_leader"][i],
+                intervals=chart["intervals"][i],
+            )
+            for i, driver_number in enumerate(chart["drivers"])
+        ],
+    )
+
+@cached(session_scope)
+def get_session_lap_chart(session: Session, session_key: int) -> dict:
+    """
+    Computes position, cumulative time, gap to the leader and interval to the car ahead of every driver on every lap.
+    :param session: Database session, not related to an F1 session.
+    :param session_key: Unique key identifying the session (FP1, Quali, Race, etc.)
+    :return: The lap chart as a 'LapChart' dict, drivers ordered by number.
+    """
+    rows = session.exec(session_lap_rows_statement(session_key)).all()
+
+    return build_lap_chart(session_key, rows)
+
+@cached(session_scope)
+async def get_session_lap_chart_async(session: AsyncSession, session_key: int) -> dict:
+    """Async version of get_session_lap_chart."""
+    rows = (await session.exec(session_lap_rows_statement(session_key))).all()
+
+    return build_lap_chart(session_key, rows)
@@ -0,0 +1,206 @@
+import asyncio, functools, inspect, os, threading, time
+from collections import OrderedDict
+from datetime import datetime, timedelta
+
+import orjson
+from fastapi.encoders import jsonable_encoder
+from sqlalchemy import func
+from sqlalchemy.dialects.postgresql import insert
+from sqlmodel import Session, select
+
+from backend.db.database import engine
+from backend.models.data_version import DataVersion
+
+"""
+In-process cache for read queries on data that rarely changes.
+Every entry is stamped with the version of the data it was computed from (see DataVersion).
+update_db bumps those versions when it commits, so entries are invalidated as soon as the
+slice of data they depend on changes, instead of expiring after a blind TTL.
+"""
+
+READ_CACHE_SIZE = int(os.getenv("READ_CACHE_SIZE", "1024"))
+# How often the API looks for versions bumped by update_db, which runs in another process.
+DATA_VERSION_POLL_SECONDS = float(os.getenv("DATA_VERSION_POLL_SECONDS", "5"))
+# Bumps become visible on commit, which can be a while after their updated_at timestamp.
+DATA_VERSION_POLL_OVERLAP = timedelta(minutes=10)
+
+EVENTS_SCOPE = "events"
+# any session added, for queries spanning meetings such as sessions in a date range
+SESSIONS_SCOPE = "sessions"
+TEAMS_SCOPE = "teams"
+
+def meeting_scope(meeting_key: int) -> str:
+    return f"meeting:{meeting_key}"
+
+def session_scope(session_key: int) -> str:
+    return f"session:{session_key}"
+
+
+def bump_data_versions(session: Session, scopes: set[str] | list[str]):
+    """
+    Increments the version of each scope, as part of the caller's transaction, so cached
+    reads depending on them are recomputed once it commits.
+    :param session: Database session.
+    :param scopes: Scopes whose data changed, e.g. session_scope(9519).
+    """
+    if not scopes:
+        return
+    stmt = insert(DataVersion).values([
+        {"scope": scope, "version": 1, "updated_at": func.now()} for scope in sorted(scopes)
+    ])
+    stmt = stmt.on_conflict_do_update(
+        index_elements=["scope"],
+        set_={"version": DataVersion.version + 1, "updated_at": func.now()},
+    )
+    session.execute(stmt)
+
+
+class DataVersionTracker:
+    """
+    Local copy of the DataVersion table, refreshed at most every 'poll_seconds' by loading
+    only the rows updated since the last refresh.
+    """
+
+    def __init__(self, poll_seconds: float = DATA_VERSION_POLL_SECONDS):
+        self.poll_seconds = poll_seconds
+        self._versions: dict[str, int] = {}
+        self._updated_at: dict[str, datetime] = {}
+        self._watermark: datetime | None = None
+        self._next_poll = 0.0
+        self._lock = threading.Lock()
+
+    def needs_refresh(self) -> bool:
+        return time.monotonic() >= self._next_poll
+
+    def refresh(self, force: bool = False):
+        if not force and not self.needs_refresh():
+            return
+        with self._lock:
+            if not force and not self.needs_refresh():
+                return
+            statement = select(DataVersion)
+            if self._watermark is not None:
+                statement = statement.where(DataVersion.updated_at > self._watermark - DATA_VERSION_POLL_OVERLAP)
+            with Session(engine) as session:
+                rows = session.exec(statement).all()
+            for row in rows:
+                self._versions[row.scope] = row.version
+                self._updated_at[row.scope] = row.updated_at
+                if self._watermark is None or row.updated_at > self._watermark:
+                    self._watermark = row.updated_at
+            self._next_poll = time.monotonic() + self.poll_seconds
+
+    def version(self, scope: str) -> int:
+        """Current version of a scope, 0 if it was never bumped."""
+        self.refresh()
+        return self._versions.get(scope, 0)
+
+    def updated_at(self, scope: str) -> datetime | None:
+        """When a scope was last bumped, None if it never was."""
+        self.refresh()
+        return self._updated_at.get(scope)
+
+    def __len__(self):
+        return len(self._versions)
+
+
+class ReadCache:
+    """
+    Thread-safe bounded LRU cache of serialized query results, stamped with a data version.
+    Values are stored as JSON bytes and decoded on every hit, so callers get their own copy
+    and can't change what later requests read.
+    """
+
+    def __init__(self, max_entries: int = READ_CACHE_SIZE):
+        self.max_entries = max_entries
+        self._entries: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def get(self, key, version: int):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            entry_version, value = entry
+            if entry_version != version:
+                del self._entries[key]
+                self.invalidations += 1
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+        return orjson.loads(value)
+
+    def put(self, key, version: int, value):
+        """:param value: JSON-compatible value (see jsonable_encoder)."""
+        encoded = orjson.dumps(value, option=orjson.OPT_NON_STR_KEYS)
+        with self._lock:
+            self._entries[key] = (version, encoded)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations,
+            }
+
+
+data_versions = DataVersionTracker()
+read_cache = ReadCache()
+
+
+def cached(scope):
+    """
+    Caches the serialized result of a crud function taking the database session as first argument.
+    Works on both sync and async (AsyncSession) crud functions.
+    The decorated function returns the JSON-compatible form of the result (models become dicts,
+    sets lists), whether it comes from the cache or not, and a new copy on every call.
+    :param scope: Function receiving the same arguments (minus the session) and returning the
+        data version scope the result depends on, e.g. lambda session_key: session_scope(session_key).
+    """
+    def decorator(fn):
+        if inspect.iscoroutinefunction(fn):
+            @functools.wraps(fn)
+            async def async_wrapper(session, *args, **kwargs):
+                key = (fn.__qualname__, args, tuple(sorted(kwargs.items())))
+                if data_versions.needs_refresh():
+                    # polling uses the sync engine, keep it off the event loop
+                    await asyncio.to_thread(data_versions.refresh)
+                version = data_versions.version(scope(*args, **kwargs))
+                value = read_cache.get(key, version)
+                if value is None:
+                    value = jsonable_encoder(await fn(session, *args, **kwargs))
+                    read_cache.put(key, version, value)
+                return value
+            return async_wrapper
+
+        @functools.wraps(fn)
+        def wrapper(session: Session, *args, **kwargs):
+            key = (fn.__qualname__, args, tuple(sorted(kwargs.items())))
+            version = data_versions.version(scope(*args, **kwargs))
+            value = read_cache.get(key, version)
+            if value is None:
+                value = jsonable_encoder(fn(session, *args, **kwargs))
+                read_cache.put(key, version, value)
+            return value
+        return wrapper
+    return decorator
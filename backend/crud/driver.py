@@ -1,52 +1,42 @@
 from sqlmodel import Session, select
+from sqlmodel.ext.asyncio.session import AsyncSession
 from backend.models.driver import Driver
 from backend.models.session_driver import SessionDriver
-from backend.schemas.read_driver import DriverSessionInfo
+from backend.crud.cache import cached, session_scope
 
-def get_drivers_from_session_key(session: Session, session_key: int) -> list[DriverSessionInfo]:
-    """
-    Queries the database to find all drivers that participated in an F1 session,
-    returning a combined data structure with session-specific info.
-    """
-    statement = (
-        select(Driver, SessionDriver)
+def session_drivers_statement(session_key: int):
+    return (
+        select(
+            SessionDriver.driver_number,
+            SessionDriver.team,
+            Driver.first_name,
+            Driver.last_name,
+            Driver.name_acronym,
+            Driver.headshot_url,
+        )
+        .select_from(Driver)
         .join(SessionDriver)
         .where(SessionDriver.session_key == session_key)
     )
 
-    results = session.exec(statement).all()
-
-    drivers_info = [
-        DriverSessionInfo(
-            driver_number=session_link.driver_number,
-            team=session_link.team,
-            
-            first_name=driver.first_name,
-            last_name=driver.last_name,
-            name_acronym=driver.name_acronym,
-            headshot_url=driver.headshot_url,
-        )
-        for driver, session_link in results
-    ]
+def build_drivers_info(rows) -> list[dict]:
+    # the columns are named after the DriverSessionInfo fields, no ORM objects or models in between
+    return [row._asdict() for row in rows]
 
-    return drivers_info
-
-def get_single_driver_from_session_key(session:Session, session_key:int, driver_number:int):
+@cached(session_scope)
+def get_drivers_from_session_key(session: Session, session_key: int) -> list[dict]:
     """
-    Queries the database to find a driver that participated in a session.
-    :param session: The database session, not related to an F1 session.
-    :param session_key: Unique key identifying the session (FP1, Quali, Race, etc.)
-    :param driver_number: Driver's number in Formula 1. (Example Charles LeClerc = 16)
-    :return: the driver as a pydantic 'Driver' model.
+    Queries the database to find all drivers that participated in an F1 session,
+    returning a combined data structure with session-specific info.
+    Only the columns of 'DriverSessionInfo' are selected, each row becoming a dict of its fields.
     """
+    results = session.exec(session_drivers_statement(session_key)).all()
 
-    statement = (
-        select(Driver, SessionDriver).
-        join(SessionDriver).
-        where(
-            SessionDriver.session_key == session_key,
-            SessionDriver.driver_number == driver_number
-        )
-    )
+    return build_drivers_info(results)
+
+@cached(session_scope)
+async def get_drivers_from_session_key_async(session: AsyncSession, session_key: int) -> list[dict]:
+    """Async version of get_drivers_from_session_key."""
+    results = (await session.exec(session_drivers_statement(session_key))).all()
 
-    return session.exec(statement).first()
+    return build_drivers_info(results)
@@ -1,28 +1,51 @@
 from sqlmodel import Session, select
+from sqlmodel.ext.asyncio.session import AsyncSession
 from backend.models.events import Event
 from backend.models.teams import Teams
+from backend.crud.cache import cached, EVENTS_SCOPE, TEAMS_SCOPE
 
 
+@cached(lambda year: EVENTS_SCOPE)
 def get_events_from_year(session:Session, year: int):
     """
     Queries the database to find all F1 events in a given year.
     :param session: Database session, not related to an F1 session.
     :param year: Year for which you want to find events
-    :return: List of events as 'Event' pydantic model.
+    :return: List of events as dicts of 'Event' fields.
     """
     return session.exec(select(Event).where(Event.year == year)).all()
 
+@cached(lambda year: EVENTS_SCOPE)
+async def get_events_from_year_async(session: AsyncSession, year: int):
+    """Async version of get_events_from_year."""
+    return (await session.exec(select(Event).where(Event.year == year))).all()
+
+@cached(lambda: EVENTS_SCOPE)
 def get_available_years(session):
     """
     Queries database to find all unique years so we can display them to users.
     :param session: Database session
-    :return: Set with all years.
+    :return: List with all years.
     """
     years = session.exec(select(Event.year)).all()
     return sorted(set(years))
 
+@cached(lambda: EVENTS_SCOPE)
+async def get_available_years_async(session: AsyncSession):
+    """Async version of get_available_years."""
+    years = (await session.exec(select(Event.year))).all()
+    return sorted(set(years))
+
+@cached(lambda: TEAMS_SCOPE)
 def get_teams(session):
     teams = session.exec(select(Teams)).all()
 
     team_map = {team.name : team.color for team in teams}
     return team_map
+
+@cached(lambda: TEAMS_SCOPE)
+async def get_teams_async(session: AsyncSession):
+    """Async version of get_teams."""
+    teams = (await session.exec(select(Teams))).all()
+
+    return {team.name : team.color for team in teams}
@@ -1,29 +1,100 @@
+from datetime import datetime
 from sqlmodel import Session, select
+from sqlmodel.ext.asyncio.session import AsyncSession
 from backend.models.driver import Driver
 from backend.models.session_driver import SessionDriver
 from backend.models.session_result import SessionResult
 from backend.models.sessions import F1Session
-from backend.schemas.read_session_result import DriverPosition, ReadSessionResult
+from backend.crud.cache import cached, meeting_scope, session_scope, SESSIONS_SCOPE
 
 
+@cached(meeting_scope)
 def get_sessions_from_meeting_key(session:Session, meeting_key:int):
     """
     Queries the db for all F1 sessions in an F1 event.
     :param session: Database session, not related to an F1 session.
     :param meeting_key: Unique key identifying an event.
-    :return: List of sessions as 'F1Session' pydantic model.
+    :return: List of sessions as dicts of 'F1Session' fields.
     """
     return session.exec(select(F1Session).where(F1Session.meeting_key == meeting_key)).all()
 
+@cached(meeting_scope)
+async def get_sessions_from_meeting_key_async(session: AsyncSession, meeting_key: int):
+    """Async version of get_sessions_from_meeting_key."""
+    return (await session.exec(select(F1Session).where(F1Session.meeting_key == meeting_key))).all()
 
-def get_session_result(session: Session, session_key: int):
+
+def sessions_in_range_statement(start: datetime, end: datetime):
+    return select(F1Session).where(F1Session.date >= start, F1Session.date < end).order_by(F1Session.date)
+
+@cached(lambda start, end: SESSIONS_SCOPE)
+def get_sessions_in_range(session: Session, start: datetime, end: datetime):
     """
-    Gets all results for a session, joining the result, driver, and session link data,
-    ordered by finishing position.
+    Queries the db for all F1 sessions starting in a time range.
+    :param session: Database session, not related to an F1 session.
+    :param start: Inclusive lower bound of the session start.
+    :param end: Exclusive upper bound of the session start.
+    :return: List of sessions as dicts of 'F1Session' fields, in start order.
     """
-    statement = (
-        # 1. State what you want to select in the final result.
-        select(SessionResult, Driver, SessionDriver)
+    return session.exec(sessions_in_range_statement(start, end)).all()
+
+@cached(lambda start, end: SESSIONS_SCOPE)
+async def get_sessions_in_range_async(session: AsyncSession, start: datetime, end: datetime):
+    """Async version of get_sessions_in_range."""
+    return (await session.exec(sessions_in_range_statement(start, end))).all()
+
+def next_session_statement(after: datetime):
+    return select(F1Session).where(F1Session.date > after).order_by(F1Session.date).limit(1)
+
+def previous_session_statement(before: datetime):
+    return select(F1Session).where(F1Session.date <= before).order_by(F1Session.date.desc()).limit(1)
+
+def get_next_session(session: Session, after: datetime) -> F1Session | None:
+    """
+    Queries the db for the first session starting after a point in time.
+    Not cached, the answer depends on 'after' rather than on the data.
+    :param session: Database session, not related to an F1 session.
+    :param after: Usually the current time.
+    """
+    return session.exec(next_session_statement(after)).first()
+
+async def get_next_session_async(session: AsyncSession, after: datetime) -> F1Session | None:
+    """Async version of get_next_session."""
+    return (await session.exec(next_session_statement(after))).first()
+
+def get_previous_session(session: Session, before: datetime) -> F1Session | None:
+    """
+    Queries the db for the last session that started at or before a point in time.
+    :param session: Database session, not related to an F1 session.
+    :param before: Usually the current time.
+    """
+    return session.exec(previous_session_statement(before)).first()
+
+async def get_previous_session_async(session: AsyncSession, before: datetime) -> F1Session | None:
+    """Async version of get_previous_session."""
+    return (await session.exec(previous_session_statement(before))).first()
+
+
+def session_result_statement(session_key: int):
+    return (
+        # 1. State the columns you want in the final result, named after the DriverPosition fields.
+        select(
+            SessionResult.position,
+            SessionDriver.team,
+            Driver.first_name,
+            Driver.last_name,
+            SessionResult.number_of_laps,
+            SessionResult.gap_to_leader,
+            SessionResult.duration,
+            SessionResult.q1,
+            SessionResult.q2,
+            SessionResult.q3,
+            SessionResult.lapped,
+            SessionResult.laps_behind,
+            SessionResult.dnf,
+            SessionResult.dns,
+            SessionResult.dsq,
+        )
         # 2. Explicitly state the starting table for your joins.
         .select_from(SessionResult)
         # 3. Create a clear, sequential join path: SessionResult -> Driver
@@ -37,26 +108,36 @@ def get_session_result(session: Session, session_key: int):
         .order_by(SessionResult.position)
     )
 
-    result = session.exec(statement).all()
-
-    driver_positions = [
-        DriverPosition(
-            position=result.position,
-            team=session_link.team,
-            first_name=driver.first_name,
-            last_name=driver.last_name,
-            number_of_laps=result.number_of_laps,
-            gap_to_leader=result.gap_to_leader,
-            duration=result.duration,
-            dnf=result.dnf,
-            dns=result.dns,
-            dsq=result.dsq
-        )
-        for result, driver, session_link in result
-    ]
+def lapped_gap(laps_behind: int | None) -> str:
+    """The gap OpenF1 shows for lapped cars, e.g. "+1 LAP" or "+2 LAPS"."""
+    if not laps_behind:
+        return "+1 LAP"
+    return f"+{laps_behind} LAP" + ("S" if laps_behind > 1 else "")
 
-    session_table= ReadSessionResult(
-        result=driver_positions
-    )
+def build_session_result(rows) -> dict:
+    """Maps the selected columns straight to the 'ReadSessionResult' structure, without ORM objects or models."""
+    driver_positions = []
+    for row in rows:
+        position = row._asdict()
+        if row.lapped:
+            position["gap_to_leader"] = lapped_gap(row.laps_behind)
+        driver_positions.append(position)
+
+    return {"result": driver_positions}
+
+@cached(session_scope)
+def get_session_result(session: Session, session_key: int):
+    """
+    Gets all results for a session, joining the result, driver, and session link data,
+    ordered by finishing position.
+    """
+    result = session.exec(session_result_statement(session_key)).all()
+
+    return build_session_result(result)
+
+@cached(session_scope)
+async def get_session_result_async(session: AsyncSession, session_key: int):
+    """Async version of get_session_result."""
+    result = (await session.exec(session_result_statement(session_key))).all()
 
-    return session_table
+    return build_session_result(result)
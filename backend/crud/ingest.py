@@ -0,0 +1,28 @@
+from sqlmodel import Session, select, func
+from backend.models.ingest_run import IngestRun
+from backend.models.ingest_state import IngestState
+
+
+def get_ingest_status(session: Session):
+    """
+    Summarises the ingest checkpoints written by update_db.
+    :param session: Database session
+    :return: Number of sessions per status, the sessions waiting for a retry with their last error,
+        and the summary of the latest update_db run.
+    """
+    counts = session.exec(select(IngestState.status, func.count()).group_by(IngestState.status)).all()
+    failed = session.exec(
+        select(IngestState).where(IngestState.status == "failed").order_by(IngestState.next_attempt_at)
+    ).all()
+    last_synced_at = session.exec(select(func.max(IngestState.last_synced_at))).one()
+    last_run = session.exec(select(IngestRun).order_by(IngestRun.started_at.desc()).limit(1)).first()
+    return {
+        "statuses": {status: count for status, count in counts},
+        "last_synced_at": last_synced_at,
+        "failed": [
+            {"session_key": state.session_key, "attempts": state.attempts, "last_error": state.last_error,
+             "next_attempt_at": state.next_attempt_at}
+            for state in failed
+        ],
+        "last_run": last_run.model_dump() if last_run else None,
+    }
@@ -1,26 +1,114 @@
+from itertools import groupby
 from sqlmodel import Session, select
+from sqlmodel.ext.asyncio.session import AsyncSession
+from backend.models.driver import Driver
+from backend.models.session_driver import SessionDriver
 from backend.models.session_laps import SessionLaps
-from backend.crud.driver import get_single_driver_from_session_key
 
+# Columns of a driver's laps response, selected instead of whole entities.
+DRIVER_COLUMNS = (
+    SessionDriver.driver_number,
+    SessionDriver.team,
+    Driver.first_name,
+    Driver.last_name,
+    Driver.headshot_url,
+)
+LAP_COLUMNS = (
+    SessionLaps.lap_number,
+    SessionLaps.lap_time,
+    SessionLaps.st_speed,
+    SessionLaps.is_pit_out_lap,
+    SessionLaps.compound,
+)
+
+
+def driver_info_statement(session_key: int, driver_number: int):
+    return (
+        select(Driver.id, *DRIVER_COLUMNS)
+        .select_from(Driver)
+        .join(SessionDriver)
+        .where(
+            SessionDriver.session_key == session_key,
+            SessionDriver.driver_number == driver_number
+        )
+    )
+
+def driver_laps_statement(session_key: int, driver_id: int):
+    return select(*LAP_COLUMNS).where(
+        SessionLaps.driver_id == driver_id,
+        SessionLaps.session_key == session_key
+    ).order_by(SessionLaps.lap_number)
 
 def get_driver_lap_times(session: Session, session_key: int, driver_number: int):
     """
     Queries database for all of a driver's lap times in a given F1 session.
+    Only the columns the response needs are selected, as plain rows instead of ORM objects.
     :param session: Database session, not related to an F1 session.
     :param session_key: Unique key identifying the session (FP1, Quali, Race, etc.)
     :param driver_number: Driver's number in Formula 1. (Example Charles LeClerc = 16)
-    :return: driver, as a 'Driver' pydantic model, and a list of laps, each a 'SessionLaps' pydantic model.
+    :return: the driver, a row with their number, team, name and headshot (None if they weren't in the session),
+        and a list of laps, each a row of the lap columns.
     """
-    driver_data = get_single_driver_from_session_key(session, session_key, driver_number)
+    driver = session.exec(driver_info_statement(session_key, driver_number)).first()
 
-    if not driver_data:
-        return None, None, []
+    if not driver:
+        return None, []
 
-    driver, session_data = driver_data
+    laps = session.exec(driver_laps_statement(session_key, driver.id)).all()
 
-    laps = session.exec(select(SessionLaps).where(
-        SessionLaps.driver_id == driver.id,
-        SessionLaps.session_key == session_key
-    )).all()
+    return driver, laps
+
+async def get_driver_lap_times_async(session: AsyncSession, session_key: int, driver_number: int):
+    """Async version of get_driver_lap_times."""
+    driver = (await session.exec(driver_info_statement(session_key, driver_number))).first()
+
+    if not driver:
+        return None, []
+
+    laps = (await session.exec(driver_laps_statement(session_key, driver.id))).all()
+
+    return driver, laps
+
+
+def session_laps_statement(session_key: int, driver_numbers: list[int] | None = None):
+    statement = (
+        select(*DRIVER_COLUMNS, *LAP_COLUMNS)
+        .select_from(SessionDriver)
+        .join(Driver, Driver.id == SessionDriver.driver_id)
+        .outerjoin(SessionLaps, (SessionLaps.driver_id == SessionDriver.driver_id)
+                   & (SessionLaps.session_key == SessionDriver.session_key))
+        .where(SessionDriver.session_key == session_key)
+        .order_by(SessionDriver.driver_number, SessionLaps.lap_number)
+    )
+    if driver_numbers is not None:
+        statement = statement.where(SessionDriver.driver_number.in_(driver_numbers))
+    return statement
+
+def group_laps_by_driver(rows) -> list[tuple]:
+    drivers_laps = []
+    for _, driver_rows in groupby(rows, key=lambda row: row.driver_number):
+        driver_rows = list(driver_rows)
+        # drivers without laps come back once, with no lap joined (lap_number is never null otherwise)
+        laps = [row for row in driver_rows if row.lap_number is not None]
+        drivers_laps.append((driver_rows[0], laps))
+
+    return drivers_laps
+
+def get_session_lap_times(session: Session, session_key: int, driver_numbers: list[int] | None = None):
+    """
+    Queries database for the lap times of several drivers in a given F1 session, using a single query.
+    :param session: Database session, not related to an F1 session.
+    :param session_key: Unique key identifying the session (FP1, Quali, Race, etc.)
+    :param driver_numbers: Drivers' numbers in Formula 1, None for every driver in the session.
+    :return: list of (driver, laps) tuples ordered by driver number, laps ordered by lap number,
+        as rows of the driver and lap columns (see get_driver_lap_times).
+    """
+    rows = session.exec(session_laps_statement(session_key, driver_numbers)).all()
+
+    return group_laps_by_driver(rows)
+
+async def get_session_lap_times_async(session: AsyncSession, session_key: int, driver_numbers: list[int] | None = None):
+    """Async version of get_session_lap_times."""
+    rows = (await session.exec(session_laps_statement(session_key, driver_numbers))).all()
 
-    return driver, session_data, laps
+    return group_laps_by_driver(rows)
@@ -0,0 +1,53 @@
+from sqlmodel import Session, select
+from sqlmodel.ext.asyncio.session import AsyncSession
+from backend.models.driver import Driver
+from backend.models.session_driver import SessionDriver
+from backend.models.session_driver_stats import SessionDriverStats
+from backend.schemas.read_session_stats import DriverSessionStats
+from backend.crud.cache import cached, session_scope
+
+def session_stats_statement(session_key: int):
+    return (
+        select(SessionDriverStats, Driver, SessionDriver)
+        .join(Driver, Driver.id == SessionDriverStats.driver_id)
+        .join(SessionDriver, (SessionDriver.driver_id == SessionDriverStats.driver_id) &
+              (SessionDriver.session_key == SessionDriverStats.session_key))
+        .where(SessionDriverStats.session_key == session_key)
+        .order_by(SessionDriverStats.best_lap.asc().nulls_last(), SessionDriver.driver_number)
+    )
+
+def build_session_stats(results) -> list[DriverSessionStats]:
+    return [
+        DriverSessionStats(
+            driver_number=session_link.driver_number,
+            first_name=driver.first_name,
+            last_name=driver.last_name,
+            name_acronym=driver.name_acronym,
+            team=session_link.team,
+            lap_count=stats.lap_count,
+            best_lap=stats.best_lap,
+            median_clean_lap=stats.median_clean_lap,
+            top_speed_trap=stats.top_speed_trap,
+            stints=stats.stints,
+        )
+        for stats, driver, session_link in results
+    ]
+
+@cached(session_scope)
+def get_session_driver_stats(session: Session, session_key: int) -> list[dict]:
+    """
+    Queries the lap statistics of every driver in a session, precomputed by update_db.
+    :param session: Database session, not related to an F1 session.
+    :param session_key: Unique key identifying the session (FP1, Quali, Race, etc.)
+    :return: 'DriverSessionStats' dicts ordered by best lap, drivers without a timed lap last.
+    """
+    results = session.exec(session_stats_statement(session_key)).all()
+
+    return build_session_stats(results)
+
+@cached(session_scope)
+async def get_session_driver_stats_async(session: AsyncSession, session_key: int) -> list[dict]:
+    """Async version of get_session_driver_stats."""
+    results = (await session.exec(session_stats_statement(session_key))).all()
+
+    return build_session_stats(results)
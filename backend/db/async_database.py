@@ -0,0 +1,33 @@
+from typing import Annotated
+
+from fastapi import Depends
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from backend.db.database import DATABASE_URL, engine_settings, engine_options
+from backend.db.pool import TimedAsyncAdaptedQueuePool
+from backend.db.query_stats import instrument_engine
+
+"""
+Optional asyncio database access, used by the API when DB_ASYNC is enabled.
+Only imported in that case, so asyncpg isn't needed otherwise.
+"""
+
+def to_async_url(url: str) -> str:
+    """Points a PostgreSQL URL at the asyncpg driver."""
+    scheme, rest = url.split("://", 1)
+    return f"postgresql+asyncpg://{rest}" if scheme.startswith("postgres") else url
+
+async_engine = create_async_engine(
+    to_async_url(DATABASE_URL),
+    poolclass=TimedAsyncAdaptedQueuePool,
+    **engine_options(engine_settings(), asyncpg=True)
+)
+instrument_engine(async_engine.sync_engine)
+
+async def get_async_session():
+    """Returns the async session that will be used to access the database"""
+    async with AsyncSession(async_engine) as session:
+        yield session
+
+AsyncSessionDep = Annotated[AsyncSession, Depends(get_async_session)]
@@ -0,0 +1,399 @@
+"""
+Bulk backfill for loading whole seasons into an empty (or mostly empty) database.
+Instead of update_db's per-session ORM writes and executemany upserts, every OpenF1 row is
+streamed with COPY into UNLOGGED staging tables, then merged into the real tables with one
+set-based INSERT ... SELECT per table. Secondary indexes of the target tables are dropped before
+the merge and rebuilt from their saved definitions afterwards, and so are their foreign keys.
+The merge holds exclusive locks on the target tables: run it while the API isn't serving traffic.
+
+Usage:
+    python -m backend.db.backfill                 # every season OpenF1 has
+    python -m backend.db.backfill --year 2023 --year 2024
+"""
+
+import os
+
+if __name__ == "__main__":
+    # must be set before backend.db.database creates the engine
+    os.environ.setdefault("DB_PROFILE", "ingest")
+
+import argparse, csv, io, json, time
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+
+from sqlmodel import Session
+
+from backend.crud.cache import bump_data_versions, meeting_scope, session_scope, EVENTS_SCOPE, SESSIONS_SCOPE, \
+    TEAMS_SCOPE
+from backend.db.database import engine
+from backend.db.db_utils import URL_BASE, get_data, logger, map_stints_laps, parse_result_times, upstream_client, \
+    compute_driver_stats, FINISHED_SESSION_AFTER
+from backend.db.update_db import (INGEST_CONCURRENCY, SESSION_ENDPOINTS, add_teams_colors, iter_prefetched_sessions,
+                                  resolve_payloads)
+
+# Rows buffered per staging table before they are sent with COPY.
+COPY_BATCH_ROWS = int(os.getenv("BACKFILL_COPY_BATCH_ROWS", "50000"))
+
+STAGING_TABLES = {
+    "backfill_event": "meeting_key integer, circuit_key integer, location text, country_name text, "
+                      "circuit_name text, meeting_official_name text, year integer",
+    "backfill_f1session": "location text, meeting_key integer, session_key integer, session_type text, "
+                          "session_name text, date timestamptz, date_end timestamptz",
+    "backfill_driver": "session_key integer, driver_number integer, name_acronym text, first_name text, "
+                       "last_name text, headshot_url text, team text",
+    "backfill_lap": "session_key integer, driver_number integer, lap_number integer, is_pit_out_lap boolean, "
+                    "lap_time double precision, st_speed integer, compound text",
+    "backfill_result": "meeting_key integer, session_key integer, driver_number integer, position integer, "
+                       "number_of_laps integer, dnf boolean, dns boolean, dsq boolean, duration double precision, "
+                       "gap_to_leader double precision, q1 double precision, q2 double precision, "
+                       "q3 double precision, lapped boolean, laps_behind integer",
+    "backfill_stats": "session_key integer, driver_number integer, lap_count integer, best_lap double precision, "
+                      "median_clean_lap double precision, top_speed_trap integer, stints jsonb",
+}
+
+TARGET_TABLES = ("event", "f1session", "driver", "sessiondriver", "sessionlaps", "sessionresult", "sessiondriverstats")
+
+MERGE_STATEMENTS = [
+    ("event", """
+        INSERT INTO event (meeting_key, circuit_key, location, country_name, circuit_name, meeting_official_name, year)
+        SELECT DISTINCT ON (meeting_key) meeting_key, circuit_key, location, country_name, circuit_name,
+               meeting_official_name, year
+        FROM backfill_event
+        ORDER BY meeting_key
+        ON CONFLICT (meeting_key) DO NOTHING
+    """),
+    ("f1session", """
+        INSERT INTO f1session (location, meeting_key, session_key, session_type, session_name, date)
+        SELECT DISTINCT ON (s.session_key) s.location, s.meeting_key, s.session_key, s.session_type,
+               s.session_name, s.date
+        FROM backfill_f1session s
+        JOIN event e ON e.meeting_key = s.meeting_key
+        WHERE s.date IS NOT NULL
+        ORDER BY s.session_key
+        ON CONFLICT (session_key) DO NOTHING
+    """),
+    # the most recent non-empty details win, empty details already in the table are filled in
+    ("driver", """
+        INSERT INTO driver (first_name, last_name, name_acronym, headshot_url)
+        SELECT DISTINCT ON (name_acronym) COALESCE(first_name, ''), COALESCE(last_name, ''), name_acronym,
+               COALESCE(headshot_url, '')
+        FROM backfill_driver
+        WHERE name_acronym IS NOT NULL
+        ORDER BY name_acronym, (first_name IS NOT NULL AND headshot_url IS NOT NULL) DESC, session_key DESC
+        ON CONFLICT (name_acronym) DO UPDATE SET
+            first_name = CASE WHEN driver.first_name = '' THEN EXCLUDED.first_name ELSE driver.first_name END,
+            last_name = CASE WHEN driver.last_name = '' THEN EXCLUDED.last_name ELSE driver.last_name END,
+            headshot_url = CASE WHEN driver.headshot_url = '' THEN EXCLUDED.headshot_url ELSE driver.headshot_url END
+    """),
+    ("sessiondriver", """
+        INSERT INTO sessiondriver (session_key, driver_id, team, driver_number)
+        SELECT DISTINCT ON (b.session_key, d.id) b.session_key, d.id, COALESCE(b.team, ''), b.driver_number
+        FROM backfill_driver b
+        JOIN driver d ON d.name_acronym = b.name_acronym
+        JOIN f1session s ON s.session_key = b.session_key
+        WHERE b.driver_number IS NOT NULL
+        ORDER BY b.session_key, d.id
+        ON CONFLICT (session_key, driver_id) DO NOTHING
+    """),
+    ("sessionlaps", """
+        INSERT INTO sessionlaps (driver_id, session_key, lap_number, is_pit_out_lap, lap_time, st_speed, compound)
+        SELECT DISTINCT ON (sd.driver_id, l.session_key, l.lap_number) sd.driver_id, l.session_key, l.lap_number,
+               l.is_pit_out_lap, l.lap_time, l.st_speed, l.compound
+        FROM backfill_lap l
+        JOIN sessiondriver sd ON sd.session_key = l.session_key AND sd.driver_number = l.driver_number
+        ORDER BY sd.driver_id, l.session_key, l.lap_number
+        ON CONFLICT (driver_id, session_key, lap_number) DO UPDATE SET
+            is_pit_out_lap = EXCLUDED.is_pit_out_lap,
+            lap_time = EXCLUDED.lap_time,
+            st_speed = EXCLUDED.st_speed,
+            compound = EXCLUDED.compound
+        WHERE (sessionlaps.is_pit_out_lap, sessionlaps.lap_time, sessionlaps.st_speed, sessionlaps.compound)
+              IS DISTINCT FROM (EXCLUDED.is_pit_out_lap, EXCLUDED.lap_time, EXCLUDED.st_speed, EXCLUDED.compound)
+    """),
+    ("sessionresult", """
+        INSERT INTO sessionresult (meeting_key, session_key, driver_id, position, number_of_laps, dnf, dns, dsq,
+                                   duration, gap_to_leader, q1, q2, q3, lapped, laps_behind)
+        SELECT DISTINCT ON (r.session_key, sd.driver_id) s.meeting_key, r.session_key, sd.driver_id, r.position,
+               r.number_of_laps, COALESCE(r.dnf, false), COALESCE(r.dns, false), COALESCE(r.dsq, false),
+               r.duration, r.gap_to_leader, r.q1, r.q2, r.q3, r.lapped, r.laps_behind
+        FROM backfill_result r
+        JOIN f1session s ON s.session_key = r.session_key
+        JOIN sessiondriver sd ON sd.session_key = r.session_key AND sd.driver_number = r.driver_number
+        ORDER BY r.session_key, sd.driver_id
+        ON CONFLICT (session_key, driver_id) DO NOTHING
+    """),
+    ("sessiondriverstats", """
+        INSERT INTO sessiondriverstats (session_key, driver_id, lap_count, best_lap, median_clean_lap, top_speed_trap,
+                                        stints)
+        SELECT DISTINCT ON (st.session_key, sd.driver_id) st.session_key, sd.driver_id, st.lap_count, st.best_lap,
+               st.median_clean_lap, st.top_speed_trap, st.stints
+        FROM backfill_stats st
+        JOIN sessiondriver sd ON sd.session_key = st.session_key AND sd.driver_number = st.driver_number
+        ORDER BY st.session_key, sd.driver_id
+        ON CONFLICT (session_key, driver_id) DO UPDATE SET
+            lap_count = EXCLUDED.lap_count,
+            best_lap = EXCLUDED.best_lap,
+            median_clean_lap = EXCLUDED.median_clean_lap,
+            top_speed_trap = EXCLUDED.top_speed_trap,
+            stints = EXCLUDED.stints
+    """),
+    # checkpoint the loaded sessions so update_db only polls the ones that can still change, including
+    # sessions an earlier update_db run left failed, pending or in progress
+    ("ingeststate", f"""
+        INSERT INTO ingeststate (session_key, meeting_key, date_start, date_end, status, meeting_at, session_at,
+                                 laps_at, results_at, last_synced_at, attempts, updated_at)
+        SELECT DISTINCT ON (b.session_key) b.session_key, b.meeting_key, b.date, b.date_end,
+               CASE WHEN b.date_end < now() - interval '{int(FINISHED_SESSION_AFTER.total_seconds())} seconds'
+                    THEN 'done' ELSE 'live' END,
+               now(), now(), now(), now(), now(), 0, now()
+        FROM backfill_f1session b
+        JOIN f1session s ON s.session_key = b.session_key
+        ORDER BY b.session_key
+        ON CONFLICT (session_key) DO UPDATE SET
+            meeting_key = EXCLUDED.meeting_key,
+            date_start = EXCLUDED.date_start,
+            date_end = EXCLUDED.date_end,
+            status = EXCLUDED.status,
+            meeting_at = EXCLUDED.meeting_at,
+            session_at = EXCLUDED.session_at,
+            laps_at = EXCLUDED.laps_at,
+            results_at = EXCLUDED.results_at,
+            last_synced_at = EXCLUDED.last_synced_at,
+            attempts = 0,
+            last_error = NULL,
+            next_attempt_at = NULL,
+            updated_at = EXCLUDED.updated_at
+    """),
+]
+
+# The attributes of SessionLaps that compute_driver_stats reads.
+StagedLap = namedtuple("StagedLap", "lap_number is_pit_out_lap lap_time st_speed compound")
+
+
+class CopyBuffer:
+    """Buffers rows for one staging table as CSV and sends them with COPY every 'batch_rows' rows."""
+
+    def __init__(self, cursor, table: str, batch_rows: int = COPY_BATCH_ROWS):
+        self.cursor = cursor
+        self.table = table
+        self.batch_rows = batch_rows
+        self.rows = 0
+        self.pending = 0
+        self._buffer = io.StringIO()
+        self._writer = csv.writer(self._buffer)
+
+    def write(self, row: tuple):
+        # csv writes None as an empty unquoted field, which COPY reads as NULL
+        self._writer.writerow(row)
+        self.pending += 1
+        if self.pending >= self.batch_rows:
+            self.flush()
+
+    def flush(self):
+        if not self.pending:
+            return
+        self._buffer.seek(0)
+        self.cursor.copy_expert(f"COPY {self.table} FROM STDIN WITH (FORMAT csv)", self._buffer)
+        self.rows += self.pending
+        self.pending = 0
+        self._buffer.seek(0)
+        self._buffer.truncate()
+
+
+def create_staging_tables(cursor):
+    for table, columns in STAGING_TABLES.items():
+        cursor.execute(f"DROP TABLE IF EXISTS {table}")
+        cursor.execute(f"CREATE UNLOGGED TABLE {table} ({columns})")
+
+def drop_staging_tables(cursor):
+    for table in STAGING_TABLES:
+        cursor.execute(f"DROP TABLE IF EXISTS {table}")
+
+def stage_session(buffers: dict[str, CopyBuffer], f1session: dict, payloads: dict[str, list[dict]]):
+    """Writes the rows of one session and its OpenF1 payloads to the staging buffers."""
+    session_key = f1session['session_key']
+    buffers["backfill_f1session"].write((
+        f1session.get('location'), f1session.get('meeting_key'), session_key, f1session.get('session_type'),
+        f1session.get('session_name'), f1session.get('date_start'), f1session.get('date_end'),
+    ))
+
+    for driver in payloads['drivers']:
+        buffers["backfill_driver"].write((
+            session_key, driver.get('driver_number'), driver.get('name_acronym'), driver.get('first_name'),
+            driver.get('last_name'), driver.get('headshot_url'), driver.get('team_name'),
+        ))
+
+    stints_by_driver = {}
+    for stint in payloads['stints']:
+        stints_by_driver.setdefault(stint.get('driver_number'), []).append(stint)
+    compounds = {driver_number: map_stints_laps(stints) for driver_number, stints in stints_by_driver.items()}
+
+    laps_by_driver = {}
+    for lap in payloads['laps']:
+        driver_number, lap_number = lap.get('driver_number'), lap.get('lap_number')
+        if driver_number is None or lap_number is None:
+            continue
+        staged = StagedLap(lap_number, lap.get('is_pit_out_lap'), lap.get('lap_duration'), lap.get('st_speed'),
+                           compounds.get(driver_number, {}).get(lap_number))
+        laps_by_driver.setdefault(driver_number, []).append(staged)
+        buffers["backfill_lap"].write((session_key, driver_number, *staged))
+
+    # same statistics update_db.add_session_driver_stats computes from the stored laps
+    for driver_number, laps in laps_by_driver.items():
+        stats = compute_driver_stats(sorted(laps, key=lambda lap: lap.lap_number))
+        buffers["backfill_stats"].write((
+            session_key, driver_number, stats['lap_count'], stats['best_lap'], stats['median_clean_lap'],
+            stats['top_speed_trap'], json.dumps(stats['stints']),
+        ))
+
+    for result in payloads['session_result']:
+        times = parse_result_times(result.get('duration'), result.get('gap_to_leader'))
+        buffers["backfill_result"].write((
+            result.get('meeting_key'), session_key, result.get('driver_number'), result.get('position'),
+            result.get('number_of_laps'), result.get('dnf'), result.get('dns'), result.get('dsq'),
+            times['duration'], times['gap_to_leader'], times['q1'], times['q2'], times['q3'],
+            times['lapped'], times['laps_behind'],
+        ))
+
+def stage_openf1(cursor, years: list[int] | None, concurrency: int) -> dict[str, int]:
+    """
+    Downloads meetings, sessions and every session's payloads, streaming them into the staging tables.
+    :return: Number of rows staged per staging table.
+    """
+    buffers = {table: CopyBuffer(cursor, table) for table in STAGING_TABLES}
+    filters = [f'?year={year}' for year in years] if years else ['']
+
+    f1sessions = []
+    for year_filter in filters:
+        for meeting in get_data(f'{URL_BASE}meetings{year_filter}') or []:
+            buffers["backfill_event"].write((
+                meeting.get('meeting_key'), meeting.get('circuit_key'), meeting.get('location'),
+                meeting.get('country_name'), meeting.get('circuit_short_name'), meeting.get('meeting_official_name'),
+                meeting.get('year'),
+            ))
+        f1sessions.extend(get_data(f'{URL_BASE}sessions{year_filter}') or [])
+
+    with ThreadPoolExecutor(max_workers=concurrency * len(SESSION_ENDPOINTS)) as executor:
+        for c, (f1session, futures) in enumerate(iter_prefetched_sessions(executor, f1sessions, concurrency), 1):
+            stage_session(buffers, f1session, resolve_payloads(futures))
+            if c % 50 == 0:
+                logger.info(f"Staged {c}/{len(f1sessions)} sessions.")
+
+    for buffer in buffers.values():
+        buffer.flush()
+    return {table: buffer.rows for table, buffer in buffers.items()}
+
+def secondary_indexes(cursor, tables: tuple[str, ...]) -> list[tuple[str, str]]:
+    """(name, definition) of the indexes on 'tables' that don't back a primary key or unique constraint."""
+    cursor.execute(
+        """
+        SELECT i.indexname, i.indexdef
+        FROM pg_indexes i
+        WHERE i.schemaname = current_schema() AND i.tablename = ANY(%s)
+          AND NOT EXISTS (
+              SELECT 1 FROM pg_constraint c
+              WHERE c.conindid = format('%%I.%%I', i.schemaname, i.indexname)::regclass
+          )
+        ORDER BY i.tablename, i.indexname
+        """,
+        (list(tables),)
+    )
+    return cursor.fetchall()
+
+def foreign_keys(cursor, tables: tuple[str, ...]) -> list[tuple[str, str, str]]:
+    """(table, name, definition) of the foreign keys declared on 'tables'."""
+    cursor.execute(
+        """
+        SELECT c.conrelid::regclass::text, c.conname, pg_get_constraintdef(c.oid)
+        FROM pg_constraint c
+        WHERE c.contype = 'f' AND c.conrelid::regclass::text = ANY(%s)
+        ORDER BY 1, 2
+        """,
+        (list(tables),)
+    )
+    return cursor.fetchall()
+
+def merge_staging(cursor, rebuild_indexes: bool = True) -> dict[str, int]:
+    """
+    Merges the staging tables into the real tables, in one transaction with the caller.
+    With rebuild_indexes, secondary indexes and foreign keys are dropped first and recreated after
+    the merge: one index build and one validation query per table instead of per-row maintenance
+    and per-row foreign key triggers.
+    :return: Number of rows inserted or updated per table.
+    """
+    indexes = secondary_indexes(cursor, TARGET_TABLES) if rebuild_indexes else []
+    constraints = foreign_keys(cursor, TARGET_TABLES) if rebuild_indexes else []
+    for table, name, _ in constraints:
+        cursor.execute(f"ALTER TABLE {table} DROP CONSTRAINT {name}")
+    for name, _ in indexes:
+        cursor.execute(f"DROP INDEX {name}")
+
+    merged = {}
+    for table, statement in MERGE_STATEMENTS:
+        start = time.perf_counter()
+        cursor.execute(statement)
+        merged[table] = cursor.rowcount
+        logger.info(f"Merged {cursor.rowcount} rows into {table} in {time.perf_counter() - start:.1f}s.")
+
+    start = time.perf_counter()
+    for _, definition in indexes:
+        cursor.execute(definition)
+    for table, name, definition in constraints:
+        cursor.execute(f"ALTER TABLE {table} ADD CONSTRAINT {name} {definition}")
+    if indexes or constraints:
+        logger.info(f"Rebuilt {len(indexes)} indexes and {len(constraints)} foreign keys "
+                    f"in {time.perf_counter() - start:.1f}s.")
+    cursor.execute(f"ANALYZE {', '.join(TARGET_TABLES)}")
+    return merged
+
+def backfill(years: list[int] | None = None, concurrency: int = INGEST_CONCURRENCY, rebuild_indexes: bool = True):
+    """
+    Loads every OpenF1 session (of 'years', or all of them) through staging tables.
+    :param years: Seasons to load, every season if None.
+    :param concurrency: Sessions whose payloads download ahead of the one being staged.
+    :param rebuild_indexes: Drop secondary indexes during the merge and rebuild them after.
+    """
+    started = time.perf_counter()
+    raw_connection = engine.raw_connection()
+    try:
+        cursor = raw_connection.cursor()
+        create_staging_tables(cursor)
+        raw_connection.commit()
+
+        staged = stage_openf1(cursor, years, max(1, concurrency))
+        raw_connection.commit()
+        staged_at = time.perf_counter()
+        logger.info(f"Staged {staged} in {staged_at - started:.1f}s.")
+
+        merged = merge_staging(cursor, rebuild_indexes)
+        cursor.execute("SELECT meeting_key FROM backfill_event")
+        meeting_keys = {row[0] for row in cursor.fetchall()}
+        cursor.execute("SELECT session_key FROM backfill_f1session")
+        session_keys = {row[0] for row in cursor.fetchall()}
+        drop_staging_tables(cursor)
+        raw_connection.commit()
+        logger.info(f"Merged {merged} in {time.perf_counter() - staged_at:.1f}s.")
+    except Exception:
+        raw_connection.rollback()
+        raise
+    finally:
+        raw_connection.close()
+
+    with Session(engine) as session:
+        add_teams_colors(session)
+        with session.begin():
+            bump_data_versions(session, {EVENTS_SCOPE, SESSIONS_SCOPE, TEAMS_SCOPE}
+                               | {meeting_scope(key) for key in meeting_keys}
+                               | {session_scope(key) for key in session_keys})
+
+    logger.info(f"Backfill finished in {time.perf_counter() - started:.1f}s. Upstream: {upstream_client.stats.snapshot()}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--year", type=int, action="append", help="season to load, repeatable (default: all)")
+    parser.add_argument("--concurrency", type=int, default=INGEST_CONCURRENCY)
+    parser.add_argument("--keep-indexes", action="store_true", help="don't drop and rebuild secondary indexes")
+    args = parser.parse_args()
+
+    backfill(args.year, args.concurrency, rebuild_indexes=not args.keep_indexes)
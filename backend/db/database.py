@@ -1,6 +1,8 @@
 from sqlmodel import Session, create_engine, SQLModel
 import os
 from dotenv import load_dotenv
+from backend.db.pool import TimedQueuePool
+from backend.db.query_stats import instrument_engine
 
 load_dotenv()
 
@@ -9,7 +11,67 @@ DATABASE_URL = os.getenv("DATABASE_URL")
 if DATABASE_URL.startswith("postgres://"):
     DATABASE_URL = DATABASE_URL.replace("postgres://", "postgresql+psycopg2://", 1)
 
-engine = create_engine(DATABASE_URL, echo=True)
+"""
+Engine settings for each kind of process using the database. The profile is picked with the
+DB_PROFILE environment variable (entrypoints such as update_db set their own default), and any
+setting can be overridden with DB_POOL_SIZE, DB_MAX_OVERFLOW, DB_POOL_TIMEOUT, DB_POOL_PRE_PING,
+DB_POOL_RECYCLE, DB_STATEMENT_TIMEOUT_MS and DB_ECHO.
+"""
+ENGINE_PROFILES = {
+    # many short concurrent reads, fail fast instead of piling up slow queries
+    "api": {"pool_size": 10, "max_overflow": 20, "pool_timeout": 10, "pool_pre_ping": True,
+            "pool_recycle": 1800, "statement_timeout_ms": 5000, "echo": False},
+    # one long-running writer with a couple of helper connections, bulk statements can be slow
+    "ingest": {"pool_size": 2, "max_overflow": 2, "pool_timeout": 30, "pool_pre_ping": True,
+               "pool_recycle": 3600, "statement_timeout_ms": 0, "echo": False},
+    # short-lived scripts needing a single connection
+    "cron": {"pool_size": 1, "max_overflow": 1, "pool_timeout": 30, "pool_pre_ping": True,
+             "pool_recycle": 600, "statement_timeout_ms": 60000, "echo": False},
+}
+
+DB_PROFILE = os.getenv("DB_PROFILE", "api")
+
+def env_flag(name: str, default: bool) -> bool:
+    value = os.getenv(name)
+    if value is None:
+        return default
+    return value.lower() in ("1", "true", "yes")
+
+def engine_settings(profile: str = DB_PROFILE) -> dict:
+    """
+    Returns the engine settings of a profile, with environment variable overrides applied.
+    :param profile: One of ENGINE_PROFILES ("api", "ingest" or "cron").
+    """
+    if profile not in ENGINE_PROFILES:
+        raise ValueError(f"Unknown DB_PROFILE '{profile}', expected one of {sorted(ENGINE_PROFILES)}")
+    settings = dict(ENGINE_PROFILES[profile])
+    settings["pool_size"] = int(os.getenv("DB_POOL_SIZE", settings["pool_size"]))
+    settings["max_overflow"] = int(os.getenv("DB_MAX_OVERFLOW", settings["max_overflow"]))
+    settings["pool_timeout"] = float(os.getenv("DB_POOL_TIMEOUT", settings["pool_timeout"]))
+    settings["pool_pre_ping"] = env_flag("DB_POOL_PRE_PING", settings["pool_pre_ping"])
+    settings["pool_recycle"] = int(os.getenv("DB_POOL_RECYCLE", settings["pool_recycle"]))
+    settings["statement_timeout_ms"] = int(os.getenv("DB_STATEMENT_TIMEOUT_MS", settings["statement_timeout_ms"]))
+    settings["echo"] = env_flag("DB_ECHO", settings["echo"])
+    return settings
+
+def engine_options(settings: dict, asyncpg: bool = False) -> dict:
+    """Translates engine settings into create_engine / create_async_engine keyword arguments."""
+    options = {key: settings[key] for key in
+               ("pool_size", "max_overflow", "pool_timeout", "pool_pre_ping", "pool_recycle", "echo")}
+    timeout_ms = settings["statement_timeout_ms"]
+    if timeout_ms:
+        if asyncpg:
+            options["connect_args"] = {"server_settings": {"statement_timeout": str(timeout_ms)}}
+        else:
+            options["connect_args"] = {"options": f"-c statement_timeout={timeout_ms}"}
+    return options
+
+engine = create_engine(DATABASE_URL, poolclass=TimedQueuePool, **engine_options(engine_settings()))
+# statements per request, for the /metrics endpoint and the API benchmark
+instrument_engine(engine)
+
+# Serves the read endpoints through asyncpg instead, see backend/db/async_database.py
+ASYNC_DB = env_flag("DB_ASYNC", False)
 
 def get_session():
     """Returns the session that will be used to access the database"""
@@ -24,6 +86,8 @@ def create_db_and_tables(populating:bool):
     #uncomment if you want to reset the db (WARNING: WILL LOSE ALL DATA)
     #SQLModel.metadata.drop_all(engine)
     SQLModel.metadata.create_all(engine)
+    from .migrate import run_migrations
+    run_migrations(engine)
     if populating:
         from .update_db import update_db
         update_db()
@@ -1,11 +1,13 @@
-import logging, time, json
+import json, logging, os, re, statistics
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
 from typing import Annotated
-from urllib.error import HTTPError, URLError
-from urllib.request import urlopen
 from fastapi import Depends
 from sqlalchemy import select, distinct
 from sqlmodel import Session
 from backend.db.database import engine, get_session
+from backend.db.response_cache import ResponseCache
+from backend.db.upstream import TokenBucket, UpstreamClient
 from backend.models.driver import Driver
 
 """This script has utilities we use to assist database operations."""
@@ -17,45 +19,71 @@ logging.basicConfig(
 )
 
 SessionDep = Annotated[Session, Depends(get_session)]
-URL_BASE = "https://api.openf1.org/v1/"
+# Overridable to run ingestion against a local stand-in, see backend/benchmarks/openf1_server.py.
+URL_BASE = os.getenv("OPENF1_URL_BASE", "https://api.openf1.org/v1/")
 FALLBACK_COMPOUND = "UNKNOWN"
 
-def get_data(url: str, retries: int = 5, backoff: float = 1.0):
+# OpenF1 starts answering 429 above roughly 3 requests per second.
+OPENF1_RATE_LIMIT = float(os.getenv("OPENF1_RATE_LIMIT", "3"))
+OPENF1_BURST = int(os.getenv("OPENF1_BURST", "3"))
+
+# "on" stores every response on disk, "replay" serves only from disk (no network), "off" disables it.
+OPENF1_CACHE = os.getenv("OPENF1_CACHE", "on").lower()
+OPENF1_CACHE_DIR = Path(os.getenv("OPENF1_CACHE_DIR", Path.home() / ".cache" / "racepace" / "openf1"))
+# Sessions that ended longer ago than this never change again, so their payloads are cached forever.
+FINISHED_SESSION_AFTER = timedelta(hours=6)
+LIVE_CACHE_TTL = 30
+
+openf1_limiter = TokenBucket(OPENF1_RATE_LIMIT, OPENF1_BURST)
+upstream_client = UpstreamClient(
+    limiter=openf1_limiter,
+    cache=ResponseCache(OPENF1_CACHE_DIR) if OPENF1_CACHE in ("on", "replay") else None,
+    replay=OPENF1_CACHE == "replay",
+)
+
+def start_metrics_server():
+    """
+    Serves this process' Prometheus metrics (upstream requests, retries, 429s) on METRICS_PORT,
+    for ingest processes, which have no API to expose them at /metrics. Disabled if it isn't set.
+    """
+    port = int(os.getenv("METRICS_PORT", "0"))
+    if port:
+        from prometheus_client import start_http_server
+        start_http_server(port)
+        logger.info(f"Serving metrics on port {port}.")
+
+def get_data(url: str, retries: int = 5, backoff: float = 1.0, cache_ttl: float | None = 0):
     """
     Fetches data from the OpenF1 API given a request URL.
     OpenF1 API is unstable, so we have a retrying logic in case something fails.
+    Requests go through the shared keep-alive client, see backend/db/upstream.py.
     :param url: URL for which we want to request data.
     :param retries: Number of retries if request fails.
     :param backoff: Time to wait if failure.
+    :param cache_ttl: Seconds a cached response may be reused, None forever, 0 never (see session_cache_ttl).
     :return: Data requested, a list of dictionaries.
     """
-    for attempt in range(retries):
-        try:
-            with urlopen(url) as response:
-                return json.loads(response.read().decode("utf-8"))
-
-        except HTTPError as e:
-            if e.code == 429:
-                wait_time = 15 * (attempt + 1)
-                logger.warning(f"HTTP 429 Too Many Requests: Waiting {wait_time}s before retrying ({attempt+1}/{retries}) → {url}")
-                time.sleep(wait_time)
-            elif 500 <= e.code < 600:
-                logger.warning(f"[Retry {attempt+1}/{retries}] HTTP {e.code}: {url}")
-                time.sleep(backoff * (attempt + 1))
-            else:
-                logger.error(f"Non-retryable HTTPError {e.code} on {url}")
-                raise
-
-        except URLError as e:
-            logger.warning(f"[Retry {attempt+1}/{retries}] URLError: {e.reason} → {url}")
-            time.sleep(backoff * (attempt + 1))
-
-        except Exception as e:
-            logger.error(f"Unexpected error: {e}")
-            raise
-
-    logger.error(f"❌ Failed after {retries} retries: {url}")
-    return None
+    return upstream_client.get_json(url, retries=retries, backoff=backoff, cache_ttl=cache_ttl)
+
+def session_cache_ttl(f1session: dict) -> float | None:
+    """
+    Decides how long the OpenF1 payloads of a session can be served from the on-disk cache.
+    :param f1session: Session as returned by the OpenF1 'sessions' endpoint.
+    :return: None (forever) for finished sessions, LIVE_CACHE_TTL seconds otherwise. Empty payloads are
+        refetched regardless, they may not be published yet (see UpstreamClient.fetch).
+    """
+    date_end = f1session.get('date_end')
+    if not date_end:
+        return LIVE_CACHE_TTL
+    try:
+        ended_at = datetime.fromisoformat(date_end)
+    except ValueError:
+        return LIVE_CACHE_TTL
+    if ended_at.tzinfo is None:
+        ended_at = ended_at.replace(tzinfo=timezone.utc)
+    if datetime.now(timezone.utc) - ended_at > FINISHED_SESSION_AFTER:
+        return None
+    return LIVE_CACHE_TTL
 
 def get_session_keys():
     """
@@ -100,3 +128,106 @@ def map_stints_laps(stints: list[dict]):
             )
             
     return stints_hashmap
+
+def is_clean_lap(lap) -> bool:
+    """A clean lap has a recorded time and isn't an out lap from the pits."""
+    return bool(lap.lap_time) and not lap.is_pit_out_lap
+
+def split_stints(laps) -> list[list]:
+    """
+    Splits a driver's laps, ordered by lap number, into stints.
+    A new stint starts when the driver leaves the pits or the compound changes.
+    :param laps: Objects with the 'SessionLaps' attributes.
+    :return: List of stints, each a list of laps.
+    """
+    stints = []
+    for lap in laps:
+        compound = lap.compound or FALLBACK_COMPOUND
+        if not stints or lap.is_pit_out_lap or compound != (stints[-1][-1].compound or FALLBACK_COMPOUND):
+            stints.append([])
+        stints[-1].append(lap)
+    return stints
+
+def compute_driver_stats(laps) -> dict:
+    """
+    Computes a driver's session statistics from their laps, ordered by lap number.
+    :param laps: Objects with the 'SessionLaps' attributes.
+    :return: Dictionary with the 'SessionDriverStats' columns (except the keys).
+    """
+    clean_times = [lap.lap_time for lap in laps if is_clean_lap(lap)]
+    speeds = [lap.st_speed for lap in laps if lap.st_speed]
+
+    stints = []
+    for number, stint_laps in enumerate(split_stints(laps), start=1):
+        stint_times = [lap.lap_time for lap in stint_laps if is_clean_lap(lap)]
+        stints.append({
+            "stint": number,
+            "compound": stint_laps[0].compound or FALLBACK_COMPOUND,
+            "start_lap": stint_laps[0].lap_number,
+            "end_lap": stint_laps[-1].lap_number,
+            "laps": len(stint_laps),
+            "average_lap": round(statistics.fmean(stint_times), 3) if stint_times else None,
+        })
+
+    return {
+        "lap_count": len(laps),
+        "best_lap": min(clean_times) if clean_times else None,
+        "median_clean_lap": round(statistics.median(clean_times), 3) if clean_times else None,
+        "top_speed_trap": max(speeds) if speeds else None,
+        "stints": stints,
+    }
+
+
+LAPPED_GAP = re.compile(r"^\+(\d+) LAPS?$")
+
+def parse_result_value(value):
+    """
+    Normalizes a session_result 'duration' or 'gap_to_leader' value, as sent by OpenF1 or as stored
+    as text before migration 0003 (e.g. "[80.1, None, 79.5]", "None", "+1 LAP").
+    Values that are none of these (e.g. "DNF") are logged and stored as None, so one odd value
+    doesn't fail the results of the whole session.
+    :return: A float, a list of floats/None (qualifying segments), a lapped gap string or None.
+    """
+    if isinstance(value, list):
+        return [parse_result_value(segment) for segment in value]
+    if not isinstance(value, str):
+        return value
+    value = value.strip()
+    if value in ("", "None"):
+        return None
+    if LAPPED_GAP.match(value):
+        return value
+    try:
+        if value.startswith("["):
+            return parse_result_value(json.loads(value.replace("None", "null")))
+        return float(value)
+    except ValueError:
+        logger.warning(f"Unexpected session result time {value!r}, stored as None.")
+        return None
+
+def last_not_none(values: list):
+    return next((value for value in reversed(values) if value is not None), None)
+
+def parse_result_times(duration, gap_to_leader) -> dict:
+    """
+    Splits a driver's session result times into typed 'SessionResult' columns.
+    Qualifying sends one value per segment: they go to q1/q2/q3 and the last segment the driver
+    reached becomes duration and gap_to_leader. Lapped cars get a "+N LAP(S)" gap instead of seconds.
+    :return: Dictionary with duration, gap_to_leader, q1, q2, q3, lapped and laps_behind.
+    """
+    duration, gap_to_leader = parse_result_value(duration), parse_result_value(gap_to_leader)
+    times = {"q1": None, "q2": None, "q3": None, "lapped": False, "laps_behind": None}
+
+    if isinstance(duration, list):
+        times.update(zip(("q1", "q2", "q3"), duration))
+        duration = last_not_none(duration)
+    if isinstance(gap_to_leader, list):
+        gap_to_leader = last_not_none(gap_to_leader)
+    if isinstance(gap_to_leader, str):
+        times["lapped"] = True
+        times["laps_behind"] = int(LAPPED_GAP.match(gap_to_leader).group(1))
+        gap_to_leader = None
+
+    times["duration"] = duration
+    times["gap_to_leader"] = gap_to_leader
+    return times
@@ -0,0 +1,132 @@
+import time
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import datetime, timezone
+
+from prometheus_client import Histogram
+
+from backend.db.upstream import RequestStats
+
+"""
+Stage timings of ingest runs. Ingest functions wrap their work in timed("<stage>"), which adds to
+the timings of the session being ingested when a run records them (see IngestRunReport.session),
+and does nothing otherwise, e.g. in the live poller. Stages don't nest, so they add up to the
+time spent on a session. At the end of a run the report gives the time per stage, the slowest
+sessions, the bytes fetched from upstream and the rows written; update_db stores it as an IngestRun.
+"""
+
+# Stages timed for every session, in the order they run.
+TIMED_STAGES = ("fetch", "metadata", "drivers", "transform", "laps_upsert", "driver_stats", "results", "commit")
+SLOWEST_SESSIONS = 10
+
+INGEST_STAGE_SECONDS = Histogram("ingest_stage_seconds", "Time spent on an ingest stage of one session.", ["stage"],
+                                 buckets=(0.001, 0.005, 0.01, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30))
+
+
+class SessionTimings:
+    """Seconds per stage and rows written per table while ingesting one session."""
+
+    def __init__(self, session_key: int):
+        self.session_key = session_key
+        self.stages: dict[str, float] = {}
+        self.rows: Counter = Counter()
+        self.failed = False
+
+    @property
+    def seconds(self) -> float:
+        return sum(self.stages.values())
+
+
+current_timings: ContextVar[SessionTimings | None] = ContextVar("current_ingest_timings", default=None)
+
+@contextmanager
+def timed(stage: str):
+    """Adds the time spent in the block to a stage of the session being ingested, if timings are recorded."""
+    timings = current_timings.get()
+    if timings is None:
+        yield
+        return
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        timings.stages[stage] = timings.stages.get(stage, 0.0) + time.perf_counter() - started
+
+def count_rows(table: str, rows: int):
+    """Records rows written (inserted or changed) for the session being ingested, if timings are recorded."""
+    timings = current_timings.get()
+    if timings is not None:
+        timings.rows[table] += rows
+
+
+class IngestRunReport:
+    """
+    Collects the timings of every session of an ingest run.
+    :param kind: What ran, e.g. "update_db".
+    :param upstream_stats: Request statistics of the upstream client, read at the start and end of the run.
+    """
+
+    def __init__(self, kind: str, upstream_stats: RequestStats):
+        self.kind = kind
+        self.started_at = datetime.now(timezone.utc)
+        self.sessions: list[SessionTimings] = []
+        self._started = time.perf_counter()
+        self._upstream_stats = upstream_stats
+        self._upstream_at_start = upstream_stats.snapshot()
+
+    @contextmanager
+    def session(self, session_key: int):
+        """Records the stages timed inside the block as the timings of one session."""
+        timings = SessionTimings(session_key)
+        token = current_timings.set(timings)
+        try:
+            yield timings
+        finally:
+            current_timings.reset(token)
+            self.sessions.append(timings)
+            for stage, seconds in timings.stages.items():
+                INGEST_STAGE_SECONDS.labels(stage).observe(seconds)
+
+    def summary(self) -> dict:
+        upstream = self._upstream_stats.snapshot()
+        rows = Counter()
+        for timings in self.sessions:
+            rows.update(timings.rows)
+        slowest = sorted(self.sessions, key=lambda timings: timings.seconds, reverse=True)[:SLOWEST_SESSIONS]
+        return {
+            "kind": self.kind,
+            "started_at": self.started_at,
+            "finished_at": datetime.now(timezone.utc),
+            "seconds": round(time.perf_counter() - self._started, 3),
+            "sessions": sum(1 for timings in self.sessions if not timings.failed),
+            "failed_sessions": sum(1 for timings in self.sessions if timings.failed),
+            "upstream_requests": upstream["requests"] - self._upstream_at_start["requests"],
+            "bytes_fetched": upstream["bytes_received"] - self._upstream_at_start["bytes_received"],
+            "bytes_decoded": upstream["bytes_decoded"] - self._upstream_at_start["bytes_decoded"],
+            "stage_seconds": {stage: round(sum(timings.stages.get(stage, 0.0) for timings in self.sessions), 3)
+                              for stage in TIMED_STAGES},
+            "rows_written": dict(rows),
+            "slowest_sessions": [
+                {"session_key": timings.session_key, "seconds": round(timings.seconds, 3), "failed": timings.failed,
+                 "stages": {stage: round(seconds, 3) for stage, seconds in timings.stages.items()}}
+                for timings in slowest
+            ],
+        }
+
+def format_summary(summary: dict) -> str:
+    """Multi-line, human readable version of IngestRunReport.summary() for the logs."""
+    staged = sum(summary["stage_seconds"].values()) or 1.0
+    lines = [
+        f"{summary['kind']} run: {summary['sessions']} sessions ingested, {summary['failed_sessions']} failed "
+        f"in {summary['seconds']:.1f}s; {summary['upstream_requests']} upstream requests, "
+        f"{summary['bytes_fetched'] / 1e6:.1f} MB fetched ({summary['bytes_decoded'] / 1e6:.1f} MB decoded); "
+        f"rows written: {summary['rows_written']}",
+        "  time per stage: " + ", ".join(f"{stage} {seconds:.2f}s ({seconds / staged:.0%})"
+                                         for stage, seconds in summary["stage_seconds"].items()),
+    ]
+    for session in summary["slowest_sessions"]:
+        stages = ", ".join(f"{stage} {seconds:.2f}s" for stage, seconds in session["stages"].items())
+        lines.append(f"  session {session['session_key']}: {session['seconds']:.2f}s"
+                     f"{' (failed)' if session['failed'] else ''} - {stages}")
+    return "\n".join(lines)
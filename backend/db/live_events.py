@@ -0,0 +1,166 @@
+import asyncio, json, os, select as socket_select, threading, time
+from collections import defaultdict
+
+import psycopg2.extensions
+from sqlalchemy import func, select
+from sqlmodel import Session
+
+from backend.db.database import engine
+from backend.db.db_utils import logger
+
+"""
+Live lap and result events. Ingest publishes the rows each upsert actually changed with Postgres
+NOTIFY, in the same transaction, so they're delivered when it commits. Every API process holds a
+single LISTEN connection, in a background thread, and fans the events out to the asyncio queues
+of the clients streaming that session (see backend/api/live.py).
+
+Event payloads are JSON: {"session_key": 9523, "type": "laps" | "results", "items": [...]},
+split across several notifications when they don't fit in NOTIFY_MAX_BYTES.
+"""
+
+LIVE_CHANNEL = "racepace_live"
+# Postgres rejects notification payloads of 8000 bytes or more.
+NOTIFY_MAX_BYTES = 7900
+# Events a client may fall behind by before its stream is closed (it reconnects and reloads).
+SUBSCRIBER_QUEUE_SIZE = int(os.getenv("LIVE_SUBSCRIBER_QUEUE_SIZE", "256"))
+# How often the listener wakes up without notifications, to notice a dead connection.
+LISTEN_TIMEOUT_SECONDS = 5.0
+
+def event_payloads(session_key: int, kind: str, items: list[dict]) -> list[str]:
+    """Encodes an event as one or more NOTIFY payloads, splitting its items to fit NOTIFY_MAX_BYTES."""
+    header = f'{{"session_key": {session_key}, "type": {json.dumps(kind)}, "items": ['
+    payloads, chunk, size = [], [], len(header) + 2
+    for item in items:
+        encoded = json.dumps(item, separators=(",", ":"))
+        if chunk and size + len(encoded) + 1 > NOTIFY_MAX_BYTES:
+            payloads.append(header + ",".join(chunk) + "]}")
+            chunk, size = [], len(header) + 2
+        chunk.append(encoded)
+        size += len(encoded) + 1
+    if chunk:
+        payloads.append(header + ",".join(chunk) + "]}")
+    return payloads
+
+def publish_live_event(session: Session, session_key: int, kind: str, items: list[dict]):
+    """
+    Publishes changed rows of a session, as part of the caller's transaction.
+    :param session: Database session, the event is delivered when it commits.
+    :param session_key: Session the rows belong to.
+    :param kind: "laps" or "results".
+    :param items: Changed rows, each with a driver_number.
+    """
+    for payload in event_payloads(session_key, kind, items):
+        session.execute(select(func.pg_notify(LIVE_CHANNEL, payload)))
+
+
+class Subscription:
+    """Queue of events of one session (optionally one driver) for one streaming client."""
+
+    def __init__(self, session_key: int, driver_number: int | None, loop: asyncio.AbstractEventLoop):
+        self.session_key = session_key
+        self.driver_number = driver_number
+        self.loop = loop
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=SUBSCRIBER_QUEUE_SIZE)
+        self.overflowed = False
+
+    def matching(self, event: dict) -> dict | None:
+        """The event restricted to the subscribed driver, None if nothing in it concerns them."""
+        if self.driver_number is None:
+            return event
+        items = [item for item in event["items"] if item.get("driver_number") == self.driver_number]
+        return {**event, "items": items} if items else None
+
+    def push(self, event: dict):
+        """Runs on the subscriber's event loop."""
+        try:
+            self.queue.put_nowait(event)
+        except asyncio.QueueFull:
+            self.overflowed = True
+            # wake the stream up so it can see it fell behind
+            self.queue.get_nowait()
+            self.queue.put_nowait(None)
+
+
+class LiveBroker:
+    """Single LISTEN connection per process, fanning notifications out to subscriptions."""
+
+    def __init__(self, channel: str = LIVE_CHANNEL):
+        self.channel = channel
+        self._subscriptions: dict[int, set[Subscription]] = defaultdict(set)
+        self._lock = threading.Lock()
+        self._thread: threading.Thread | None = None
+        self._listening = threading.Event()
+        self.delivered = 0
+
+    def subscribe(self, session_key: int, driver_number: int | None = None) -> Subscription:
+        """Subscribes the running event loop to a session's events, starting the listener if needed."""
+        subscription = Subscription(session_key, driver_number, asyncio.get_running_loop())
+        with self._lock:
+            self._subscriptions[session_key].add(subscription)
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._listen, name="live-events-listener", daemon=True)
+                self._thread.start()
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription):
+        with self._lock:
+            subscribers = self._subscriptions.get(subscription.session_key)
+            if subscribers is not None:
+                subscribers.discard(subscription)
+                if not subscribers:
+                    del self._subscriptions[subscription.session_key]
+
+    def wait_listening(self, timeout: float | None = None) -> bool:
+        """Blocks until the listener is connected, events published before that aren't received."""
+        return self._listening.wait(timeout)
+
+    def dispatch(self, payload: str):
+        """Delivers one notification to the subscriptions of its session."""
+        try:
+            event = json.loads(payload)
+        except ValueError:
+            logger.warning(f"Ignoring malformed live event: {payload[:200]}")
+            return
+        with self._lock:
+            subscriptions = list(self._subscriptions.get(event.get("session_key"), ()))
+        for subscription in subscriptions:
+            matching = subscription.matching(event)
+            if matching is not None:
+                subscription.loop.call_soon_threadsafe(subscription.push, matching)
+                self.delivered += 1
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "listening": self._listening.is_set(),
+                "sessions": len(self._subscriptions),
+                "subscribers": sum(len(subscribers) for subscribers in self._subscriptions.values()),
+                "delivered": self.delivered,
+            }
+
+    def _listen(self):
+        while True:
+            dbapi_connection = None
+            try:
+                # detached from the pool: this connection is held for the life of the process
+                connection = engine.raw_connection()
+                dbapi_connection = connection.driver_connection
+                connection.detach()
+                dbapi_connection.set_isolation_level(psycopg2.extensions.ISOLATION_LEVEL_AUTOCOMMIT)
+                dbapi_connection.cursor().execute(f"LISTEN {self.channel}")
+                self._listening.set()
+                logger.info(f"Listening for live events on '{self.channel}'.")
+                while True:
+                    socket_select.select([dbapi_connection], [], [], LISTEN_TIMEOUT_SECONDS)
+                    dbapi_connection.poll()
+                    while dbapi_connection.notifies:
+                        self.dispatch(dbapi_connection.notifies.pop(0).payload)
+            except Exception:
+                self._listening.clear()
+                logger.error("Live events listener failed, reconnecting", exc_info=True)
+                if dbapi_connection is not None and not dbapi_connection.closed:
+                    dbapi_connection.close()
+                time.sleep(1)
+
+
+live_broker = LiveBroker()
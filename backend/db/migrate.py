@@ -0,0 +1,117 @@
+import argparse, importlib, pkgutil
+from contextlib import contextmanager
+from types import ModuleType
+
+from sqlalchemy import Engine, func, select
+from sqlalchemy.dialects.postgresql import insert
+
+from backend.db.db_utils import logger
+from backend.models.schema_migration import SchemaMigration
+
+"""
+Versioned schema migrations. SQLModel.metadata.create_all only creates missing tables, so every
+change to an existing table (indexes, column types, backfills) is a module in backend/db/migrations
+named '<version>_<name>.py' with an upgrade(connection) and a downgrade(connection) function.
+Pending migrations run in version order, each in its own transaction, and are recorded in the
+schema_migrations table. Migrations must also work on a database freshly created by create_all
+from the current models (use IF EXISTS / IF NOT EXISTS), and must not import models or helpers
+that may change later: write the DDL and any data conversion out in the migration.
+Statements that can't run in a transaction (CREATE INDEX CONCURRENTLY) go in a migration with
+TRANSACTIONAL = False, which runs on an autocommit connection and must be safe to run again.
+Migrations run without the engine's statement_timeout, index builds and table rewrites can be slow.
+
+Usage:
+    python -m backend.db.migrate            # apply pending migrations
+    python -m backend.db.migrate --status   # list migrations and whether they were applied
+"""
+
+MIGRATIONS_PACKAGE = "backend.db.migrations"
+# pg_advisory_lock key, so API workers starting together and update_db don't migrate concurrently
+MIGRATION_LOCK_KEY = 7_221_001
+
+def discover_migrations() -> list[tuple[str, str, ModuleType]]:
+    """Returns (version, name, module) of every migration, in version order."""
+    package = importlib.import_module(MIGRATIONS_PACKAGE)
+    migrations = []
+    for module_info in pkgutil.iter_modules(package.__path__):
+        version, _, name = module_info.name.partition("_")
+        module = importlib.import_module(f"{MIGRATIONS_PACKAGE}.{module_info.name}")
+        migrations.append((version, name, module))
+    return sorted(migrations, key=lambda migration: migration[0])
+
+def applied_versions(connection) -> set[str]:
+    SchemaMigration.__table__.create(connection, checkfirst=True)
+    return set(connection.execute(select(SchemaMigration.version)).scalars())
+
+@contextmanager
+def without_statement_timeout(connection):
+    """
+    Lifts the statement_timeout of the engine profile (5 s for the API) on a connection, so waiting
+    for the migration lock or building an index isn't cancelled. The connection goes back to the
+    pool afterwards, so the timeout is restored.
+    """
+    connection.exec_driver_sql("SET statement_timeout = 0")
+    connection.commit()
+    try:
+        yield connection
+    finally:
+        connection.rollback()
+        connection.exec_driver_sql("RESET statement_timeout")
+        connection.commit()
+
+def apply_migration(engine: Engine, connection, module: ModuleType):
+    if getattr(module, "TRANSACTIONAL", True):
+        with connection.begin():
+            module.upgrade(connection)
+    else:
+        with engine.connect() as autocommit, without_statement_timeout(
+                autocommit.execution_options(isolation_level="AUTOCOMMIT")):
+            module.upgrade(autocommit)
+
+def run_migrations(engine: Engine) -> list[str]:
+    """
+    Applies pending migrations.
+    :param engine: Engine of the database to migrate.
+    :return: Versions that were applied.
+    """
+    applied = []
+    with engine.connect() as connection, without_statement_timeout(connection):
+        connection.execute(select(func.pg_advisory_lock(MIGRATION_LOCK_KEY)))
+        try:
+            done = applied_versions(connection)
+            connection.commit()
+            for version, name, module in discover_migrations():
+                if version in done:
+                    continue
+                logger.info(f"Applying migration {version} ({name})")
+                apply_migration(engine, connection, module)
+                with connection.begin():
+                    connection.execute(insert(SchemaMigration).values(
+                        version=version, name=name, applied_at=func.now()
+                    ))
+                applied.append(version)
+        finally:
+            connection.rollback()
+            connection.execute(select(func.pg_advisory_unlock(MIGRATION_LOCK_KEY)))
+            connection.commit()
+    return applied
+
+def migration_status(engine: Engine) -> list[tuple[str, str, bool]]:
+    with engine.connect() as connection:
+        done = applied_versions(connection)
+        connection.commit()
+    return [(version, name, version in done) for version, name, _ in discover_migrations()]
+
+if __name__ == "__main__":
+    from backend.db.database import engine
+
+    parser = argparse.ArgumentParser(description="Applies pending schema migrations.")
+    parser.add_argument("--status", action="store_true", help="only list migrations and whether they were applied")
+    args = parser.parse_args()
+
+    if args.status:
+        for version, name, done in migration_status(engine):
+            print(f"{version}  {'applied' if done else 'pending':<8} {name}")
+    else:
+        applied = run_migrations(engine)
+        print(f"Applied {len(applied)} migration(s)" + (f": {', '.join(applied)}" if applied else ""))
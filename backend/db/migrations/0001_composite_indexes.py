@@ -0,0 +1,53 @@
+"""
+Composite indexes matching the read queries in backend/crud, replacing single-column indexes
+that became prefixes of them. The INCLUDE columns let per-session lap and driver reads run as
+index-only scans.
+The indexes are built CONCURRENTLY, so ingest writes aren't blocked for the whole build, which
+can't happen in a transaction. downgrade stays transactional, query_plans rolls it back.
+"""
+
+TRANSACTIONAL = False
+
+INDEXES = [
+    # laps of a session, or of one driver in a session, in lap order (crud/lap.py, crud/analytics.py)
+    "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_sessionlaps_session_driver_lap ON sessionlaps "
+    "(session_key, driver_id, lap_number) INCLUDE (id, lap_time, is_pit_out_lap, compound, st_speed)",
+    # a driver of a session by car number, and session drivers ordered by number (crud/driver.py)
+    "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_sessiondriver_session_number ON sessiondriver "
+    "(session_key, driver_number) INCLUDE (driver_id, team)",
+    # session classification ordered by position (crud/f1session.py)
+    "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_sessionresult_session_position ON sessionresult (session_key, position)",
+    # latest session (update_db.fetch_latest_session)
+    "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_f1session_date ON f1session (date)",
+]
+
+# covered by the composite indexes above, or by the (session_key, driver_id) primary keys and uq_lap
+REDUNDANT_INDEXES = {
+    "ix_sessionlaps_session_key": "sessionlaps (session_key)",
+    "ix_sessionlaps_driver_id": "sessionlaps (driver_id)",
+    "ix_sessiondriver_session_key": "sessiondriver (session_key)",
+    "ix_sessionresult_session_key": "sessionresult (session_key)",
+}
+
+def index_name(statement: str) -> str:
+    return statement.split(" ON ")[0].split()[-1]
+
+def is_invalid(connection, name: str) -> bool:
+    """A concurrent build that failed leaves an invalid index behind, which IF NOT EXISTS would keep."""
+    return bool(connection.exec_driver_sql(
+        "SELECT NOT indisvalid FROM pg_index WHERE indexrelid = to_regclass(%(name)s)", {"name": name}
+    ).scalar())
+
+def upgrade(connection):
+    for statement in INDEXES:
+        if is_invalid(connection, index_name(statement)):
+            connection.exec_driver_sql(f"DROP INDEX CONCURRENTLY {index_name(statement)}")
+        connection.exec_driver_sql(statement)
+    for name in REDUNDANT_INDEXES:
+        connection.exec_driver_sql(f"DROP INDEX CONCURRENTLY IF EXISTS {name}")
+
+def downgrade(connection):
+    for statement in INDEXES:
+        connection.exec_driver_sql(f"DROP INDEX IF EXISTS {index_name(statement)}")
+    for name, target in REDUNDANT_INDEXES.items():
+        connection.exec_driver_sql(f"CREATE INDEX IF NOT EXISTS {name} ON {target}")
@@ -0,0 +1,21 @@
+"""
+Stores F1Session.date as timestamptz instead of the OpenF1 ISO string, so sessions can be
+compared and ranged by time through ix_f1session_date.
+"""
+
+def column_type(connection) -> str:
+    return connection.exec_driver_sql(
+        "SELECT data_type FROM information_schema.columns WHERE table_name = 'f1session' AND column_name = 'date'"
+    ).scalar()
+
+def upgrade(connection):
+    # databases created after this change already have the column as timestamptz
+    if column_type(connection) != "timestamp with time zone":
+        connection.exec_driver_sql("ALTER TABLE f1session ALTER COLUMN date TYPE timestamptz USING date::timestamptz")
+
+def downgrade(connection):
+    if column_type(connection) == "timestamp with time zone":
+        connection.exec_driver_sql(
+            "ALTER TABLE f1session ALTER COLUMN date TYPE varchar "
+            "USING to_char(date AT TIME ZONE 'UTC', 'YYYY-MM-DD\"T\"HH24:MI:SS\"+00:00\"')"
+        )
@@ -0,0 +1,100 @@
+"""
+Replaces the text duration/gap_to_leader of SessionResult (str() of the OpenF1 value, e.g.
+"[80.1, None, 79.5]") with numeric columns, qualifying segments in q1/q2/q3 and a lapped flag.
+Existing rows are parsed the way ingest parsed them when this migration was written: the parsing
+is copied here rather than imported, so later changes to ingest don't change what it does.
+"""
+import json, logging, re
+
+logger = logging.getLogger(__name__)
+
+LAPPED_GAP = re.compile(r"^\+(\d+) LAPS?$")
+
+NEW_COLUMNS = {
+    "q1": "double precision",
+    "q2": "double precision",
+    "q3": "double precision",
+    "lapped": "boolean NOT NULL DEFAULT false",
+    "laps_behind": "integer",
+}
+
+def parse_value(value):
+    """A stored text value as a float, a list of segments, a "+N LAP(S)" gap or None if it's anything else."""
+    if isinstance(value, list):
+        return [parse_value(segment) for segment in value]
+    if not isinstance(value, str):
+        return value
+    value = value.strip()
+    if value in ("", "None"):
+        return None
+    if LAPPED_GAP.match(value):
+        return value
+    try:
+        if value.startswith("["):
+            return parse_value(json.loads(value.replace("None", "null")))
+        return float(value)
+    except ValueError:
+        logger.warning(f"Unexpected session result time {value!r}, stored as None.")
+        return None
+
+def last_not_none(values: list):
+    return next((value for value in reversed(values) if value is not None), None)
+
+def parse_times(duration, gap_to_leader) -> dict:
+    duration, gap_to_leader = parse_value(duration), parse_value(gap_to_leader)
+    times = {"q1": None, "q2": None, "q3": None, "lapped": False, "laps_behind": None}
+    if isinstance(duration, list):
+        times.update(zip(("q1", "q2", "q3"), duration))
+        duration = last_not_none(duration)
+    if isinstance(gap_to_leader, list):
+        gap_to_leader = last_not_none(gap_to_leader)
+    if isinstance(gap_to_leader, str):
+        times["lapped"] = True
+        times["laps_behind"] = int(LAPPED_GAP.match(gap_to_leader).group(1))
+        gap_to_leader = None
+    times["duration"] = duration
+    times["gap_to_leader"] = gap_to_leader
+    return times
+
+def column_type(connection, column: str) -> str:
+    return connection.exec_driver_sql(
+        "SELECT data_type FROM information_schema.columns WHERE table_name = 'sessionresult' AND column_name = %s",
+        (column,)
+    ).scalar()
+
+def upgrade(connection):
+    # databases created after this change already have the numeric columns
+    if column_type(connection, "duration") == "double precision":
+        return
+    for column, definition in NEW_COLUMNS.items():
+        connection.exec_driver_sql(f"ALTER TABLE sessionresult ADD COLUMN IF NOT EXISTS {column} {definition}")
+    connection.exec_driver_sql("ALTER TABLE sessionresult ADD COLUMN duration_value double precision, "
+                               "ADD COLUMN gap_value double precision")
+
+    rows = connection.exec_driver_sql(
+        "SELECT session_key, driver_id, duration, gap_to_leader FROM sessionresult"
+    ).all()
+    updates = []
+    for session_key, driver_id, duration, gap_to_leader in rows:
+        times = parse_times(duration, gap_to_leader)
+        updates.append((times["duration"], times["gap_to_leader"], times["q1"], times["q2"], times["q3"],
+                        times["lapped"], times["laps_behind"], session_key, driver_id))
+    if updates:
+        connection.exec_driver_sql(
+            "UPDATE sessionresult SET duration_value = %s, gap_value = %s, q1 = %s, q2 = %s, q3 = %s, "
+            "lapped = %s, laps_behind = %s WHERE session_key = %s AND driver_id = %s",
+            updates
+        )
+
+    connection.exec_driver_sql("ALTER TABLE sessionresult DROP COLUMN duration, DROP COLUMN gap_to_leader")
+    connection.exec_driver_sql("ALTER TABLE sessionresult RENAME COLUMN duration_value TO duration")
+    connection.exec_driver_sql("ALTER TABLE sessionresult RENAME COLUMN gap_value TO gap_to_leader")
+
+def downgrade(connection):
+    # lossy: qualifying segments and lapped gaps aren't folded back into the text columns
+    if column_type(connection, "duration") != "double precision":
+        return
+    connection.exec_driver_sql("ALTER TABLE sessionresult ALTER COLUMN duration TYPE varchar USING duration::text, "
+                               "ALTER COLUMN gap_to_leader TYPE varchar USING gap_to_leader::text")
+    for column in NEW_COLUMNS:
+        connection.exec_driver_sql(f"ALTER TABLE sessionresult DROP COLUMN IF EXISTS {column}")
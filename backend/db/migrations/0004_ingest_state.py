@@ -0,0 +1,41 @@
+"""
+Adds the ingeststate table that update_db checkpoints every session in, and records the sessions
+already in the database as ingested. The latest ones stay pending, so the first run after this
+polls them again the way update_db used to restart from the latest session.
+The table is created as the IngestState model was when this migration was written.
+"""
+
+def upgrade(connection):
+    connection.exec_driver_sql("""
+        CREATE TABLE IF NOT EXISTS ingeststate (
+            session_key INTEGER NOT NULL,
+            meeting_key INTEGER NOT NULL,
+            date_start TIMESTAMP WITH TIME ZONE NOT NULL,
+            date_end TIMESTAMP WITH TIME ZONE,
+            status VARCHAR NOT NULL,
+            meeting_at TIMESTAMP WITH TIME ZONE,
+            session_at TIMESTAMP WITH TIME ZONE,
+            laps_at TIMESTAMP WITH TIME ZONE,
+            results_at TIMESTAMP WITH TIME ZONE,
+            last_synced_at TIMESTAMP WITH TIME ZONE,
+            attempts INTEGER NOT NULL,
+            last_error VARCHAR,
+            next_attempt_at TIMESTAMP WITH TIME ZONE,
+            updated_at TIMESTAMP WITH TIME ZONE NOT NULL,
+            PRIMARY KEY (session_key)
+        )
+    """)
+    connection.exec_driver_sql("CREATE INDEX IF NOT EXISTS ix_ingeststate_status ON ingeststate (status)")
+    connection.exec_driver_sql("CREATE INDEX IF NOT EXISTS ix_ingeststate_date_start ON ingeststate (date_start)")
+    connection.exec_driver_sql("""
+        INSERT INTO ingeststate (session_key, meeting_key, date_start, status, meeting_at, session_at,
+                                 laps_at, results_at, last_synced_at, attempts, updated_at)
+        SELECT s.session_key, s.meeting_key, s.date,
+               CASE WHEN s.date >= latest.date THEN 'pending' ELSE 'done' END,
+               now(), now(), now(), now(), now(), 0, now()
+        FROM f1session s, (SELECT max(date) AS date FROM f1session) latest
+        ON CONFLICT (session_key) DO NOTHING
+    """)
+
+def downgrade(connection):
+    connection.exec_driver_sql("DROP TABLE IF EXISTS ingeststate")
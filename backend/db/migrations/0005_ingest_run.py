@@ -0,0 +1,29 @@
+"""
+Adds the ingestrun table, where every update_db run stores its timing summary.
+The table is created as the IngestRun model was when this migration was written.
+"""
+
+def upgrade(connection):
+    connection.exec_driver_sql("""
+        CREATE TABLE IF NOT EXISTS ingestrun (
+            id SERIAL NOT NULL,
+            kind VARCHAR NOT NULL,
+            started_at TIMESTAMP WITH TIME ZONE NOT NULL,
+            finished_at TIMESTAMP WITH TIME ZONE NOT NULL,
+            seconds FLOAT NOT NULL,
+            sessions INTEGER NOT NULL,
+            failed_sessions INTEGER NOT NULL,
+            upstream_requests INTEGER NOT NULL,
+            bytes_fetched BIGINT NOT NULL,
+            bytes_decoded BIGINT NOT NULL,
+            stage_seconds JSONB NOT NULL,
+            rows_written JSONB NOT NULL,
+            slowest_sessions JSONB NOT NULL,
+            profile_path VARCHAR,
+            PRIMARY KEY (id)
+        )
+    """)
+    connection.exec_driver_sql("CREATE INDEX IF NOT EXISTS ix_ingestrun_started_at ON ingestrun (started_at)")
+
+def downgrade(connection):
+    connection.exec_driver_sql("DROP TABLE IF EXISTS ingestrun")
@@ -0,0 +1,27 @@
+"""
+Records a data version for every session and meeting ingested before the dataversion table
+existed. The API decides how long a response may be cached from when its session or meeting
+was last updated, and without a row it treats it as live, so the whole history got a 5 s
+max-age until it happened to be ingested again. The seeded versions are dated when the session
+ended (its start when the end isn't known), and the latest session of a meeting for meetings.
+API processes already running when update_db applies this only see the rows after a restart.
+"""
+
+def upgrade(connection):
+    connection.exec_driver_sql("""
+        INSERT INTO dataversion (scope, version, updated_at)
+        SELECT 'session:' || s.session_key, 1, coalesce(i.date_end, s.date)
+        FROM f1session s LEFT JOIN ingeststate i ON i.session_key = s.session_key
+        ON CONFLICT (scope) DO NOTHING
+    """)
+    connection.exec_driver_sql("""
+        INSERT INTO dataversion (scope, version, updated_at)
+        SELECT 'meeting:' || s.meeting_key, 1, max(coalesce(i.date_end, s.date))
+        FROM f1session s LEFT JOIN ingeststate i ON i.session_key = s.session_key
+        GROUP BY s.meeting_key
+        ON CONFLICT (scope) DO NOTHING
+    """)
+
+def downgrade(connection):
+    # versions only ever go up, the seeded rows are left in place
+    pass
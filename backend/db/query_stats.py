@@ -0,0 +1,69 @@
+import threading, time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+"""
+Counts the SQL statements a unit of work (an API request, a benchmark call) runs and the time
+spent in them, through the engine's cursor execution events. Counters live in a context variable,
+so concurrent requests are counted separately: the threadpool running sync routes and the
+greenlets of the async engine both inherit the context of the request they serve.
+"""
+
+class QueryStats:
+    """Statements executed and seconds spent in them, by one unit of work."""
+
+    def __init__(self, parent: "QueryStats | None" = None):
+        self.parent = parent
+        self.count = 0
+        self.seconds = 0.0
+
+
+current_query_stats: ContextVar[QueryStats | None] = ContextVar("current_query_stats", default=None)
+_instrumented: set[int] = set()
+_instrument_lock = threading.Lock()
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_started", []).append(time.perf_counter())
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    elapsed = time.perf_counter() - conn.info["query_started"].pop()
+    stats = current_query_stats.get()
+    while stats is not None:
+        stats.count += 1
+        stats.seconds += elapsed
+        stats = stats.parent
+
+def _handle_error(exception_context):
+    # failed statements never reach after_cursor_execute
+    connection = exception_context.connection
+    if connection is not None and connection.info.get("query_started"):
+        connection.info["query_started"].pop()
+
+def instrument_engine(engine: Engine):
+    """
+    Registers the counting events on an engine, once. For an AsyncEngine pass its sync_engine.
+    :param engine: Engine whose statements should be counted.
+    """
+    with _instrument_lock:
+        if id(engine) in _instrumented:
+            return
+        event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+        event.listen(engine, "handle_error", _handle_error)
+        _instrumented.add(id(engine))
+
+@contextmanager
+def count_queries():
+    """
+    Counts the statements executed inside the block, on instrumented engines. Blocks nest, a statement
+    counts towards every enclosing block (a benchmark around the request metrics middleware).
+    """
+    stats = QueryStats(current_query_stats.get())
+    token = current_query_stats.set(stats)
+    try:
+        yield stats
+    finally:
+        current_query_stats.reset(token)
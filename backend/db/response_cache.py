@@ -0,0 +1,59 @@
+import gzip, hashlib, logging, os, tempfile, time
+from pathlib import Path
+
+"""
+On-disk cache of upstream responses, so finished sessions are never downloaded twice
+and ingest runs can be replayed without network access.
+"""
+
+logger = logging.getLogger(__name__)
+
+
+class ResponseCache:
+    """
+    Content-addressed cache: every response body is stored gzip-compressed in a file
+    named after the SHA-256 of its URL, e.g. '<directory>/3f/3fa9...e1.json.gz'.
+    The file's modification time is the moment the response was fetched.
+    """
+
+    def __init__(self, directory: str | Path):
+        self.directory = Path(directory)
+
+    def path_for(self, url: str) -> Path:
+        digest = hashlib.sha256(url.encode("utf-8")).hexdigest()
+        return self.directory / digest[:2] / f"{digest}.json.gz"
+
+    def get(self, url: str, max_age: float | None = None) -> bytes | None:
+        """
+        Reads a cached response.
+        :param url: URL the response was fetched from.
+        :param max_age: Maximum age in seconds of the cached response, None accepts any age.
+        :return: The response body, None if it isn't cached or is too old.
+        """
+        if max_age is not None and max_age <= 0:
+            return None
+        path = self.path_for(url)
+        try:
+            if max_age is not None and time.time() - path.stat().st_mtime > max_age:
+                return None
+            with gzip.open(path, "rb") as f:
+                return f.read()
+        except FileNotFoundError:
+            return None
+        except (OSError, EOFError) as e:
+            logger.warning(f"Discarding unreadable cache entry {path}: {e}")
+            path.unlink(missing_ok=True)
+            return None
+
+    def put(self, url: str, body: bytes):
+        """Stores a response body, atomically replacing any previous entry for the URL."""
+        path = self.path_for(url)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(gzip.compress(body, compresslevel=6))
+            os.replace(tmp_path, path)
+        except BaseException:
+            Path(tmp_path).unlink(missing_ok=True)
+            raise
@@ -1,23 +1,120 @@
+import os
+
+if __name__ == "__main__":
+    # must be set before backend.db.database creates the engine
+    os.environ.setdefault("DB_PROFILE", "ingest")
+
 from backend.models.driver import Driver
 from backend.models.session_driver import SessionDriver
 from backend.models.events import Event
 from backend.db.database import engine
-from backend.db.db_utils import URL_BASE, get_data, logger, map_stints_laps, FALLBACK_COMPOUND
+from backend.db.db_utils import URL_BASE, get_data, logger, map_stints_laps, FALLBACK_COMPOUND, upstream_client, \
+    session_cache_ttl, compute_driver_stats, parse_result_times, FINISHED_SESSION_AFTER, LIVE_CACHE_TTL
+from backend.models.ingest_state import IngestState
 from backend.models.session_laps import SessionLaps
+from backend.models.session_driver_stats import SessionDriverStats
 from backend.models.session_result import SessionResult
 from backend.models.sessions import F1Session
 from backend.models.teams import Teams
-
-from sqlalchemy import select, exists
-from sqlmodel import Session, distinct, select, desc
+from backend.db.ingest_report import IngestRunReport, count_rows, format_summary, timed
+from backend.db.live_events import publish_live_event
+from backend.models.ingest_run import IngestRun
+from backend.crud.cache import bump_data_versions, meeting_scope, session_scope, EVENTS_SCOPE, SESSIONS_SCOPE, \
+    TEAMS_SCOPE
+
+from sqlalchemy import select, exists, or_
+from sqlmodel import Session, distinct, select, desc, func
 from sqlalchemy.dialects.postgresql import insert
-from collections import defaultdict
+from collections import defaultdict, deque
+from datetime import datetime, timedelta, timezone
+from concurrent.futures import Future, ThreadPoolExecutor
+import cProfile, io, pstats
 from sqlalchemy import bindparam, text
 
 """
 This is the script that updates the database.
 """
 
+# Number of sessions whose OpenF1 payloads are fetched ahead of the one being written.
+INGEST_CONCURRENCY = int(os.getenv("INGEST_CONCURRENCY", "4"))
+
+# Per-session OpenF1 endpoints, all filtered by session_key.
+SESSION_ENDPOINTS = ("laps", "stints", "drivers", "session_result")
+
+# Stages of a session's ingest, each committed on its own and timestamped in IngestState.
+INGEST_STAGES = ("meeting", "session", "laps", "results")
+# Stages whose data keeps changing upstream until the session is finished.
+DATA_STAGES = ("laps", "results")
+
+# Seconds before a failed session is retried, doubled after every failed attempt up to INGEST_RETRY_MAX.
+INGEST_RETRY_BASE = float(os.getenv("INGEST_RETRY_BASE", "60"))
+INGEST_RETRY_MAX = float(os.getenv("INGEST_RETRY_MAX", str(6 * 3600)))
+# Sessions still changing upstream aren't polled again sooner than this.
+LIVE_REPOLL_SECONDS = float(os.getenv("LIVE_REPOLL_SECONDS", str(LIVE_CACHE_TTL)))
+
+def prefetch_session_payloads(executor: ThreadPoolExecutor, session_key: int,
+                              cache_ttl: float | None = 0) -> dict[str, Future]:
+    """
+    Starts fetching every per-session payload at the same time.
+    :param executor: Thread pool the requests run in.
+    :param session_key: Unique F1 session key identifier
+    :param cache_ttl: How long cached payloads stay valid, see session_cache_ttl.
+    :return: Dictionary mapping each endpoint in SESSION_ENDPOINTS to its pending request.
+    """
+    return {
+        endpoint: executor.submit(get_data, URL_BASE + f'{endpoint}?session_key={session_key}', cache_ttl=cache_ttl)
+        for endpoint in SESSION_ENDPOINTS
+    }
+
+def resolve_payloads(futures: dict[str, Future], strict: bool = False) -> dict[str, list[dict]]:
+    """
+    Waits for prefetched payloads, replacing failed requests with empty lists.
+    :param strict: Raise instead if any request failed after all its retries.
+    """
+    payloads = {endpoint: future.result() for endpoint, future in futures.items()}
+    failed = [endpoint for endpoint, payload in payloads.items() if payload is None]
+    if strict and failed:
+        raise RuntimeError(f"Could not fetch {', '.join(failed)} from OpenF1")
+    return {endpoint: payload or [] for endpoint, payload in payloads.items()}
+
+def fetch_session_payloads(session_key: int, cache_ttl: float | None = 0) -> dict[str, list[dict]]:
+    """
+    Fetches laps, stints, drivers and results of a session concurrently.
+    :param session_key: Unique F1 session key identifier
+    :param cache_ttl: How long cached payloads stay valid, see session_cache_ttl.
+    :return: Dictionary mapping each endpoint in SESSION_ENDPOINTS to its data.
+    """
+    with ThreadPoolExecutor(max_workers=len(SESSION_ENDPOINTS)) as executor:
+        return resolve_payloads(prefetch_session_payloads(executor, session_key, cache_ttl))
+
+def iter_prefetched_sessions(executor: ThreadPoolExecutor, f1sessions: list[dict], window: int):
+    """
+    Yields each session together with its pending payloads, keeping the payloads of the
+    next 'window' sessions downloading while the caller writes the current one.
+    """
+    pending = deque()
+    sessions_iter = iter(f1sessions)
+    try:
+        while True:
+            while len(pending) < window:
+                f1session = next(sessions_iter, None)
+                if f1session is None:
+                    break
+                futures = prefetch_session_payloads(executor, f1session['session_key'], session_cache_ttl(f1session))
+                pending.append((f1session, futures))
+            if not pending:
+                return
+            yield pending.popleft()
+    finally:
+        # the caller stopped early, drop whatever hasn't started downloading yet
+        for _, futures in pending:
+            for future in futures.values():
+                future.cancel()
+
+def openf1_timestamp(value: datetime) -> str:
+    """Formats a timestamp for OpenF1 filters, in UTC without an offset ('+' would be decoded as a space)."""
+    return value.astimezone(timezone.utc).strftime("%Y-%m-%dT%H:%M:%S")
+
 def fetch_latest_session(session: Session) -> F1Session | None:
     """
     Queries the database to find the latest session we have a record of.
@@ -25,7 +122,7 @@ def fetch_latest_session(session: Session) -> F1Session | None:
     :return: Latest 'F1Session' session
     """
     result = session.exec(
-        select(F1Session).order_by(desc(F1Session.date))
+        select(F1Session).order_by(desc(F1Session.date)).limit(1)
     ).first()
     return result
 
@@ -40,6 +137,7 @@ def add_meetings_to_db(session: Session):
 
     existing_meetings_query = session.exec(select(Event.meeting_key))
     existing_meetings = set(existing_meetings_query.all())
+    added_meetings = False
 
     for meeting in meetings:
 
@@ -58,19 +156,24 @@ def add_meetings_to_db(session: Session):
                     )
 
         session.add(new_meeting)
+        added_meetings = True
         logger.info(f"Staged meeting {str(meeting['meeting_key'])} for addition.")
 
+    if added_meetings:
+        bump_data_versions(session, {EVENTS_SCOPE})
+
 def add_current_meeting(session, meeting_key):
     existing = session.get(Event, meeting_key)
 
     if existing:
         return
 
-    meeting = get_data(f'{URL_BASE}meetings?meeting_key={meeting_key}')[0]
+    meetings = get_data(f'{URL_BASE}meetings?meeting_key={meeting_key}')
 
-    if not meeting:
-        logger.warning(f"No meeting data for meeting_key={meeting_key}")
-        return
+    # the session can't be added without its meeting, fail the stage so it's retried
+    if not meetings:
+        raise RuntimeError(f"No meeting data for meeting_key={meeting_key}")
+    meeting = meetings[0]
 
     new_meeting = Event(
                     meeting_key=meeting.get('meeting_key'),
@@ -83,6 +186,7 @@ def add_current_meeting(session, meeting_key):
                     )
 
     session.add(new_meeting)
+    bump_data_versions(session, {EVENTS_SCOPE})
     session.flush()
 
 
@@ -103,9 +207,10 @@ def add_session_to_db(session:Session, f1session: dict):
         session_key=f1session.get('session_key'),
         session_type=f1session.get('session_type'),
         session_name=f1session.get('session_name'),
-        date=f1session.get('date_start')
+        date=datetime.fromisoformat(f1session.get('date_start'))
     )
     session.add(new_f1session)
+    bump_data_versions(session, {meeting_scope(new_f1session.meeting_key), SESSIONS_SCOPE})
     logger.info(f"Staged session {str(f1session['session_key'])} for addition.")
 
 def add_drivers_and_session_links(session: Session, session_key: int, all_drivers_data: list[dict]):
@@ -188,88 +293,95 @@ def add_drivers_and_session_links(session: Session, session_key: int, all_driver
             session.add(new_session_driver)
             logger.info(f"Staged driver {driver_data['name_acronym']} in session {str(session_key)} for addition.")
 
-def add_all_laps_for_session(session: Session, session_key: int):
+def add_all_laps_for_session(session: Session, session_key: int, payloads: dict[str, list[dict]] | None = None) -> int:
     """
     Fetch lap/stint/driver data, ensure drivers are linked, then batch upsert laps.
     Assumes the caller manages transactions (e.g. with session.begin()).
+    :param payloads: Already fetched OpenF1 data (see fetch_session_payloads), fetched here if None.
+        The laps may be only the latest ones of the session, see backend/scripts/live_poller.py.
+    :return: Number of laps that were new or changed.
     """
     logger.info(f"Starting bulk lap/stint processing for session {session_key}.")
 
     # fetch remote data
-    laps_url = URL_BASE + f'laps?session_key={session_key}'
-    all_laps_data = get_data(laps_url) or []
-
-    stints_url = URL_BASE + f"stints?session_key={session_key}"
-    all_stints_data = get_data(stints_url) or []
-
-    drivers_url = URL_BASE + f"drivers?session_key={session_key}"
-    all_drivers_data = get_data(drivers_url) or []
+    if payloads is None:
+        with timed("fetch"):
+            payloads = fetch_session_payloads(session_key)
+    all_laps_data = payloads.get('laps') or []
+    all_stints_data = payloads.get('stints') or []
+    all_drivers_data = payloads.get('drivers') or []
 
     # group by driver_number for quick lookup
-    laps_by_driver = defaultdict(list)
-    for lap in all_laps_data:
-        dn = lap.get('driver_number')
-        if dn is None:
-            continue
-        laps_by_driver[dn].append(lap)
+    with timed("transform"):
+        laps_by_driver = defaultdict(list)
+        for lap in all_laps_data:
+            dn = lap.get('driver_number')
+            if dn is None:
+                continue
+            laps_by_driver[dn].append(lap)
 
-    stints_by_driver = defaultdict(list)
-    for stint in all_stints_data:
-        dn = stint.get('driver_number')
-        if dn is None:
-            continue
-        stints_by_driver[dn].append(stint)
+        stints_by_driver = defaultdict(list)
+        for stint in all_stints_data:
+            dn = stint.get('driver_number')
+            if dn is None:
+                continue
+            stints_by_driver[dn].append(stint)
 
     # ensure drivers/session links exist
-    add_drivers_and_session_links(session, session_key, all_drivers_data)
-
-    # fetch existing laps for this session that already have a compound
-    rows = session.exec(
-        select(SessionLaps.driver_id, SessionLaps.lap_number).where(
-            (SessionLaps.session_key == session_key) & (SessionLaps.compound != None)
-        )
-    ).all()
-    existing_laps = {(r[0], r[1]) for r in rows} if rows else set()
+    with timed("drivers"):
+        add_drivers_and_session_links(session, session_key, all_drivers_data)
+
+    # fetch existing laps for this session that are already complete (a lap in progress has no time yet)
+    with timed("laps_upsert"):
+        lap_numbers = [lap['lap_number'] for lap in all_laps_data if lap.get('lap_number') is not None]
+        rows = session.exec(
+            select(SessionLaps.driver_id, SessionLaps.lap_number).where(
+                (SessionLaps.session_key == session_key) & (SessionLaps.compound != None)
+                & (SessionLaps.lap_time != None) & (SessionLaps.lap_number >= min(lap_numbers, default=0))
+            )
+        ).all()
+        existing_laps = {(r[0], r[1]) for r in rows} if rows else set()
 
     # collect the parameter dicts we want to upsert
     values_to_upsert: list[dict] = []
 
-    for driver_data in all_drivers_data:
-        driver_number = driver_data.get('driver_number')
-        driver_id = driver_data.get('driver_id')
+    with timed("transform"):
+        for driver_data in all_drivers_data:
+            driver_number = driver_data.get('driver_number')
+            driver_id = driver_data.get('driver_id')
 
-        if driver_number is None or driver_id is None:
-            continue
+            if driver_number is None or driver_id is None:
+                continue
 
-        driver_laps = laps_by_driver.get(driver_number, [])
-        if not driver_laps:
-            continue
+            driver_laps = laps_by_driver.get(driver_number, [])
+            if not driver_laps:
+                continue
 
-        stints_hashmap = map_stints_laps(stints_by_driver.get(driver_number, []))
+            stints_hashmap = map_stints_laps(stints_by_driver.get(driver_number, []))
 
-        for lap in driver_laps:
-            lap_num = lap.get('lap_number')
-            if lap_num is None:
-                continue
+            for lap in driver_laps:
+                lap_num = lap.get('lap_number')
+                if lap_num is None:
+                    continue
 
-            if (driver_id, lap_num) in existing_laps:
-                continue
+                if (driver_id, lap_num) in existing_laps:
+                    continue
 
-            compound = stints_hashmap.get(lap_num, None)
+                compound = stints_hashmap.get(lap_num, None)
 
-            values_to_upsert.append({
-                'driver_id': driver_id,
-                'session_key': lap.get('session_key'),
-                'lap_number': lap_num,
-                'is_pit_out_lap': lap.get('is_pit_out_lap'),
-                'lap_time': lap.get('lap_duration', 0.0),
-                'st_speed': lap.get('st_speed', 0),
-                'compound': compound,
-            })
+                values_to_upsert.append({
+                    'driver_id': driver_id,
+                    'session_key': lap.get('session_key'),
+                    'lap_number': lap_num,
+                    'is_pit_out_lap': lap.get('is_pit_out_lap'),
+                    'lap_time': lap.get('lap_duration', 0.0),
+                    'st_speed': lap.get('st_speed', 0),
+                    'compound': compound,
+                })
 
     if not values_to_upsert:
         logger.info(f"No new laps to upsert for session {session_key}.")
-        return
+        return 0
 
     stmt = insert(SessionLaps).values(
         driver_id=bindparam('driver_id'),
@@ -299,18 +411,86 @@ def add_all_laps_for_session(session: Session, session_key: int):
         where=where_clause_expr
     )
 
-    session.execute(do_update, values_to_upsert)
+    # rows the WHERE clause left alone aren't returned, only new and changed laps are published
+    with timed("laps_upsert"):
+        changed = session.execute(
+            do_update.returning(SessionLaps.driver_id, SessionLaps.lap_number, SessionLaps.lap_time,
+                                SessionLaps.st_speed, SessionLaps.is_pit_out_lap, SessionLaps.compound),
+            values_to_upsert
+        ).all()
+        driver_numbers = {d.get('driver_id'): d.get('driver_number') for d in all_drivers_data}
+        publish_live_event(session, session_key, "laps", [
+            {"driver_number": driver_numbers.get(lap.driver_id), "lap_number": lap.lap_number, "time": lap.lap_time,
+             "speed_trap": lap.st_speed, "is_pit_out_lap": lap.is_pit_out_lap, "compound": lap.compound}
+            for lap in changed
+        ])
+    count_rows("sessionlaps", len(changed))
+
+    logger.info(f"Upserted {len(values_to_upsert)} laps for session {session_key}, {len(changed)} changed.")
+    return len(changed)
+
+def add_session_driver_stats(session: Session, session_key: int):
+    """
+    Computes every driver's lap statistics in a session from the laps in the DB and upserts them.
+    Run right after add_all_laps_for_session, inside the same transaction.
+    :param session: Database session.
+    :param session_key: Unique F1 session key identifier
+    """
+    laps = session.exec(
+        select(SessionLaps)
+        .where(SessionLaps.session_key == session_key)
+        .order_by(SessionLaps.driver_id, SessionLaps.lap_number)
+    ).all()
+
+    laps_by_driver = defaultdict(list)
+    for lap in laps:
+        laps_by_driver[lap.driver_id].append(lap)
+
+    if not laps_by_driver:
+        return
 
-    logger.info(f"Upserted {len(values_to_upsert)} laps for session {session_key}.")
+    values = [
+        {"session_key": session_key, "driver_id": driver_id, **compute_driver_stats(driver_laps)}
+        for driver_id, driver_laps in laps_by_driver.items()
+    ]
 
-def add_session_result_to_db(session:Session, session_key:int):
+    stmt = insert(SessionDriverStats).values(values)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=['session_key', 'driver_id'],
+        set_={column: stmt.excluded[column]
+              for column in ('lap_count', 'best_lap', 'median_clean_lap', 'top_speed_trap', 'stints')},
+    )
+    session.execute(stmt)
+    count_rows("sessiondriverstats", len(values))
+    logger.info(f"Upserted lap statistics of {len(values)} drivers for session {session_key}.")
+
+def add_missing_session_driver_stats(session: Session):
     """
-    Queries OpenF1 API for session results and adds it to db.
+    Computes lap statistics for sessions that have laps but no statistics yet,
+    e.g. sessions ingested before statistics existed.
+    :param session: Database session.
+    """
+    with session.begin():
+        missing = session.exec(
+            select(distinct(SessionLaps.session_key)).where(
+                ~exists().where(SessionDriverStats.session_key == SessionLaps.session_key)
+            )
+        ).all()
+        for session_key in missing:
+            add_session_driver_stats(session, session_key)
+        bump_data_versions(session, {session_scope(session_key) for session_key in missing})
+
+def add_session_result_to_db(session:Session, session_key:int, data: list[dict] | None = None):
+    """
+    Queries OpenF1 API for session results and upserts them, so sessions polled while
+    still running end up with their final results.
     :param session: Database session.
     :param session_key: Unique F1 session key identifier
+    :param data: Already fetched session results, fetched here if None.
     :return: returns early if exception.
     """
-    data = get_data(URL_BASE + f'session_result?session_key={session_key}')
+    if data is None:
+        data = get_data(URL_BASE + f'session_result?session_key={session_key}')
     if not data:
         return
 
@@ -320,11 +500,7 @@ def add_session_result_to_db(session:Session, session_key:int):
     
     driver_map = {sd.driver_number: sd.driver_id for sd in session_drivers_query}
 
-    existing_results_query = session.exec(
-        select(SessionResult.driver_id).where(SessionResult.session_key == session_key)
-    )
-    existing_results_set = set(existing_results_query)
-
+    values = {}
     for datapoint in data:
         driver_number = datapoint.get('driver_number')
 
@@ -335,29 +511,44 @@ def add_session_result_to_db(session:Session, session_key:int):
                          f"{driver_number} in session {session_key}. Skipping result.")
             continue
 
-        if driver_id in existing_results_set:
-            continue
+        values[driver_id] = {
+            'meeting_key': datapoint.get('meeting_key'),
+            'session_key': session_key,
+            'driver_id': driver_id,
+            'position': datapoint.get('position'),
+            'number_of_laps': datapoint.get('number_of_laps'),
+            'dnf': datapoint.get('dnf'),
+            'dns': datapoint.get('dns'),
+            'dsq': datapoint.get('dsq'),
+            **parse_result_times(datapoint.get('duration'), datapoint.get('gap_to_leader')),
+        }
+
+    if not values:
+        return
 
-        sr_entry = SessionResult(
-            meeting_key=datapoint.get('meeting_key'),
-            session_key=datapoint.get('session_key'),
-            driver_id=driver_id,
-            position=datapoint.get('position'),
-            duration=str(datapoint.get('duration')),
-            number_of_laps=datapoint.get('number_of_laps'),
-            gap_to_leader=str(datapoint.get('gap_to_leader')),
-            dnf=datapoint.get('dnf'),
-            dns=datapoint.get('dns'),
-            dsq=datapoint.get('dsq')
-        )
-        session.add(sr_entry)
-    logger.info(f"Staged session results of session {str(session_key)} for addition.")
+    stmt = insert(SessionResult).values(list(values.values()))
+    updated = [column for column in next(iter(values.values())) if column not in ('session_key', 'driver_id')]
+    stmt = stmt.on_conflict_do_update(
+        index_elements=['session_key', 'driver_id'],
+        set_={column: stmt.excluded[column] for column in updated},
+        where=or_(*(SessionResult.__table__.c[column].is_distinct_from(stmt.excluded[column]) for column in updated)),
+    )
+    changed = session.execute(stmt.returning(*(SessionResult.__table__.c[column] for column in ['driver_id'] + updated))).all()
+    number_by_id = {driver_id: number for number, driver_id in driver_map.items()}
+    publish_live_event(session, session_key, "results", [
+        {"driver_number": number_by_id.get(row.driver_id),
+         **{column: getattr(row, column) for column in updated if column not in ('meeting_key', 'session_key')}}
+        for row in changed
+    ])
+    count_rows("sessionresult", len(changed))
+    logger.info(f"Upserted session results of session {str(session_key)}, {len(changed)} changed.")
 
 def add_teams_colors(session:Session, year=None):
     try: 
         teams = session.exec(select(distinct(SessionDriver.team)))
         existing_teams_query = session.exec(select(Teams.name))
         existing_teams = set(existing_teams_query)
+        added_teams = False
 
         for team in teams:
             if not team:
@@ -375,51 +566,270 @@ def add_teams_colors(session:Session, year=None):
                 color=f'#{team_colour}'
             )
             session.add(team)
+            added_teams = True
+        if added_teams:
+            bump_data_versions(session, {TEAMS_SCOPE})
         session.commit()
     except Exception as e:
         session.rollback()
         logger.error(f"Error while adding teams to the DB: {e}")
 
-def update_db():
+def parse_timestamp(value: str | None) -> datetime | None:
+    """Parses an OpenF1 timestamp, None if it's missing or malformed. Naive timestamps are taken as UTC."""
+    if not value:
+        return None
+    try:
+        parsed = datetime.fromisoformat(value)
+    except ValueError:
+        return None
+    return parsed if parsed.tzinfo else parsed.replace(tzinfo=timezone.utc)
+
+def session_finished(date_end: datetime | None, at: datetime) -> bool:
+    """Whether a session's data had stopped changing upstream at time 'at', see FINISHED_SESSION_AFTER."""
+    return date_end is not None and at - date_end > FINISHED_SESSION_AFTER
+
+def retry_delay(attempts: int) -> timedelta:
+    """Backoff before retrying a session that failed 'attempts' times in a row."""
+    return timedelta(seconds=min(INGEST_RETRY_BASE * 2 ** max(attempts - 1, 0), INGEST_RETRY_MAX))
+
+def ingest_watermark(session: Session) -> datetime | None:
+    """
+    Start date from which the OpenF1 session listing is needed: the earliest session that isn't done,
+    or the latest session if they all are. None if nothing was ever ingested.
+    """
+    earliest_open = session.exec(
+        select(func.min(IngestState.date_start)).where(IngestState.status != "done")
+    ).one()
+    if earliest_open is not None:
+        return earliest_open
+    return session.exec(select(func.max(IngestState.date_start))).one()
+
+def sync_ingest_states(session: Session, f1sessions: list[dict], now: datetime) -> dict[int, IngestState]:
+    """
+    Creates the ingest state of new sessions in an OpenF1 listing and refreshes the dates of known ones.
+    Assumes the caller commits.
+    :param session: Database session.
+    :param f1sessions: Sessions as returned by the OpenF1 'sessions' endpoint.
+    :param now: Time of the run.
+    :return: Ingest state of every listed session, by session key.
+    """
+    values = {}
+    for f1session in f1sessions:
+        date_start = parse_timestamp(f1session.get('date_start'))
+        if f1session.get('session_key') is None or date_start is None:
+            logger.warning(f"Skipping session without a key or start date: {f1session}")
+            continue
+        values[f1session['session_key']] = {
+            'session_key': f1session['session_key'],
+            'meeting_key': f1session.get('meeting_key'),
+            'date_start': date_start,
+            'date_end': parse_timestamp(f1session.get('date_end')),
+            'status': 'pending',
+            'attempts': 0,
+            'updated_at': now,
+        }
+    if not values:
+        return {}
+
+    stmt = insert(IngestState).values(list(values.values()))
+    stmt = stmt.on_conflict_do_update(
+        index_elements=['session_key'],
+        set_={column: stmt.excluded[column] for column in ('meeting_key', 'date_start', 'date_end', 'updated_at')},
+        where=IngestState.date_start.is_distinct_from(stmt.excluded.date_start)
+              | IngestState.date_end.is_distinct_from(stmt.excluded.date_end),
+    )
+    session.execute(stmt)
+    states = session.exec(select(IngestState).where(IngestState.session_key.in_(values))).all()
+    return {state.session_key: state for state in states}
+
+def needs_work(state: IngestState, now: datetime) -> bool:
+    """
+    Whether a run should process a session: always if it's new or a run stopped half-way through it,
+    failed sessions once their backoff has passed, live sessions every LIVE_REPOLL_SECONDS.
+    """
+    if state.status == "done":
+        return False
+    if state.status == "failed":
+        return state.next_attempt_at is None or state.next_attempt_at <= now
+    if state.status == "live":
+        return state.last_synced_at is None or (now - state.last_synced_at).total_seconds() >= LIVE_REPOLL_SECONDS
+    return True
+
+def stage_pending(state: IngestState, stage: str) -> bool:
+    """
+    Whether a stage has to run: if it never completed or, for laps and results, if they were
+    last written while the session could still change.
+    """
+    completed_at = getattr(state, f"{stage}_at")
+    if completed_at is None:
+        return True
+    return stage in DATA_STAGES and not session_finished(state.date_end, completed_at)
+
+def ingest_session(session: Session, f1session: dict, futures: dict[str, Future], state: IngestState):
+    """
+    Runs the pending stages of one session, each committed together with its checkpoint,
+    so a crash loses at most the stage that was running.
+    :param session: Database session.
+    :param f1session: Session as returned by the OpenF1 'sessions' endpoint.
+    :param futures: Its prefetched payloads, see prefetch_session_payloads.
+    :param state: Its ingest state.
+    """
+    session_key = f1session['session_key']
+    state.status = "in_progress"
+    state.updated_at = datetime.now(timezone.utc)
+    session.add(state)
+    with timed("commit"):
+        session.commit()
+
+    payloads = None
+    for stage in INGEST_STAGES:
+        if not stage_pending(state, stage):
+            continue
+        if stage in DATA_STAGES and payloads is None:
+            # only the time spent waiting: the payloads were downloading while earlier sessions were written
+            with timed("fetch"):
+                payloads = resolve_payloads(futures, strict=True)
+
+        if stage == "meeting":
+            with timed("metadata"):
+                add_current_meeting(session, f1session['meeting_key'])
+        elif stage == "session":
+            with timed("metadata"):
+                add_session_to_db(session, f1session)
+        elif stage == "laps":
+            add_all_laps_for_session(session, session_key, payloads)
+            with timed("driver_stats"):
+                add_session_driver_stats(session, session_key)
+        else:
+            with timed("results"):
+                add_session_result_to_db(session, session_key, payloads['session_result'])
+        if stage in DATA_STAGES:
+            bump_data_versions(session, {session_scope(session_key)})
+        setattr(state, f"{stage}_at", datetime.now(timezone.utc))
+        session.add(state)
+        with timed("commit"):
+            session.commit()
+
+    now = datetime.now(timezone.utc)
+    state.status = "done" if session_finished(state.date_end, now) else "live"
+    state.last_synced_at = now
+    state.attempts = 0
+    state.last_error = None
+    state.next_attempt_at = None
+    state.updated_at = now
+    session.add(state)
+    with timed("commit"):
+        session.commit()
+
+def record_ingest_failure(session: Session, session_key: int, error: Exception):
+    """Marks a session as failed, keeping the stages it completed, and schedules its retry."""
+    session.rollback()
+    state = session.get(IngestState, session_key)
+    now = datetime.now(timezone.utc)
+    state.status = "failed"
+    state.attempts += 1
+    state.last_error = f"{type(error).__name__}: {error}"[:1000]
+    state.next_attempt_at = now + retry_delay(state.attempts)
+    state.updated_at = now
+    session.add(state)
+    session.commit()
+    logger.info(f"Session {session_key} will be retried after {state.next_attempt_at.isoformat()}.")
+
+def save_ingest_run(session: Session, report: IngestRunReport, profile_path: str | None = None):
+    """Logs the summary of a run and stores it as an IngestRun."""
+    summary = report.summary()
+    logger.info(format_summary(summary))
+    session.add(IngestRun(**summary, profile_path=profile_path))
+    session.commit()
+
+def update_db(concurrency: int = INGEST_CONCURRENCY, profile_path: str | None = None):
     """
     Controls the flow to update the database, calling all necessary methods.
+    Every session is checkpointed in IngestState: finished sessions already ingested are skipped,
+    sessions a previous run stopped in resume at the stage that didn't complete, failed sessions
+    are retried with a backoff without holding up the others, and live sessions are polled again.
+    Sessions are written one at a time, while the OpenF1 payloads of the next
+    'concurrency' sessions are downloaded in the background.
+    The time spent on every stage of every session is logged at the end and stored as an IngestRun.
+    :param concurrency: Number of sessions to prefetch, all sharing the OpenF1 rate limiter.
+    :param profile_path: Write a cProfile of the run (main thread) to this file, e.g. to open with snakeviz.
     """
-    with Session(engine) as session:
-        data_url = ""
+    profiler = None
+    if profile_path:
+        profiler = cProfile.Profile()
+        profiler.enable()
+    report = IngestRunReport("update_db", upstream_client.stats)
+
+    # ingest states stay loaded across the commit of every stage
+    with Session(engine, expire_on_commit=False) as session:
+        data_url = URL_BASE + 'sessions'
         try:
-            latest_session= fetch_latest_session(session)
-
-            if latest_session:
-                data_url = URL_BASE + f'sessions?date_start>={latest_session.date}'
-            # if this is the first time populating the script (no latest session in db), get all sessions and meetings
-            else:
-                data_url = URL_BASE + 'sessions'
+            # if this is the first time populating the script (no session in db), get all meetings and teams
+            if not fetch_latest_session(session):
                 add_meetings_to_db(session)
                 add_teams_colors(session)
+            watermark = ingest_watermark(session)
+            if watermark:
+                data_url = URL_BASE + f'sessions?date_start>={openf1_timestamp(watermark)}'
             session.commit()
         except Exception as e:
+            session.rollback()
             logger.error(f"Failed to fetch data: {e}")
 
+        add_missing_session_driver_stats(session)
+
         data = get_data(data_url)
-        data_size = len(data)
-        c = 0
-        for f1session in data:
-            try:
-                with session.begin():
-                    session_key = f1session['session_key']
-                    add_current_meeting(session, f1session['meeting_key'])
-                    add_session_to_db(session, f1session)
-                    add_all_laps_for_session(session, session_key)
-                    add_session_result_to_db(session, session_key)
-                c += 1
-                logger.info(f"Committed all info for session {str(session_key)}. Progress: ({c}/{data_size})")
-            except Exception:
-                logger.error(
-                    f"Transaction failed for session {str(f1session['session_key'])}",
-                    exc_info=True,
-                )
-                break
+        if data is None:
+            logger.error(f"Could not fetch the session listing {data_url}.")
+            return
+        now = datetime.now(timezone.utc)
+        states = sync_ingest_states(session, data, now)
+        session.commit()
+        todo = [f1session for f1session in data
+                if f1session.get('session_key') in states and needs_work(states[f1session['session_key']], now)]
+        logger.info(f"{len(todo)} of {len(data)} listed sessions need ingesting.")
+
+        c = failed = 0
+        concurrency = max(1, concurrency)
+        with ThreadPoolExecutor(max_workers=concurrency * len(SESSION_ENDPOINTS)) as executor:
+            for f1session, futures in iter_prefetched_sessions(executor, todo, concurrency):
+                session_key = f1session['session_key']
+                with report.session(session_key) as timings:
+                    try:
+                        ingest_session(session, f1session, futures, states[session_key])
+                        c += 1
+                        logger.info(f"Committed all info for session {str(session_key)}. Progress: ({c}/{len(todo)})")
+                    except Exception as e:
+                        failed += 1
+                        timings.failed = True
+                        logger.error(f"Transaction failed for session {str(session_key)}", exc_info=True)
+                        record_ingest_failure(session, session_key, e)
+
+        logger.info(f"Ingested {c} sessions, {failed} failed. Upstream requests: {upstream_client.stats.snapshot()}")
+        if profiler:
+            profiler.disable()
+            profiler.dump_stats(profile_path)
+            logger.info(f"Profile written to {profile_path}, slowest functions by cumulative time:\n"
+                        + profile_summary(profiler))
+        save_ingest_run(session, report, profile_path)
+
+def profile_summary(profiler: cProfile.Profile, limit: int = 25) -> str:
+    output = io.StringIO()
+    pstats.Stats(profiler, stream=output).sort_stats("cumulative").print_stats(limit)
+    return output.getvalue()
 
 if __name__ == "__main__":
+    import argparse
     from .database import create_db_and_tables
-    create_db_and_tables(populating=True)
+    from .db_utils import start_metrics_server
+
+    parser = argparse.ArgumentParser(description="Creates the tables if needed and ingests new OpenF1 sessions.")
+    parser.add_argument("--concurrency", type=int, default=INGEST_CONCURRENCY,
+                        help="sessions whose payloads download ahead of the one being written")
+    parser.add_argument("--profile", metavar="PATH",
+                        help="write a cProfile of the run to PATH (open with snakeviz or python -m pstats)")
+    args = parser.parse_args()
+
+    start_metrics_server()
+    create_db_and_tables(populating=False)
+    update_db(args.concurrency, args.profile)
@@ -0,0 +1,332 @@
+import gzip, http.client, json, logging, threading, time, zlib
+from email.utils import parsedate_to_datetime
+from datetime import datetime, timezone
+from urllib.error import HTTPError
+from urllib.parse import urlsplit
+from prometheus_client import Counter, Histogram
+from backend.db.response_cache import ResponseCache
+
+"""
+HTTP client used for every upstream request made while ingesting data (OpenF1, race calendar).
+Connections are kept alive and reused, one per host for each thread.
+"""
+
+logger = logging.getLogger(__name__)
+
+# errors raised when the server silently closed a kept-alive connection
+STALE_CONNECTION_ERRORS = (http.client.RemoteDisconnected, ConnectionResetError, BrokenPipeError)
+
+# Prometheus metrics, labelled with the last segment of the URL path ('laps', 'session_result', ...)
+UPSTREAM_LATENCY = Histogram("upstream_request_duration_seconds", "Upstream request latency.", ["endpoint"],
+                             buckets=(0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30))
+UPSTREAM_RESPONSES = Counter("upstream_responses_total", "Upstream responses, 'error' for connection failures.",
+                             ["endpoint", "status"])
+UPSTREAM_RETRIES = Counter("upstream_retries_total", "Upstream requests sent again after a failure.", ["endpoint"])
+UPSTREAM_CACHE = Counter("upstream_cache_lookups_total", "On-disk response cache lookups.", ["result"])
+
+# Empty results may only mean the data isn't published yet (e.g. laps right after a session),
+# so they are never reused for longer than this, even for finished sessions.
+EMPTY_BODY_TTL = 30
+EMPTY_BODIES = (b"", b"[]", b"{}")
+
+def endpoint_label(url: str) -> str:
+    return urlsplit(url).path.rstrip("/").rsplit("/", 1)[-1] or "root"
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket. Every call to acquire() takes one token, blocking until
+    one is available, so all threads together never exceed 'rate' requests per second.
+    """
+
+    def __init__(self, rate: float, capacity: int):
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = float(capacity)
+        self._updated = time.monotonic()
+        self._blocked_until = 0.0
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                if now >= self._blocked_until:
+                    self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                    self._updated = now
+                    if self._tokens >= 1:
+                        self._tokens -= 1
+                        return
+                    wait = (1 - self._tokens) / self.rate
+                else:
+                    wait = self._blocked_until - now
+            time.sleep(wait)
+
+    def pause(self, seconds: float):
+        """Stops handing out tokens for 'seconds', e.g. after the API answered 429."""
+        with self._lock:
+            self._blocked_until = max(self._blocked_until, time.monotonic() + seconds)
+            self._tokens = 0.0
+            self._updated = self._blocked_until
+
+
+class RequestStats:
+    """Thread-safe counters describing the requests a client made."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.requests = 0
+            self.retries = 0
+            self.throttled = 0
+            self.errors = 0
+            self.cache_hits = 0
+            self.cache_misses = 0
+            self.connections_opened = 0
+            self.bytes_received = 0
+            self.bytes_decoded = 0
+            self.total_seconds = 0.0
+            self.max_seconds = 0.0
+
+    def record(self, elapsed: float, wire_bytes: int, decoded_bytes: int):
+        with self._lock:
+            self.requests += 1
+            self.bytes_received += wire_bytes
+            self.bytes_decoded += decoded_bytes
+            self.total_seconds += elapsed
+            self.max_seconds = max(self.max_seconds, elapsed)
+
+    def increment(self, counter: str, amount: int = 1):
+        with self._lock:
+            setattr(self, counter, getattr(self, counter) + amount)
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {
+                "requests": self.requests,
+                "retries": self.retries,
+                "throttled": self.throttled,
+                "errors": self.errors,
+                "cache_hits": self.cache_hits,
+                "cache_misses": self.cache_misses,
+                "connections_opened": self.connections_opened,
+                "bytes_received": self.bytes_received,
+                "bytes_decoded": self.bytes_decoded,
+                "total_seconds": round(self.total_seconds, 3),
+                "avg_seconds": round(self.total_seconds / self.requests, 3) if self.requests else 0.0,
+                "max_seconds": round(self.max_seconds, 3),
+            }
+
+
+def parse_retry_after(value: str | None) -> float | None:
+    """
+    Parses a Retry-After header, which is either a number of seconds or an HTTP date.
+    :return: Seconds to wait, or None if the header is missing or invalid.
+    """
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if retry_at.tzinfo is None:
+        retry_at = retry_at.replace(tzinfo=timezone.utc)
+    return max(0.0, (retry_at - datetime.now(timezone.utc)).total_seconds())
+
+
+def decode_body(body: bytes, content_encoding: str | None) -> bytes:
+    """Decompresses a response body according to its Content-Encoding header."""
+    encoding = (content_encoding or "").lower()
+    if encoding == "gzip":
+        return gzip.decompress(body)
+    if encoding == "deflate":
+        return zlib.decompress(body)
+    return body
+
+
+class UpstreamClient:
+    """
+    Keep-alive HTTP client with compressed transfer, retries and request timing.
+    http.client connections are not thread-safe, so each thread keeps its own
+    connection per host, which the thread pool used by update_db then reuses.
+    With a cache, every response is stored on disk; in replay mode responses are
+    only ever served from the cache and the network is never used.
+    """
+
+    def __init__(self, limiter: TokenBucket | None = None, timeout: float = 30.0,
+                 user_agent: str = "racepace-ingest", cache: ResponseCache | None = None,
+                 replay: bool = False):
+        if replay and cache is None:
+            raise ValueError("Replay mode needs a response cache.")
+        self.limiter = limiter
+        self.cache = cache
+        self.replay = replay
+        self.timeout = timeout
+        self.user_agent = user_agent
+        self.stats = RequestStats()
+        self._local = threading.local()
+
+    def _connections(self) -> dict:
+        if not hasattr(self._local, "connections"):
+            self._local.connections = {}
+        return self._local.connections
+
+    def _connection(self, scheme: str, netloc: str) -> tuple[http.client.HTTPConnection, bool]:
+        """
+        Returns this thread's connection to a host, and whether it already served a request.
+        """
+        connections = self._connections()
+        key = (scheme, netloc)
+        if key in connections:
+            return connections[key], True
+
+        connection_class = http.client.HTTPSConnection if scheme == "https" else http.client.HTTPConnection
+        connection = connection_class(netloc, timeout=self.timeout)
+        connections[key] = connection
+        self.stats.increment("connections_opened")
+        return connection, False
+
+    def _drop_connection(self, scheme: str, netloc: str):
+        connection = self._connections().pop((scheme, netloc), None)
+        if connection is not None:
+            connection.close()
+
+    def close(self):
+        """Closes every connection opened by the calling thread."""
+        for connection in self._connections().values():
+            connection.close()
+        self._connections().clear()
+
+    def _send(self, url: str) -> tuple[int, http.client.HTTPMessage, bytes]:
+        """
+        Sends one GET request over a kept-alive connection.
+        :return: Status code, response headers and the raw (possibly compressed) body.
+        """
+        parts = urlsplit(url)
+        path = parts.path or "/"
+        if parts.query:
+            path += f"?{parts.query}"
+        headers = {
+            "Accept": "application/json",
+            "Accept-Encoding": "gzip, deflate",
+            "Connection": "keep-alive",
+            "User-Agent": self.user_agent,
+        }
+
+        while True:
+            connection, reused = self._connection(parts.scheme, parts.netloc)
+            try:
+                connection.request("GET", path, headers=headers)
+                response = connection.getresponse()
+                body = response.read()
+            except STALE_CONNECTION_ERRORS:
+                self._drop_connection(parts.scheme, parts.netloc)
+                if reused:
+                    # the server closed an idle connection, open a fresh one right away
+                    continue
+                raise
+            except Exception:
+                self._drop_connection(parts.scheme, parts.netloc)
+                raise
+
+            if response.will_close:
+                self._drop_connection(parts.scheme, parts.netloc)
+            return response.status, response.headers, body
+
+    def fetch(self, url: str, retries: int = 5, backoff: float = 1.0, cache_ttl: float | None = 0) -> bytes | None:
+        """
+        Fetches a URL, retrying on throttling, server errors and connection failures.
+        :param url: URL for which we want to request data.
+        :param retries: Number of retries if request fails.
+        :param backoff: Time to wait if failure, grows with every attempt.
+        :param cache_ttl: Seconds a cached response stays valid, None keeps it forever, 0 always refetches.
+            Empty results stay valid EMPTY_BODY_TTL seconds at most.
+        :return: Decompressed response body, None if every attempt failed.
+        """
+        endpoint = endpoint_label(url)
+        if self.cache:
+            body = self.cache.get(url, None if self.replay else cache_ttl)
+            if body is not None and not self.replay and body.strip() in EMPTY_BODIES:
+                body = self.cache.get(url, EMPTY_BODY_TTL if cache_ttl is None else min(cache_ttl, EMPTY_BODY_TTL))
+            if body is not None:
+                self.stats.increment("cache_hits")
+                UPSTREAM_CACHE.labels("hit").inc()
+                return body
+            self.stats.increment("cache_misses")
+            UPSTREAM_CACHE.labels("miss").inc()
+            if self.replay:
+                logger.warning(f"Replay mode: no cached response for {url}")
+                return None
+
+        for attempt in range(retries):
+            if attempt:
+                self.stats.increment("retries")
+                UPSTREAM_RETRIES.labels(endpoint).inc()
+            if self.limiter:
+                self.limiter.acquire()
+
+            start = time.perf_counter()
+            try:
+                status, headers, body = self._send(url)
+            except (OSError, http.client.HTTPException) as e:
+                self.stats.increment("errors")
+                UPSTREAM_RESPONSES.labels(endpoint, "error").inc()
+                logger.warning(f"[Retry {attempt+1}/{retries}] Connection error: {e} → {url}")
+                time.sleep(backoff * (attempt + 1))
+                continue
+            elapsed = time.perf_counter() - start
+            UPSTREAM_LATENCY.labels(endpoint).observe(elapsed)
+            UPSTREAM_RESPONSES.labels(endpoint, str(status)).inc()
+
+            if 200 <= status < 300:
+                decoded = decode_body(body, headers.get("Content-Encoding"))
+                self.stats.record(elapsed, len(body), len(decoded))
+                logger.debug(f"GET {url} → {status} in {elapsed:.3f}s ({len(body)} bytes on the wire)")
+                if self.cache:
+                    self.cache.put(url, decoded)
+                return decoded
+
+            self.stats.increment("errors")
+            if status == 429:
+                self.stats.increment("throttled")
+                wait_time = parse_retry_after(headers.get("Retry-After"))
+                if wait_time is None:
+                    wait_time = 15 * (attempt + 1)
+                logger.warning(f"HTTP 429 Too Many Requests: Waiting {wait_time:.1f}s before retrying ({attempt+1}/{retries}) → {url}")
+                # back off every thread sharing the limiter, not just this one
+                if self.limiter:
+                    self.limiter.pause(wait_time)
+                else:
+                    time.sleep(wait_time)
+            elif 500 <= status < 600:
+                wait_time = parse_retry_after(headers.get("Retry-After"))
+                logger.warning(f"[Retry {attempt+1}/{retries}] HTTP {status}: {url}")
+                time.sleep(wait_time if wait_time is not None else backoff * (attempt + 1))
+            else:
+                logger.error(f"Non-retryable HTTPError {status} on {url}")
+                raise HTTPError(url, status, f"HTTP {status}", headers, None)
+
+        logger.error(f"❌ Failed after {retries} retries: {url}")
+        return None
+
+    def get_json(self, url: str, retries: int = 5, backoff: float = 1.0, cache_ttl: float | None = 0):
+        """Fetches a URL and parses its body as JSON, None if every attempt failed."""
+        body = self.fetch(url, retries, backoff, cache_ttl)
+        if body is None:
+            return None
+        return json.loads(body)
+
+    def get_text(self, url: str, retries: int = 5, backoff: float = 1.0, encoding: str = "utf-8",
+                 cache_ttl: float | None = 0) -> str | None:
+        """Fetches a URL and decodes its body as text, None if every attempt failed."""
+        body = self.fetch(url, retries, backoff, cache_ttl)
+        if body is None:
+            return None
+        return body.decode(encoding)
@@ -4,16 +4,24 @@ from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
 from fastapi.responses import FileResponse
-from backend.api import sessions, events, drivers, laps
-from backend.db.database import create_db_and_tables
+from backend.api import sessions, events, drivers, laps, analytics, live, admin, metrics
+from backend.db.database import create_db_and_tables, ASYNC_DB
 
 BASE_DIR = Path(__file__).resolve().parent.parent
 app = FastAPI(title="RacePace Backend",
               description="API For viewing F1 driver lap times, session results and more.")
+if ASYNC_DB:
+    from backend.api import async_reads
+    # registered first so these routes answer, the sync routers below still document the API
+    app.include_router(async_reads.router, include_in_schema=False)
 app.include_router(events.router)
 app.include_router(sessions.router)
 app.include_router(drivers.router)
 app.include_router(laps.router)
+app.include_router(analytics.router)
+app.include_router(live.router)
+app.include_router(admin.router)
+app.include_router(metrics.router)
 
 origins = [
     "https://f1racepace.vercel.app",
@@ -27,6 +35,8 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+# added last so it's outermost and times everything
+app.add_middleware(metrics.MetricsMiddleware)
 
 @app.on_event("startup")
 def on_startup():
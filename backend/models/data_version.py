@@ -0,0 +1,14 @@
+from datetime import datetime
+from sqlalchemy import Column, DateTime
+from sqlmodel import SQLModel, Field
+
+"""
+Database model that stores a version number for a slice of data ("events", "teams",
+"meeting:<meeting_key>", "session:<session_key>"), bumped by update_db every time it commits
+changes to that slice. Read caches compare versions to know when an entry went stale.
+"""
+
+class DataVersion(SQLModel, table=True):
+    scope: str = Field(primary_key=True)
+    version: int = Field(default=1)
+    updated_at: datetime = Field(sa_column=Column(DateTime(timezone=True), index=True, nullable=False))
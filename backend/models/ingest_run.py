@@ -0,0 +1,29 @@
+from datetime import datetime
+from typing import Optional
+
+from sqlalchemy import BigInteger, Column, DateTime
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlmodel import SQLModel, Field
+
+"""
+Database model that summarises one ingest run (see backend/db/ingest_report.py).
+'stage_seconds' maps every timed stage to the seconds spent on it over all sessions, 'rows_written'
+maps tables to rows inserted or changed, and 'slowest_sessions' is a list of
+{"session_key", "seconds", "failed", "stages"} objects, slowest first.
+"""
+
+class IngestRun(SQLModel, table=True):
+    id: Optional[int] = Field(default=None, primary_key=True)
+    kind: str
+    started_at: datetime = Field(sa_column=Column(DateTime(timezone=True), index=True, nullable=False))
+    finished_at: datetime = Field(sa_column=Column(DateTime(timezone=True), nullable=False))
+    seconds: float
+    sessions: int = Field(default=0)
+    failed_sessions: int = Field(default=0)
+    upstream_requests: int = Field(default=0)
+    bytes_fetched: int = Field(default=0, sa_column=Column(BigInteger, nullable=False))
+    bytes_decoded: int = Field(default=0, sa_column=Column(BigInteger, nullable=False))
+    stage_seconds: dict = Field(default_factory=dict, sa_column=Column(JSONB, nullable=False))
+    rows_written: dict = Field(default_factory=dict, sa_column=Column(JSONB, nullable=False))
+    slowest_sessions: list = Field(default_factory=list, sa_column=Column(JSONB, nullable=False))
+    profile_path: Optional[str] = Field(default=None)
@@ -0,0 +1,34 @@
+from datetime import datetime
+from typing import Optional
+
+from sqlalchemy import Column, DateTime
+from sqlmodel import SQLModel, Field
+
+"""
+Database model that tracks the ingest of one session by update_db.
+'status' is one of INGEST_STATUSES. Each stage (meeting, session, laps, results) records when it
+was last committed, so an interrupted run resumes at the first stage without a timestamp.
+Sessions that failed are retried once 'next_attempt_at' has passed, with an exponential backoff.
+No foreign key to f1session: the row exists before the session does.
+"""
+
+# pending: never ingested, in_progress: a run started and didn't finish, live: ingested while still
+# changing upstream and polled again, done: ingested after it finished, failed: waiting for a retry
+INGEST_STATUSES = ("pending", "in_progress", "live", "done", "failed")
+
+class IngestState(SQLModel, table=True):
+    # OpenF1's key, never generated here
+    session_key: int = Field(primary_key=True, sa_column_kwargs={"autoincrement": False})
+    meeting_key: int
+    date_start: datetime = Field(sa_column=Column(DateTime(timezone=True), index=True, nullable=False))
+    date_end: Optional[datetime] = Field(default=None, sa_column=Column(DateTime(timezone=True)))
+    status: str = Field(default="pending", index=True)
+    meeting_at: Optional[datetime] = Field(default=None, sa_column=Column(DateTime(timezone=True)))
+    session_at: Optional[datetime] = Field(default=None, sa_column=Column(DateTime(timezone=True)))
+    laps_at: Optional[datetime] = Field(default=None, sa_column=Column(DateTime(timezone=True)))
+    results_at: Optional[datetime] = Field(default=None, sa_column=Column(DateTime(timezone=True)))
+    last_synced_at: Optional[datetime] = Field(default=None, sa_column=Column(DateTime(timezone=True)))
+    attempts: int = Field(default=0)
+    last_error: Optional[str] = Field(default=None)
+    next_attempt_at: Optional[datetime] = Field(default=None, sa_column=Column(DateTime(timezone=True)))
+    updated_at: datetime = Field(sa_column=Column(DateTime(timezone=True), nullable=False))
@@ -0,0 +1,13 @@
+from datetime import datetime
+from sqlalchemy import Column, DateTime
+from sqlmodel import SQLModel, Field
+
+"""
+Database model that records which migrations in backend/db/migrations were applied.
+"""
+
+class SchemaMigration(SQLModel, table=True):
+    __tablename__ = "schema_migrations"
+    version: str = Field(primary_key=True)
+    name: str
+    applied_at: datetime = Field(sa_column=Column(DateTime(timezone=True), nullable=False))
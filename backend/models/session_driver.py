@@ -1,4 +1,4 @@
-from sqlalchemy import PrimaryKeyConstraint
+from sqlalchemy import Index, PrimaryKeyConstraint
 from sqlmodel import SQLModel, Field
 
 
@@ -7,8 +7,12 @@ Database model that Represents a driver's participation in a session.
 """
 
 class SessionDriver(SQLModel, table=True):
-    session_key: int = Field(index=True, foreign_key="f1session.session_key")
+    session_key: int = Field(foreign_key="f1session.session_key")
     driver_id: int = Field(index=True, foreign_key="driver.id")
     team: str = Field(default="")
     driver_number: int
-    __table_args__ = (PrimaryKeyConstraint("session_key", "driver_id"),)
+    __table_args__ = (
+        PrimaryKeyConstraint("session_key", "driver_id"),
+        Index("ix_sessiondriver_session_number", "session_key", "driver_number",
+              postgresql_include=["driver_id", "team"]),
+    )
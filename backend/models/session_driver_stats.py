@@ -0,0 +1,20 @@
+from typing import Optional
+
+from sqlalchemy import Column, PrimaryKeyConstraint
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlmodel import SQLModel, Field
+
+"""
+Database model that holds a driver's lap statistics in a session, computed at ingest time from SessionLaps.
+'stints' is a list of {"stint", "compound", "start_lap", "end_lap", "laps", "average_lap"} objects.
+"""
+
+class SessionDriverStats(SQLModel, table=True):
+    session_key: int = Field(foreign_key="f1session.session_key")
+    driver_id: int = Field(foreign_key="driver.id")
+    lap_count: int = Field(default=0)
+    best_lap: Optional[float] = Field(default=None)
+    median_clean_lap: Optional[float] = Field(default=None)
+    top_speed_trap: Optional[int] = Field(default=None)
+    stints: list = Field(default_factory=list, sa_column=Column(JSONB, nullable=False))
+    __table_args__ = (PrimaryKeyConstraint("session_key", "driver_id"),)
@@ -1,6 +1,6 @@
 from typing import Optional
 
-from sqlalchemy import UniqueConstraint
+from sqlalchemy import Index, UniqueConstraint
 from sqlmodel import SQLModel, Field
 
 """
@@ -9,8 +9,8 @@ Database model that represents a Lap a driver completed in a session.
 
 class SessionLaps(SQLModel, table=True):
     id: int = Field(default=None, primary_key=True)
-    driver_id: int = Field(index=True, foreign_key="driver.id")
-    session_key: int = Field(index=True, foreign_key="f1session.session_key")
+    driver_id: int = Field(foreign_key="driver.id")
+    session_key: int = Field(foreign_key="f1session.session_key")
     lap_number: int
     is_pit_out_lap: bool
     lap_time: float = Field(default=0.0, nullable=True)
@@ -18,4 +18,6 @@ class SessionLaps(SQLModel, table=True):
     compound: Optional[str] = Field(default=None, nullable=True)
     __table_args__ = (
         UniqueConstraint("driver_id", "session_key", "lap_number",name="uq_lap"),
+        Index("ix_sessionlaps_session_driver_lap", "session_key", "driver_id", "lap_number",
+              postgresql_include=["id", "lap_time", "is_pit_out_lap", "compound", "st_speed"]),
     )
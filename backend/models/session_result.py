@@ -1,25 +1,33 @@
-from sqlalchemy import PrimaryKeyConstraint
+from sqlalchemy import Index, PrimaryKeyConstraint
 from typing import Union, List, Optional
 from sqlmodel import SQLModel, Field
 
 
 """
 Database model that Represents an F1Session's result"
+Times are in seconds. In qualifying, duration and gap_to_leader are those of the last segment the driver
+reached, and q1/q2/q3 hold every segment. Lapped cars have no gap_to_leader but laps_behind.
 """
 
 
 class SessionResult(SQLModel, table=True):
     meeting_key: int = Field(foreign_key="event.meeting_key")
-    session_key: int = Field(index=True, foreign_key="f1session.session_key")
+    session_key: int = Field(foreign_key="f1session.session_key")
     driver_id: int = Field(index=True, foreign_key="driver.id")
     position: Optional[int] = Field(default=None)
-    duration: Optional[str] = Field(default=None)
+    duration: Optional[float] = Field(default=None)
     number_of_laps: Optional[int] = Field(default=None)
-    gap_to_leader: Optional[str] = Field(default=None)
+    gap_to_leader: Optional[float] = Field(default=None)
+    q1: Optional[float] = Field(default=None)
+    q2: Optional[float] = Field(default=None)
+    q3: Optional[float] = Field(default=None)
+    lapped: bool = Field(default=False)
+    laps_behind: Optional[int] = Field(default=None)
     dnf: bool = Field(default="")
     dns: bool = Field(default="")
     dsq: bool = Field(default="")
 
     __table_args__ = (
         PrimaryKeyConstraint("session_key", "driver_id"),
+        Index("ix_sessionresult_session_position", "session_key", "position"),
     )
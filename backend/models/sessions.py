@@ -1,3 +1,5 @@
+from datetime import datetime
+from sqlalchemy import Column, DateTime
 from sqlmodel import SQLModel, Field
 
 """
@@ -10,4 +12,4 @@ class F1Session(SQLModel, table=True):
     session_key: int = Field(index=True, primary_key=True)
     session_type: str
     session_name: str
-    date: str
+    date: datetime = Field(sa_column=Column(DateTime(timezone=True), index=True, nullable=False))
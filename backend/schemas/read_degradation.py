@@ -0,0 +1,20 @@
+from pydantic import BaseModel
+
+
+class StintDegradation(BaseModel):
+    stint: int
+    compound: str
+    start_lap: int
+    end_lap: int
+    laps: int
+    clean_laps: int
+    average_lap: float | None = None
+    fuel_corrected_pace: float | None = None
+    degradation_per_lap: float | None = None
+
+
+class DriverDegradation(BaseModel):
+    driver_number: int
+    name_acronym: str
+    team: str | None = None
+    stints: list[StintDegradation]
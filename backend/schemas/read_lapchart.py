@@ -0,0 +1,18 @@
+from pydantic import BaseModel
+
+
+class DriverLapChart(BaseModel):
+    driver_number: int
+    name_acronym: str
+    team: str | None = None
+    # one value per lap, None on laps the driver didn't complete or nobody has a time for
+    positions: list[int | None]
+    cumulative_times: list[float | None]
+    gaps_to_leader: list[float | None]
+    intervals: list[float | None]
+
+
+class LapChart(BaseModel):
+    session_key: int
+    laps: int
+    drivers: list[DriverLapChart]
@@ -1,5 +1,4 @@
-import json
-from pydantic import BaseModel, field_validator
+from pydantic import BaseModel
 
 
 class DriverPosition(BaseModel):
@@ -8,27 +7,18 @@ class DriverPosition(BaseModel):
     first_name: str
     last_name: str
     number_of_laps: int | None = 0
+    # seconds, or "+N LAP(S)" for lapped cars
     gap_to_leader: float | str | None = None
-    duration: float | str | None = None
+    duration: float | None = None
+    q1: float | None = None
+    q2: float | None = None
+    q3: float | None = None
+    lapped: bool = False
+    laps_behind: int | None = None
     dnf: bool
     dns: bool
     dsq: bool
 
-    @field_validator('duration', 'gap_to_leader', mode='before')
-    @classmethod
-    def parse_numbers(cls, v):
-        if v == 'None' or v == '' or v is None:
-            return None
-        elif not v.startswith('['):
-            return v
-        else:
-            valid_json_string = v.replace("None", "null")
-            duration_array = json.loads(valid_json_string)
-            for duration in reversed(duration_array):
-                if duration is not None:
-                    return duration
-            return None
-
 
 class ReadSessionResult(BaseModel):
     result: list[DriverPosition]
@@ -0,0 +1,23 @@
+from pydantic import BaseModel
+
+
+class StintStats(BaseModel):
+    stint: int
+    compound: str
+    start_lap: int
+    end_lap: int
+    laps: int
+    average_lap: float | None = None
+
+
+class DriverSessionStats(BaseModel):
+    driver_number: int
+    first_name: str
+    last_name: str
+    name_acronym: str
+    team: str | None = None
+    lap_count: int
+    best_lap: float | None = None
+    median_clean_lap: float | None = None
+    top_speed_trap: int | None = None
+    stints: list[StintStats]
@@ -1,17 +1,28 @@
+import os, sys
+
+# must be set before backend.db.database creates the engine
+os.environ.setdefault("DB_PROFILE", "cron")
+
 from datetime import timedelta
 from backend.models.session_calendar import SessionCalendar
 from backend.db.database import engine
 from sqlmodel import Session, SQLModel
 from icalendar import Calendar
-from urllib.request import urlopen
+from backend.db.db_utils import logger
+from backend.db.upstream import UpstreamClient
 from sqlalchemy.dialects.postgresql import insert
 
 SQLModel.metadata.create_all(engine)
 
 # Download calendar
 url = "https://files-f1.motorsportcalendars.com/f1-calendar_p1_p2_p3_qualifying_sprint_gp.ics"
-with urlopen(url) as response:
-    data = response.read().decode("utf-8")
+# not OpenF1, so no OpenF1 rate limit or response cache
+calendar_client = UpstreamClient(user_agent="racepace-calendar")
+data = calendar_client.get_text(url)
+calendar_client.close()
+if data is None:
+    logger.error(f"Could not download the race calendar from {url}, sessioncalendar is unchanged.")
+    sys.exit(1)
 
 calendar = Calendar.from_ical(data)
 
@@ -0,0 +1,220 @@
+import os
+
+# must be set before backend.db.database creates the engine
+os.environ.setdefault("DB_PROFILE", "ingest")
+
+import signal, threading, time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import func
+from sqlmodel import Session, desc, select
+
+from backend.crud.cache import bump_data_versions, session_scope
+from backend.db.database import engine
+from backend.db.db_utils import URL_BASE, get_data, logger, start_metrics_server
+from backend.db.update_db import (SESSION_ENDPOINTS, add_all_laps_for_session, add_session_driver_stats,
+                                  add_session_result_to_db, ingest_session, openf1_timestamp, parse_timestamp,
+                                  prefetch_session_payloads, record_ingest_failure, sync_ingest_states, update_db)
+from backend.models.ingest_state import IngestState
+from backend.models.session_calendar import SessionCalendar
+
+"""
+Long-running process that keeps live sessions up to date. It reads the SessionCalendar
+table (filled by fetch_race_calendar.py), sleeps until the next session window and, while a session
+is live, polls only that session:
+  - laps incrementally, with a 'date_start>=' filter from the earliest lap still in progress,
+  - stints (a few dozen rows) on every poll, to know the compound of the new laps,
+  - results every RESULTS_POLL_SECONDS.
+The poll interval starts at POLL_MIN_SECONDS, grows when nothing changes (red flags, between
+qualifying segments) up to POLL_MAX_SECONDS and drops back as soon as new laps arrive.
+When the window closes, one update_db() run picks up final results and any new sessions.
+Only one poller runs at a time, guarded by a Postgres advisory lock.
+
+Usage:
+    python -m backend.scripts.live_poller
+"""
+
+POLL_MIN_SECONDS = float(os.getenv("LIVE_POLL_MIN_SECONDS", "4"))
+POLL_MAX_SECONDS = float(os.getenv("LIVE_POLL_MAX_SECONDS", "30"))
+POLL_BACKOFF = 1.5
+RESULTS_POLL_SECONDS = float(os.getenv("LIVE_RESULTS_POLL_SECONDS", "60"))
+# Longest sleep between two looks at the calendar, so calendar updates are picked up.
+IDLE_SLEEP_SECONDS = float(os.getenv("LIVE_IDLE_SLEEP_SECONDS", "3600"))
+# Start polling a bit before the calendar says a session starts.
+WINDOW_LEAD = timedelta(minutes=5)
+# A lap still without a time this long after the newest lap started was abandoned (retirement, red flag).
+OPEN_LAP_TIMEOUT = timedelta(minutes=10)
+# pg_advisory_lock key, one poller per database
+POLLER_LOCK_KEY = 7_221_002
+
+stop = threading.Event()
+
+def calendar_time(value: datetime) -> datetime:
+    """SessionCalendar times are stored without a time zone, in UTC."""
+    return value if value.tzinfo else value.replace(tzinfo=timezone.utc)
+
+def current_window(session: Session, now: datetime) -> SessionCalendar | None:
+    """The calendar window 'now' falls in, starting WINDOW_LEAD early. Sessions don't overlap: one index seek."""
+    window = session.exec(
+        select(SessionCalendar)
+        .where(SessionCalendar.start <= now + WINDOW_LEAD)
+        .order_by(desc(SessionCalendar.start))
+        .limit(1)
+    ).first()
+    if window and calendar_time(window.end) >= now:
+        return window
+    return None
+
+def next_window_start(session: Session, now: datetime) -> datetime | None:
+    start = session.exec(select(func.min(SessionCalendar.start)).where(SessionCalendar.start > now)).one()
+    return calendar_time(start) if start else None
+
+def find_openf1_session(window: SessionCalendar) -> dict | None:
+    """The OpenF1 session that starts within a calendar window, None if OpenF1 doesn't list it yet."""
+    sessions = get_data(
+        URL_BASE + f'sessions?date_start>={openf1_timestamp(calendar_time(window.start) - WINDOW_LEAD)}'
+                   f'&date_start<={openf1_timestamp(calendar_time(window.end))}'
+    )
+    return sessions[0] if sessions else None
+
+def laps_watermark(laps: list[dict], current: datetime | None) -> datetime | None:
+    """
+    Start date of the next incremental laps request: the earliest lap still in progress, whose time
+    is yet to come, or else the newest lap, refetched so no lap starting in the same second is missed.
+    """
+    started = [(parse_timestamp(lap.get('date_start')), lap.get('lap_duration')) for lap in laps]
+    started = [(date_start, duration) for date_start, duration in started if date_start]
+    if not started:
+        return current
+    newest = max(date_start for date_start, _ in started)
+    in_progress = [date_start for date_start, duration in started
+                   if duration is None and newest - date_start < OPEN_LAP_TIMEOUT]
+    return min(in_progress) if in_progress else newest
+
+def poll_laps(session: Session, session_key: int, drivers: list[dict], since: datetime | None) -> tuple[int, datetime | None]:
+    """
+    Fetches the laps started since 'since' with the session's stints and upserts them.
+    :return: Number of laps that were new or changed, and the watermark of the next poll.
+    """
+    lap_filter = f'&date_start>={openf1_timestamp(since)}' if since else ''
+    laps = get_data(URL_BASE + f'laps?session_key={session_key}{lap_filter}')
+    stints = get_data(URL_BASE + f'stints?session_key={session_key}')
+    if laps is None or stints is None:
+        logger.warning(f"Could not poll laps of session {session_key}, retrying next poll.")
+        return 0, since
+    if not laps:
+        return 0, since
+
+    upserted = add_all_laps_for_session(session, session_key, {'laps': laps, 'stints': stints, 'drivers': drivers})
+    if upserted:
+        add_session_driver_stats(session, session_key)
+        bump_data_versions(session, {session_scope(session_key)})
+    session.commit()
+    return upserted, laps_watermark(laps, since)
+
+def poll_results(session: Session, session_key: int):
+    results = get_data(URL_BASE + f'session_result?session_key={session_key}')
+    if not results:
+        return
+    add_session_result_to_db(session, session_key, results)
+    bump_data_versions(session, {session_scope(session_key)})
+    session.commit()
+
+def mark_synced(session: Session, session_key: int):
+    state = session.get(IngestState, session_key)
+    if state:
+        state.last_synced_at = state.updated_at = datetime.now(timezone.utc)
+        session.add(state)
+        session.commit()
+
+def poll_live_session(window: SessionCalendar):
+    """Ingests the session of a calendar window, then polls it until the window closes."""
+    window_end = calendar_time(window.end)
+    logger.info(f"Live window {window.summary} until {window_end.isoformat()}.")
+    with Session(engine, expire_on_commit=False) as session:
+        f1session = None
+        while f1session is None:
+            f1session = find_openf1_session(window)
+            if f1session is None and not sleep_until_or(window_end, POLL_MAX_SECONDS):
+                return
+        session_key = f1session['session_key']
+
+        # one full ingest creates the meeting, session and drivers, and catches up on laps already driven
+        while True:
+            state = sync_ingest_states(session, [f1session], datetime.now(timezone.utc))[session_key]
+            session.commit()
+            try:
+                with ThreadPoolExecutor(max_workers=len(SESSION_ENDPOINTS)) as executor:
+                    ingest_session(session, f1session, prefetch_session_payloads(executor, session_key), state)
+                break
+            except Exception as e:
+                logger.error(f"Initial ingest of session {session_key} failed", exc_info=True)
+                record_ingest_failure(session, session_key, e)
+                if not sleep_until_or(window_end, POLL_MAX_SECONDS):
+                    return
+        drivers = get_data(URL_BASE + f'drivers?session_key={session_key}') or []
+
+        interval = POLL_MIN_SECONDS
+        watermark = None
+        results_polled_at = time.monotonic()
+        while not stop.is_set() and datetime.now(timezone.utc) <= window_end:
+            started = time.monotonic()
+            try:
+                upserted, watermark = poll_laps(session, session_key, drivers, watermark)
+                if time.monotonic() - results_polled_at >= RESULTS_POLL_SECONDS:
+                    poll_results(session, session_key)
+                    results_polled_at = time.monotonic()
+                mark_synced(session, session_key)
+            except Exception:
+                session.rollback()
+                logger.error(f"Poll of session {session_key} failed", exc_info=True)
+                upserted = 0
+            interval = POLL_MIN_SECONDS if upserted else min(interval * POLL_BACKOFF, POLL_MAX_SECONDS)
+            logger.debug(f"Session {session_key}: {upserted} laps in {time.monotonic() - started:.2f}s, "
+                         f"next poll in {interval:.1f}s.")
+            stop.wait(interval)
+
+def sleep_until_or(deadline: datetime, seconds: float) -> bool:
+    """Sleeps 'seconds' at most, or until 'deadline'. False if the deadline passed or the poller is stopping."""
+    remaining = (deadline - datetime.now(timezone.utc)).total_seconds()
+    if remaining <= 0:
+        return False
+    return not stop.wait(min(seconds, remaining)) and datetime.now(timezone.utc) < deadline
+
+def run():
+    with engine.connect() as lock_connection:
+        if not lock_connection.execute(select(func.pg_try_advisory_lock(POLLER_LOCK_KEY))).scalar():
+            logger.warning("Another live poller is running. Exiting.")
+            return
+        lock_connection.commit()
+
+        while not stop.is_set():
+            now = datetime.now(timezone.utc)
+            with Session(engine) as session:
+                window = current_window(session, now)
+                next_start = None if window else next_window_start(session, now)
+
+            if window:
+                poll_live_session(window)
+                if not stop.is_set():
+                    update_db()
+                continue
+
+            sleep_seconds = IDLE_SLEEP_SECONDS
+            if next_start:
+                sleep_seconds = min(sleep_seconds, max((next_start - WINDOW_LEAD - now).total_seconds(), 0))
+            logger.info(f"No live session, sleeping {sleep_seconds:.0f}s"
+                        + (f" (next session at {next_start.isoformat()})." if next_start else "."))
+            stop.wait(sleep_seconds)
+    logger.info("Live poller stopped.")
+
+def request_stop(signum, frame):
+    logger.info(f"Received signal {signum}, stopping after the current poll.")
+    stop.set()
+
+if __name__ == "__main__":
+    signal.signal(signal.SIGTERM, request_stop)
+    signal.signal(signal.SIGINT, request_stop)
+    start_metrics_server()
+    run()
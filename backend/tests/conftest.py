@@ -0,0 +1,9 @@
+import pytest
+
+ADMIN_TOKEN = "test-admin-token"
+ADMIN_HEADERS = {"Authorization": f"Bearer {ADMIN_TOKEN}"}
+
+@pytest.fixture(autouse=True)
+def admin_token(monkeypatch):
+    """The /admin and /metrics endpoints answer 404 unless ADMIN_TOKEN is set."""
+    monkeypatch.setenv("ADMIN_TOKEN", ADMIN_TOKEN)
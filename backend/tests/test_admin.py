@@ -0,0 +1,36 @@
+from fastapi.testclient import TestClient
+from backend.main import app
+from conftest import ADMIN_HEADERS
+
+client = TestClient(app)
+
+def test_read_pool_stats():
+    response = client.get("/admin/pool", headers=ADMIN_HEADERS)
+    assert response.status_code == 200
+    data = response.json()
+
+    sync_pool = data['pools']['sync']
+    assert sync_pool['checked_out'] >= 0
+    assert "avg_wait_ms" in sync_pool
+    assert response.headers["cache-control"] == "no-store"
+
+    print(f"Pool statistics: {data}")
+
+def test_read_ingest_status():
+    response = client.get("/admin/ingest", headers=ADMIN_HEADERS)
+    assert response.status_code == 200
+    data = response.json()
+
+    assert all(status in ("pending", "in_progress", "live", "done", "failed") for status in data['statuses'])
+    assert len(data['failed']) == data['statuses'].get('failed', 0)
+    assert data['last_run'] is None or data['last_run']['kind'] == 'update_db'
+    assert response.headers["cache-control"] == "no-store"
+
+    print(f"Ingest status: {data}")
+
+def test_admin_requires_token(monkeypatch):
+    assert client.get("/admin/pool").status_code == 401
+    assert client.get("/admin/cache", headers={"Authorization": "Bearer wrong"}).status_code == 401
+
+    monkeypatch.delenv("ADMIN_TOKEN")
+    assert client.get("/admin/pool", headers=ADMIN_HEADERS).status_code == 404
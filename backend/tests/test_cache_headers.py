@@ -0,0 +1,34 @@
+from fastapi.testclient import TestClient
+from backend.main import app
+from backend.api.cache_headers import LIVE_MAX_AGE
+
+client = TestClient(app)
+SESSION_KEY = 9519 # MONACO 2024 QUALIFYING SESSION
+DRIVER_NUMBER = 16 # CHARLES LECLERC
+
+def test_matching_etag_returns_not_modified():
+    response = client.get(f"/laps/{SESSION_KEY}/{DRIVER_NUMBER}")
+    assert response.status_code == 200
+    etag = response.headers["etag"]
+    assert "max-age" in response.headers["cache-control"]
+
+    response = client.get(f"/laps/{SESSION_KEY}/{DRIVER_NUMBER}", headers={"If-None-Match": etag})
+    assert response.status_code == 304
+    assert response.headers["etag"] == etag
+    assert response.content == b""
+
+def test_etag_depends_on_format():
+    json_etag = client.get(f"/laps/{SESSION_KEY}").headers["etag"]
+    columnar = client.get(f"/laps/{SESSION_KEY}", headers={"Accept": "application/vnd.racepace.columnar+json"})
+    assert columnar.status_code == 200
+    assert columnar.headers["etag"] != json_etag
+
+def test_stale_etag_returns_data():
+    response = client.get(f"/session_result/{SESSION_KEY}", headers={"If-None-Match": '"stale"'})
+    assert response.status_code == 200
+    assert "etag" in response.headers
+
+def test_session_never_ingested_is_cached_briefly():
+    response = client.get("/session_result/1")
+    assert response.status_code == 200
+    assert response.headers["cache-control"] == f"public, max-age={LIVE_MAX_AGE}"
@@ -0,0 +1,38 @@
+from fastapi.testclient import TestClient
+from backend.main import app
+from backend.analytics.degradation import lap_arrays, fit_stints
+
+client = TestClient(app)
+SESSION_KEY = 9519 #MONACO 2024 QUALIFYING
+
+def test_get_session_degradation():
+    response = client.get(f'/session/{SESSION_KEY}/degradation')
+    assert response.status_code == 200
+    data = response.json()
+    assert len(data) > 0
+
+    for driver in data:
+        assert [stint['stint'] for stint in driver['stints']] == list(range(1, len(driver['stints']) + 1))
+        for stint in driver['stints']:
+            assert stint['clean_laps'] <= stint['laps']
+            print(f"{driver['name_acronym']} stint {stint['stint']} {stint['compound']}: "
+                  f"pace {stint['fuel_corrected_pace']} degradation {stint['degradation_per_lap']}")
+
+def test_fit_stints_recovers_degradation():
+    # two drivers, 0.1 s/lap of degradation on fuel-corrected times, a pit stop on lap 11 and a slow in-lap
+    rows = []
+    for driver_number, base in ((1, 80.0), (16, 81.0)):
+        for lap in range(1, 21):
+            age = lap - 1 if lap < 11 else lap - 11
+            time = base + 0.1 * age + 0.055 * (20 - lap)
+            if lap == 10:
+                time += 20
+            rows.append((driver_number, lap, None if lap == 1 else time, lap in (1, 11), "MEDIUM" if lap < 11 else "HARD"))
+
+    stints = fit_stints(lap_arrays(rows))
+
+    assert [(stint['driver_number'], stint['stint'], stint['compound']) for stint in stints] == \
+           [(1, 1, "MEDIUM"), (1, 2, "HARD"), (16, 1, "MEDIUM"), (16, 2, "HARD")]
+    for stint in stints:
+        assert stint['degradation_per_lap'] == 0.1
+    assert stints[0]['clean_laps'] == 8
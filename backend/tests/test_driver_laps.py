@@ -12,4 +12,9 @@ def test_read_driver_laps():
 
     data = response.json()
 
-    print(f"Driver lap data: {data}")
\ No newline at end of file
+    print(f"Driver lap data: {data}")
+
+def test_read_laps_of_driver_not_in_session():
+    response = client.get(f'/laps/{SESSION_KEY}/99')
+    assert response.status_code == 404
+    assert client.get(f'/laps/{SESSION_KEY}/99?format=columnar').status_code == 404
@@ -0,0 +1,41 @@
+from fastapi.testclient import TestClient
+from backend.main import app
+from backend.db.db_utils import parse_result_times
+
+client = TestClient(app)
+QUALIFYING_KEY = 9519 #MONACO 2024 QUALIFYING
+RACE_KEY = 9523 #MONACO 2024 RACE
+
+def test_get_qualifying_result():
+    response = client.get(f'/session_result/{QUALIFYING_KEY}')
+    assert response.status_code == 200
+    data = response.json()['result']
+    assert len(data) > 0
+
+    for driver in data:
+        segments = [driver['q1'], driver['q2'], driver['q3']]
+        reached = [segment for segment in segments if segment is not None]
+        if reached:
+            assert driver['duration'] == reached[-1]
+        print(f"P{driver['position']} {driver['last_name']}: {segments} gap {driver['gap_to_leader']}")
+
+def test_get_race_result():
+    response = client.get(f'/session_result/{RACE_KEY}')
+    assert response.status_code == 200
+    data = response.json()['result']
+    assert len(data) > 0
+
+    for driver in data:
+        if driver['lapped']:
+            assert driver['gap_to_leader'].startswith(f"+{driver['laps_behind']} LAP")
+        else:
+            assert driver['gap_to_leader'] is None or isinstance(driver['gap_to_leader'], float)
+        assert driver['duration'] is None or isinstance(driver['duration'], float)
+
+def test_parse_unexpected_result_times():
+    times = parse_result_times([80.1, None, "DNS"], "DNF")
+    assert times['q1'] == 80.1 and times['q3'] is None
+    assert times['gap_to_leader'] is None and not times['lapped']
+
+    times = parse_result_times(5000.2, "+2 LAPS")
+    assert times['duration'] == 5000.2 and times['laps_behind'] == 2
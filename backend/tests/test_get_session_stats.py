@@ -0,0 +1,27 @@
+from fastapi.testclient import TestClient
+from backend.main import app
+
+client = TestClient(app)
+SESSION_KEY = 9519 #MONACO 2024 QUALIFYING
+
+def test_get_session_stats():
+    response = client.get(f'/session_stats/{SESSION_KEY}')
+    assert response.status_code == 200
+    data = response.json()
+    assert len(data) > 0
+
+    best_laps = [driver['best_lap'] for driver in data if driver['best_lap'] is not None]
+    assert best_laps == sorted(best_laps)
+
+    for driver in data:
+        assert driver['lap_count'] > 0
+        assert sum(stint['laps'] for stint in driver['stints']) == driver['lap_count']
+        if driver['best_lap'] is not None:
+            assert driver['best_lap'] <= driver['median_clean_lap']
+        print(f"{driver['name_acronym']}: best {driver['best_lap']} median {driver['median_clean_lap']} "
+              f"stints {[(stint['compound'], stint['laps']) for stint in driver['stints']]}")
+
+def test_get_session_stats_unknown_session():
+    response = client.get('/session_stats/1')
+    assert response.status_code == 200
+    assert response.json() == []
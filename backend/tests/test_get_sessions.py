@@ -11,4 +11,24 @@ def test_get_sessions_from_key():
 
     print(f"Sessions for meeting key: {MEETING_KEY}")
     for session in data:
-        print(f"Session Key: {session['session_key']} Session: {session['location']} {session['session_type']} -> {session['session_name']} {session['date']}")
\ No newline at end of file
+        print(f"Session Key: {session['session_key']} Session: {session['location']} {session['session_type']} -> {session['session_name']} {session['date']}")
+
+def test_get_sessions_in_range():
+    response = client.get('/sessions/range/', params={"start": "2024-05-25T00:00:00Z", "end": "2024-05-27T00:00:00Z"})
+    assert response.status_code == 200
+    data = response.json()
+    assert len(data) > 0
+    assert all(session['meeting_key'] == MEETING_KEY for session in data)
+    assert [session['date'] for session in data] == sorted(session['date'] for session in data)
+
+def test_get_sessions_in_empty_range():
+    response = client.get('/sessions/range/', params={"start": "2024-05-27T00:00:00Z", "end": "2024-05-25T00:00:00Z"})
+    assert response.status_code == 400
+
+def test_get_next_and_previous_session():
+    at = "2024-05-26T00:00:00Z"
+    next_session = client.get('/sessions/next/', params={"at": at})
+    previous_session = client.get('/sessions/previous/', params={"at": at})
+    assert next_session.status_code == 200 and previous_session.status_code == 200
+    assert previous_session.json()['date'] <= at < next_session.json()['date']
+    print(f"Around {at}: {previous_session.json()['session_name']} -> {next_session.json()['session_name']}")
@@ -0,0 +1,38 @@
+import time
+from backend.db.ingest_report import IngestRunReport, TIMED_STAGES, count_rows, format_summary, timed
+from backend.db.upstream import RequestStats
+
+RACE_KEY = 9523 #MONACO 2024 RACE
+QUALI_KEY = 9519 #MONACO 2024 QUALI
+
+def test_stage_timings_and_summary():
+    stats = RequestStats()
+    stats.record(0.1, 1000, 4000)
+    report = IngestRunReport("update_db", stats)
+
+    # outside of a recorded session, timers and counters do nothing
+    with timed("transform"):
+        count_rows("sessionlaps", 5)
+
+    with report.session(RACE_KEY):
+        with timed("fetch"):
+            time.sleep(0.02)
+        with timed("laps_upsert"):
+            count_rows("sessionlaps", 1500)
+        with timed("laps_upsert"):
+            count_rows("sessionresult", 20)
+    with report.session(QUALI_KEY) as timings:
+        with timed("results"):
+            timings.failed = True
+    stats.record(0.2, 500, 2000)
+
+    summary = report.summary()
+    assert summary["sessions"] == 1 and summary["failed_sessions"] == 1
+    assert summary["upstream_requests"] == 1
+    assert summary["bytes_fetched"] == 500 and summary["bytes_decoded"] == 2000
+    assert summary["rows_written"] == {"sessionlaps": 1500, "sessionresult": 20}
+    assert list(summary["stage_seconds"]) == list(TIMED_STAGES)
+    assert summary["stage_seconds"]["fetch"] >= 0.02
+    assert [session["session_key"] for session in summary["slowest_sessions"]] == [RACE_KEY, QUALI_KEY]
+    assert set(summary["slowest_sessions"][0]["stages"]) == {"fetch", "laps_upsert"}
+    assert f"session {RACE_KEY}" in format_summary(summary)
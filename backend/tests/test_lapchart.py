@@ -0,0 +1,52 @@
+from fastapi.testclient import TestClient
+from backend.main import app
+from backend.analytics.lapchart import lap_chart
+
+client = TestClient(app)
+SESSION_KEY = 9523 #MONACO 2024 RACE
+
+def test_get_session_lap_chart():
+    response = client.get(f'/session/{SESSION_KEY}/lapchart')
+    assert response.status_code == 200
+    data = response.json()
+    assert data['session_key'] == SESSION_KEY
+    assert len(data['drivers']) > 0
+
+    for lap in range(data['laps']):
+        positions = sorted(driver['positions'][lap] for driver in data['drivers']
+                           if driver['positions'][lap] is not None)
+        assert positions == list(range(1, len(positions) + 1))
+    finishers = [driver for driver in data['drivers'] if driver['positions'][-1] is not None]
+    leader = min(finishers, key=lambda driver: driver['positions'][-1])
+    assert leader['gaps_to_leader'][-1] == 0
+
+def test_lap_chart_positions_gaps_and_intervals():
+    rows = [
+        (1, 1, 90.0), (1, 2, 80.0), (1, 3, 80.0),
+        (16, 1, 91.0), (16, 2, None), (16, 3, 75.0),  # untimed lap counts as the field median
+        (44, 1, 92.0), (44, 2, 85.0),                  # retired after lap 2
+    ]
+
+    chart = lap_chart(rows)
+
+    assert chart['drivers'] == [1, 16, 44]
+    assert chart['laps'] == 3
+    assert chart['positions'] == [[1, 1, 2], [2, 2, 1], [3, 3, None]]
+    assert chart['cumulative_times'][1] == [91.0, 173.5, 248.5]
+    assert chart['gaps_to_leader'] == [[0.0, 0.0, 1.5], [1.0, 3.5, 0.0], [2.0, 7.0, None]]
+    assert chart['intervals'] == [[0.0, 0.0, 1.5], [1.0, 3.5, 0.0], [1.0, 3.5, None]]
+
+def test_lap_chart_lap_nobody_has_a_time_for():
+    rows = [
+        (1, 1, None), (1, 2, 80.0),
+        (16, 1, None), (16, 2, 81.0),
+        (44, 1, None), (44, 2, 79.5),
+    ]
+
+    chart = lap_chart(rows)
+
+    # lap 1 order is unknown rather than by driver number
+    assert chart['positions'] == [[None, 2], [None, 3], [None, 1]]
+    assert chart['cumulative_times'] == [[None, 80.0], [None, 81.0], [None, 79.5]]
+    assert chart['gaps_to_leader'] == [[None, 0.5], [None, 1.5], [None, 0.0]]
+    assert chart['intervals'] == [[None, 0.5], [None, 1.0], [None, 0.0]]
@@ -0,0 +1,46 @@
+import asyncio
+from sqlmodel import Session
+from backend.db.database import engine
+from backend.db.live_events import live_broker, publish_live_event, event_payloads, NOTIFY_MAX_BYTES
+
+RACE_KEY = 9523 #MONACO 2024 RACE
+
+def lap(driver_number, lap_number):
+    return {"driver_number": driver_number, "lap_number": lap_number, "time": 75.123, "speed_trap": 290,
+            "is_pit_out_lap": False, "compound": "MEDIUM"}
+
+def test_event_payloads_fit_notify():
+    items = [lap(16, n) for n in range(1, 400)]
+    payloads = event_payloads(RACE_KEY, "laps", items)
+    assert len(payloads) > 1
+    assert all(len(payload.encode()) < NOTIFY_MAX_BYTES for payload in payloads)
+
+def test_live_events_fan_out():
+    laps = [lap(driver_number, n) for n in range(1, 200) for driver_number in (16, 81)]
+
+    async def receive():
+        driver_subscription = live_broker.subscribe(RACE_KEY, 16)
+        session_subscription = live_broker.subscribe(RACE_KEY)
+        other_subscription = live_broker.subscribe(RACE_KEY + 1)
+        try:
+            assert await asyncio.to_thread(live_broker.wait_listening, 10)
+            with Session(engine) as session:
+                publish_live_event(session, RACE_KEY, "laps", laps)
+                session.commit()
+
+            received = {driver_subscription: [], session_subscription: []}
+            for subscription, items in received.items():
+                while len(items) < (199 if subscription is driver_subscription else len(laps)):
+                    event = await asyncio.wait_for(subscription.queue.get(), 10)
+                    assert event["type"] == "laps"
+                    items.extend(event["items"])
+            assert other_subscription.queue.empty()
+            return received[driver_subscription], received[session_subscription]
+        finally:
+            for subscription in (driver_subscription, session_subscription, other_subscription):
+                live_broker.unsubscribe(subscription)
+
+    driver_laps, session_laps = asyncio.run(receive())
+    assert {item["driver_number"] for item in driver_laps} == {16}
+    assert [item["lap_number"] for item in driver_laps] == list(range(1, 200))
+    assert session_laps == laps
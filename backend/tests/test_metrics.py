@@ -0,0 +1,54 @@
+from fastapi.testclient import TestClient
+from prometheus_client import REGISTRY
+from backend.benchmarks.openf1_server import FaultInjector, start_server
+from backend.benchmarks.synthetic_openf1 import SyntheticOpenF1
+from backend.db.upstream import UpstreamClient
+from backend.main import app
+from conftest import ADMIN_HEADERS
+
+client = TestClient(app)
+SESSION_KEY = 9519 #MONACO 2024 QUALI
+ROUTE = "/session_result/{session_key}"
+
+def sample(name, **labels):
+    return REGISTRY.get_sample_value(name, labels) or 0
+
+def test_request_metrics():
+    requests = sample("http_requests_total", method="GET", route=ROUTE, status="200")
+    timed = sample("http_request_duration_seconds_count", method="GET", route=ROUTE)
+    assert client.get(f'/session_result/{SESSION_KEY}').status_code == 200
+    assert client.get('/not/a/route').status_code == 404
+
+    assert sample("http_requests_total", method="GET", route=ROUTE, status="200") == requests + 1
+    assert sample("http_request_duration_seconds_count", method="GET", route=ROUTE) == timed + 1
+    assert sample("http_response_size_bytes_sum", route=ROUTE) > 0
+    assert sample("http_requests_total", method="GET", route="unmatched", status="404") >= 1
+    assert sample("http_requests_in_flight") == 0
+
+    response = client.get('/metrics', headers=ADMIN_HEADERS)
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
+    for name in ("http_request_db_queries_bucket", "read_cache_hits_total", "read_cache_hit_ratio",
+                 'db_pool_checked_out{pool="sync"}'):
+        assert name in response.text
+
+def test_metrics_require_admin_token(monkeypatch):
+    assert client.get('/metrics').status_code == 401
+
+    monkeypatch.delenv("ADMIN_TOKEN")
+    assert client.get('/metrics', headers=ADMIN_HEADERS).status_code == 404
+
+def test_upstream_metrics():
+    server = start_server(SyntheticOpenF1(), faults=FaultInjector(throttle_rate=0.5, retry_after=0.01, seed=3))
+    upstream = UpstreamClient()
+    throttled = sample("upstream_responses_total", endpoint="sessions", status="429")
+    try:
+        for _ in range(5):
+            assert upstream.get_json(server.url_base + 'sessions?year=2024', retries=20, backoff=0.01)
+    finally:
+        upstream.close()
+        server.shutdown()
+    assert sample("upstream_responses_total", endpoint="sessions", status="200") >= 5
+    assert sample("upstream_responses_total", endpoint="sessions", status="429") > throttled
+    assert sample("upstream_retries_total", endpoint="sessions") > 0
+    assert sample("upstream_request_duration_seconds_count", endpoint="sessions") >= 5
@@ -0,0 +1,29 @@
+from fastapi.testclient import TestClient
+from sqlalchemy import text
+from sqlmodel import Session
+from backend.crud.cache import read_cache
+from backend.db.database import engine
+from backend.db.query_stats import count_queries
+from backend.main import app
+
+client = TestClient(app)
+SESSION_KEY = 9519 #MONACO 2024 QUALI
+
+def test_count_queries_in_block():
+    with count_queries() as queries, Session(engine) as session:
+        session.exec(text("SELECT 1"))
+        session.exec(text("SELECT 2"))
+    assert queries.count == 2
+    assert queries.seconds > 0
+
+    with Session(engine) as session:
+        session.exec(text("SELECT 1"))
+    assert queries.count == 2
+
+def test_count_queries_across_threadpool():
+    # sync routes run in a worker thread, which inherits the caller's context
+    read_cache.clear()
+    with count_queries() as queries:
+        response = client.get(f'/session_result/{SESSION_KEY}')
+    assert response.status_code == 200
+    assert queries.count >= 1
@@ -0,0 +1,40 @@
+from fastapi.testclient import TestClient
+from sqlmodel import Session
+from backend.main import app
+from conftest import ADMIN_HEADERS
+from backend.db.database import engine
+from backend.crud.cache import bump_data_versions, data_versions, session_scope
+from backend.crud.driver import get_drivers_from_session_key
+
+client = TestClient(app)
+SESSION_KEY = 9519 # MONACO 2024 QUALIFYING SESSION
+
+def test_repeated_reads_hit_cache():
+    client.get(f"/drivers/{SESSION_KEY}")
+    hits_before = client.get("/admin/cache", headers=ADMIN_HEADERS).json()['hits']
+
+    response = client.get(f"/drivers/{SESSION_KEY}")
+    assert response.status_code == 200
+
+    assert client.get("/admin/cache", headers=ADMIN_HEADERS).json()['hits'] == hits_before + 1
+
+def test_version_bump_invalidates_cache():
+    client.get(f"/session_result/{SESSION_KEY}")
+    invalidations_before = client.get("/admin/cache", headers=ADMIN_HEADERS).json()['invalidations']
+
+    with Session(engine) as session:
+        bump_data_versions(session, {session_scope(SESSION_KEY)})
+        session.commit()
+    data_versions.refresh(force=True)
+
+    response = client.get(f"/session_result/{SESSION_KEY}")
+    assert response.status_code == 200
+    assert client.get("/admin/cache", headers=ADMIN_HEADERS).json()['invalidations'] == invalidations_before + 1
+
+def test_cached_results_are_copies():
+    with Session(engine) as session:
+        drivers = get_drivers_from_session_key(session, SESSION_KEY)
+        drivers.clear()
+        assert get_drivers_from_session_key(session, SESSION_KEY)
+        get_drivers_from_session_key(session, SESSION_KEY)[0]['team'] = "changed"
+        assert get_drivers_from_session_key(session, SESSION_KEY)[0]['team'] != "changed"
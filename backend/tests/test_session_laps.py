@@ -0,0 +1,55 @@
+from fastapi.testclient import TestClient
+from pydantic import TypeAdapter
+from backend.main import app
+from backend.schemas.driver_laps_schema import DriverLapsRead
+
+client = TestClient(app)
+
+SESSION_KEY = 9519 #MONACO 2024 QUALIFYING
+DRIVER_NUMBERS = [16, 55] #CHARLES LECLERC, CARLOS SAINZ
+
+def test_read_selected_drivers_laps():
+    response = client.get(f'/laps/{SESSION_KEY}', params={"drivers": ",".join(map(str, DRIVER_NUMBERS))})
+    assert response.status_code == 200
+
+    data = response.json()
+    assert sorted(driver['driver_number'] for driver in data) == DRIVER_NUMBERS
+    for driver in data:
+        lap_numbers = [lap['lap_number'] for lap in driver['laps']]
+        assert lap_numbers == sorted(lap_numbers)
+
+def test_read_all_drivers_laps():
+    response = client.get(f'/laps/{SESSION_KEY}')
+    assert response.status_code == 200
+
+    data = response.json()
+    assert len(data) >= len(DRIVER_NUMBERS)
+
+    print(f"Drivers with laps in session {SESSION_KEY}: {[driver['driver_number'] for driver in data]}")
+
+def test_read_laps_invalid_drivers():
+    response = client.get(f'/laps/{SESSION_KEY}', params={"drivers": "16,abc"})
+    assert response.status_code == 400
+
+def test_read_laps_columnar():
+    response = client.get(f'/laps/{SESSION_KEY}', params={"drivers": "16", "format": "columnar"})
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/vnd.racepace.columnar+json")
+
+    driver = response.json()[0]
+    laps = driver['laps']
+    assert len(laps['lap_number']) == len(laps['time']) == len(laps['speed_trap']) == len(laps['is_pit_out_lap'])
+    assert sum(laps['compound']['lengths']) == len(laps['lap_number'])
+
+def test_read_laps_matches_response_model():
+    # laps are encoded without validation, so check they still fit the documented model
+    response = client.get(f'/laps/{SESSION_KEY}')
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/json"
+    assert "etag" in response.headers
+
+    data = response.json()
+    assert TypeAdapter(list[DriverLapsRead]).validate_python(data, strict=True)
+
+    schema = app.openapi()["paths"]["/laps/{session_key}"]["get"]["responses"]["200"]["content"]["application/json"]
+    assert schema["schema"]["items"]["$ref"].endswith("/DriverLapsRead")
@@ -0,0 +1,81 @@
+import os, time
+from backend.benchmarks.openf1_server import FaultInjector, start_server
+from backend.benchmarks.synthetic_openf1 import SyntheticOpenF1
+from backend.db.db_utils import parse_result_times
+from backend.db.response_cache import ResponseCache
+from backend.db.upstream import EMPTY_BODY_TTL, UpstreamClient
+
+MEETING_KEY = 1236 #MONACO 2024
+QUALI_KEY = 9519
+RACE_KEY = 9523
+
+data = SyntheticOpenF1(seasons=2, seed=7)
+
+def test_synthetic_data_is_deterministic():
+    again = SyntheticOpenF1(seasons=2, seed=7)
+    assert again.sessions() == data.sessions()
+    assert again.laps(RACE_KEY) == data.laps(RACE_KEY)
+    assert SyntheticOpenF1(seasons=2, seed=8).laps(RACE_KEY) != data.laps(RACE_KEY)
+    assert len(data.meetings()) == 48 and len(data.sessions()) == 240
+
+def test_synthetic_race_is_consistent():
+    laps, stints, results = data.laps(RACE_KEY), data.stints(RACE_KEY), data.session_result(RACE_KEY)
+    assert len(results) == 20
+    for result in results:
+        driver_laps = sorted(lap['lap_number'] for lap in laps if lap['driver_number'] == result['driver_number'])
+        assert driver_laps == list(range(1, result['number_of_laps'] + 1))
+        driver_stints = [stint for stint in stints if stint['driver_number'] == result['driver_number']]
+        covered = [n for stint in driver_stints for n in range(stint['lap_start'], stint['lap_end'] + 1)]
+        assert covered == driver_laps
+        times = parse_result_times(result['duration'], result['gap_to_leader'])
+        assert times['lapped'] == isinstance(result['gap_to_leader'], str)
+    classified = [result['position'] for result in results if result['position'] is not None]
+    assert classified == list(range(1, len(classified) + 1))
+
+def test_synthetic_qualifying_segments():
+    results = data.session_result(QUALI_KEY)
+    assert [result['position'] for result in results] == list(range(1, 21))
+    reached = [sum(time is not None for time in result['duration']) for result in results]
+    assert reached == [3] * 10 + [2] * 5 + [1] * 5
+    assert parse_result_times(results[0]['duration'], results[0]['gap_to_leader'])['gap_to_leader'] == 0
+
+def test_local_openf1_server_filters_and_faults():
+    server = start_server(data, faults=FaultInjector(throttle_rate=0.3, error_rate=0.2, retry_after=0.01, seed=1))
+    client = UpstreamClient()
+    try:
+        sessions = client.get_json(server.url_base + f'sessions?meeting_key={MEETING_KEY}', retries=20, backoff=0.01)
+        assert [session['session_key'] for session in sessions][-2:] == [QUALI_KEY, RACE_KEY]
+
+        since = data.laps(RACE_KEY)[len(data.laps(RACE_KEY)) // 2]['date_start']
+        laps = client.get_json(server.url_base + f'laps?session_key={RACE_KEY}&date_start>={since}',
+                               retries=20, backoff=0.01)
+        assert 0 < len(laps) < len(data.laps(RACE_KEY))
+        assert all(lap['date_start'] >= since for lap in laps)
+
+        drivers = client.get_json(server.url_base + 'drivers?team_name=Red%20Bull%20Racing&session_key=latest',
+                                  retries=20, backoff=0.01)
+        assert {driver['driver_number'] for driver in drivers} == {1, 11}
+        assert client.stats.snapshot()['throttled'] > 0 or client.stats.snapshot()['errors'] > 0
+    finally:
+        client.close()
+        server.shutdown()
+
+def test_empty_payloads_of_finished_sessions_are_refetched(tmp_path):
+    server = start_server(data)
+    cache = ResponseCache(tmp_path)
+    client = UpstreamClient(cache=cache)
+    url = server.url_base + f'laps?session_key={RACE_KEY}'
+    try:
+        cache.put(url, b"[]")
+        assert client.get_json(url, cache_ttl=None) == []
+
+        stale = time.time() - EMPTY_BODY_TTL - 1
+        os.utime(cache.path_for(url), (stale, stale))
+        assert client.get_json(url, cache_ttl=None)
+        # the real payload is then kept as long as asked
+        os.utime(cache.path_for(url), (stale, stale))
+        assert len(client.get_json(url, cache_ttl=None)) == len(data.laps(RACE_KEY))
+        assert server.requests['laps'] == 1
+    finally:
+        client.close()
+        server.shutdown()